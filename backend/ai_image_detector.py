@@ -1,37 +1,41 @@
-import requests, json
+import asyncio
 from pathlib import Path
 
+from backend.config import settings
+from backend.providers import ProviderClient, ProviderQuery, SightengineProvider
+
 class AI_Image_Detector():
-    def __init__(self, USER, KEY):
-        self.USER = USER
-        self.KEY = KEY
+    def __init__(self, USER=None, KEY=None):
+        self.USER = USER or settings.SIGHTENGINE_API_USER
+        self.KEY = KEY or settings.SIGHTENGINE_API_SECRET
+        self.provider = SightengineProvider(self.USER, self.KEY)
         self.query = input("Is this an Image URL or Image File?\nImage URL: A\nImage File: B\n").capitalize()
         print(self.url_or_file())
     def url_or_file(self):
         if self.query == "A":
             self.image_data = input("Please key in the image url here: ")
-            params = {
-                'url': self.image_data,
-                'models': 'genai',
-                'api_user': self.USER,
-                'api_secret': self.KEY
-            }
-            r = requests.get('https://api.sightengine.com/1.0/check.json', params=params)
+            query = ProviderQuery(image_url=self.image_data)
         elif self.query == "B":
             self.image_data = input("Please key in the image file path here: ")
-            params = {
-                'models': 'genai',
-                'api_user': self.USER,
-                'api_secret': self.KEY
-            }
             image_path = Path(str(self.image_data).strip('"'))
-            files = {'media': open(image_path, 'rb')}
-            r = requests.post('https://api.sightengine.com/1.0/check.json', files=files, data=params)
+            # read_bytes closes the file before the request is sent
+            query = ProviderQuery(image_bytes=image_path.read_bytes(), file_name=image_path.name)
         else:
-            self.url_or_file()
-        output = json.loads(r.text)
-        percent_ai = output["type"]["ai_generated"]
+            self.query = input("Please answer A (Image URL) or B (Image File): ").capitalize()
+            return self.url_or_file()
+        result = asyncio.run(self.check(query))
+        if not result.ok:
+            return f"AI detection failed: {result.error}"
+        percent_ai = result.ai_probability
         message = f"This image is {percent_ai * 100}% AI generated."
         return message
 
-ris = AI_Image_Detector()
\ No newline at end of file
+    async def check(self, query):
+        client = ProviderClient([self.provider])
+        try:
+            return await client.query_provider(self.provider, query)
+        finally:
+            await client.aclose()
+
+if __name__ == "__main__":
+    ris = AI_Image_Detector()
@@ -0,0 +1,285 @@
+"""
+Batch forensic analysis with PILForensicAnalyzer.
+
+Sweeps directories, glob patterns and URL lists across a process pool and
+writes one JSON line per image. The output file doubles as the checkpoint:
+with ``--resume`` every source already analysed successfully is skipped and
+failed ones are retried.
+
+Usage:
+    python batch_analysis.py /archive/scans "/archive/**/*.jpg" urls.txt -o results.jsonl --resume
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from backend.forensics.detectors import registry
+from image_analysis import PILForensicAnalyzer
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".webp"}
+URL_PREFIXES = ("http://", "https://")
+
+# One analyzer per worker process, created by the pool initializer
+_worker_analyzer: Optional[PILForensicAnalyzer] = None
+
+
+def iter_sources(inputs: Iterable[str]) -> Iterator[str]:
+    """
+    Expand CLI inputs into individual image sources.
+
+    Args:
+        inputs: Directories (searched recursively), glob patterns, ``.txt``
+            files with one path or URL per line, single files or URLs
+
+    Yields:
+        Image file paths and URLs, each at most once
+    """
+    seen: Set[str] = set()
+
+    def emit(source: str) -> Iterator[str]:
+        if source not in seen:
+            seen.add(source)
+            yield source
+
+    for item in inputs:
+        if item.lower().startswith(URL_PREFIXES):
+            yield from emit(item)
+        elif os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if Path(name).suffix.lower() in IMAGE_EXTENSIONS:
+                        yield from emit(os.path.join(root, name))
+        elif item.lower().endswith(".txt") and os.path.isfile(item):
+            with open(item, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        yield from emit(line)
+        elif glob.has_magic(item):
+            for path in sorted(glob.iglob(item, recursive=True)):
+                if os.path.isfile(path) and Path(path).suffix.lower() in IMAGE_EXTENSIONS:
+                    yield from emit(path)
+        else:
+            yield from emit(item)
+
+
+def load_checkpoint(output_path: Path) -> Set[str]:
+    """
+    Sources already analysed successfully in an output file.
+
+    Failed records are not counted, so a resumed run retries them (their
+    new record is appended after the old one). A truncated last line is
+    ignored.
+    """
+    done: Set[str] = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record["status"] == "success":
+                    done.add(record["source"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def truncate_torn_line(output_path: Path):
+    """Cut a partial last record (left by a crash) so appended records start on a fresh line."""
+    if not output_path.exists():
+        return
+    with open(output_path, "r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the last complete line
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            end = start
+        f.truncate(0)
+
+
+def _init_worker(calibration: Optional[Dict], detectors: Optional[List[str]] = None):
+    global _worker_analyzer
+    _worker_analyzer = PILForensicAnalyzer(calibration=calibration, detectors=detectors)
+
+
+def analyze_source(source: str, analyzer: Optional[PILForensicAnalyzer] = None) -> Dict:
+    """
+    Analyze one image and return its JSON-serialisable record.
+
+    Args:
+        source: Image path or URL
+        analyzer: Analyzer to use (defaults to the worker's analyzer)
+
+    Returns:
+        Record with the source, elapsed time and the analyzer report
+    """
+    analyzer = analyzer or _worker_analyzer or PILForensicAnalyzer()
+    start = time.perf_counter()
+    report = analyzer.generate_report(source)
+    return {
+        "source": source,
+        "status": report.get("status", "failed"),
+        "elapsed": round(time.perf_counter() - start, 4),
+        "report": report,
+    }
+
+
+class ProgressReporter:
+    """Periodic progress and throughput readout on stderr."""
+
+    def __init__(self, total: Optional[int], interval: float = 5.0, stream=sys.stderr):
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.done = 0
+        self.failed = 0
+        self.start = time.monotonic()
+        self._last = self.start
+
+    def update(self, failed: bool = False):
+        self.done += 1
+        self.failed += int(failed)
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self.report()
+
+    def report(self):
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        rate = self.done / elapsed
+        line = f"[batch] {self.done}"
+        if self.total is not None:
+            remaining = self.total - self.done
+            eta = remaining / rate if rate > 0 else float("inf")
+            line += f"/{self.total} ({100.0 * self.done / max(self.total, 1):.1f}%) eta {eta:.0f}s"
+        line += f" | {rate:.2f} img/s | {self.failed} failed | {elapsed:.0f}s elapsed"
+        print(line, file=self.stream, flush=True)
+
+
+def run_batch(
+    inputs: Iterable[str],
+    output_path: Path,
+    workers: Optional[int] = None,
+    resume: bool = False,
+    calibration: Optional[Dict] = None,
+    progress_interval: float = 5.0,
+    detectors: Optional[List[str]] = None,
+) -> Dict[str, float]:
+    """
+    Analyze many images in parallel and append one JSON line per image.
+
+    Args:
+        inputs: Directories, globs, URL/path list files, paths or URLs
+        output_path: JSONL output file (also used as the resume checkpoint)
+        workers: Worker processes (defaults to the CPU count)
+        resume: Skip sources already analysed successfully in ``output_path``
+        calibration: Calibration dict passed to every analyzer
+        progress_interval: Seconds between progress lines
+        detectors: Registry detectors to run (default: the analyzer's standard set)
+
+    Returns:
+        Summary with processed, failed, skipped counts and throughput
+    """
+    output_path = Path(output_path)
+    if detectors:
+        registry.select(detectors)  # fail fast on unknown detector names
+    done = load_checkpoint(output_path) if resume else set()
+    sources: List[str] = [s for s in iter_sources(inputs) if s not in done]
+    skipped = len(done)
+
+    workers = workers or os.cpu_count() or 1
+    progress = ProgressReporter(len(sources), interval=progress_interval)
+    max_in_flight = workers * 4
+
+    if resume:
+        truncate_torn_line(output_path)
+    mode = "a" if resume else "w"
+    with open(output_path, mode, encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(calibration, detectors)
+    ) as executor:
+        pending: Dict = {}
+        queue = iter(sources)
+
+        def fill():
+            # Bound the number of queued futures so huge archives use constant memory
+            for source in queue:
+                pending[executor.submit(analyze_source, source)] = source
+                if len(pending) >= max_in_flight:
+                    break
+
+        fill()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                source = pending.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:  # worker crashed outside the analyzer's own handling
+                    record = {"source": source, "status": "failed", "error": str(e)}
+                out.write(json.dumps(record, default=str) + "\n")
+                progress.update(failed=record["status"] != "success")
+            out.flush()
+            fill()
+
+    progress.report()
+    elapsed = max(time.monotonic() - progress.start, 1e-9)
+    return {
+        "processed": progress.done,
+        "failed": progress.failed,
+        "skipped": skipped,
+        "elapsed": round(elapsed, 2),
+        "images_per_second": round(progress.done / elapsed, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch forensic analysis with PILForensicAnalyzer")
+    parser.add_argument("inputs", nargs="+", help="Directories, glob patterns, .txt lists of paths/URLs, files or URLs")
+    parser.add_argument("-o", "--output", default="forensic_results.jsonl", help="JSONL output file")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--resume", action="store_true", help="Skip sources already analysed successfully in the output file")
+    parser.add_argument("--calibration", help="JSON file with calibration thresholds")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument("--detectors", help="Comma-separated registry detectors to run (default: standard set)")
+    args = parser.parse_args(argv)
+
+    calibration = None
+    if args.calibration:
+        with open(args.calibration, "r", encoding="utf-8") as f:
+            calibration = json.load(f)
+
+    summary = run_batch(
+        args.inputs,
+        Path(args.output),
+        workers=args.workers,
+        resume=args.resume,
+        calibration=calibration,
+        progress_interval=args.progress_interval,
+        detectors=[name.strip() for name in args.detectors.split(",") if name.strip()] if args.detectors else None,
+    )
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
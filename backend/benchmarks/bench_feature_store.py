@@ -0,0 +1,71 @@
+"""
+Benchmark: PILForensicAnalyzer with and without per-run feature memoisation.
+
+Runs the full analysis on each image with ``memoize_features=True`` and
+``False`` and reports the median time per image and the speedup. Without
+arguments a synthetic 2000x1500 JPEG is generated.
+
+Usage (from backend/):
+    python benchmarks/bench_feature_store.py [image ...] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from image_analysis import PILForensicAnalyzer  # noqa: E402
+
+
+def synthetic_image(directory: Path, width: int = 2000, height: int = 1500) -> Path:
+    """Write a photo-like test JPEG (gradient plus sensor-like noise)."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255.0 / width, y * 255.0 / height, (x + y) * 127.0 / (width + height)], axis=2)
+    pixels = np.clip(base + rng.normal(0, 6, base.shape), 0, 255).astype(np.uint8)
+    path = directory / "synthetic.jpg"
+    Image.fromarray(pixels).save(path, quality=90)
+    return path
+
+
+def time_analysis(path: Path, memoize: bool, repeat: int):
+    timings = []
+    analyzer = PILForensicAnalyzer(memoize_features=memoize)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = analyzer.analyze_image(path)
+        timings.append(time.perf_counter() - start)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+    return statistics.median(timings), analyzer._features.stats()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="Images to analyze (default: synthetic JPEG)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per image and mode (median is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images = [Path(p) for p in args.images] or [synthetic_image(Path(tmp))]
+
+        print(f"{'image':40s} {'no memo (s)':>12s} {'memo (s)':>10s} {'speedup':>8s}")
+        for path in images:
+            baseline, _ = time_analysis(path, memoize=False, repeat=args.repeat)
+            memoized, feature_stats = time_analysis(path, memoize=True, repeat=args.repeat)
+            print(f"{path.name[:40]:40s} {baseline:12.3f} {memoized:10.3f} {baseline / memoized:7.2f}x")
+            for name, stat in feature_stats.items():
+                print(f"    {name:18s} built in {stat['seconds']:.4f}s, reused {stat['hits']}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Benchmark: report storage size and read latency by encoding.
+
+Writes the same synthetic reports (realistic issue texts, risk factors and
+recommendations that repeat across reports) three ways and reports the disk
+usage (allocated bytes) and the median time to load one report as a
+CorroborationReport:
+
+- files: one indented ``report_<id>.json`` per report (the original format)
+- sqlite-json: ReportStore rows holding plain JSON
+- sqlite-compact: ReportStore rows in the compact encoding (interned strings, zlib)
+
+Usage (from backend/):
+    python benchmarks/bench_report_storage.py [--reports 5000] [--reads 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from backend.schemas.validation import (  # noqa: E402
+    CorroborationReport,
+    ImageAnalysisResult,
+    RiskScore,
+    ValidationIssue,
+    ValidationSeverity,
+)
+from backend.services.report_generator import ReportGenerator  # noqa: E402
+from backend.services.report_store import ReportStore, format_timestamp  # noqa: E402
+
+FINDINGS = [
+    ("forensics", "Error Level Analysis shows inconsistent compression levels across the image"),
+    ("forensics", "Noise residual variance is inconsistent between image regions"),
+    ("forensics", "Copy-move detection found duplicated regions"),
+    ("forensics", "JPEG quantization suggests recompression (double JPEG)"),
+    ("forensics", "Localised tampering region detected"),
+    ("ai_detection", "Pixel statistics are consistent with AI-generated imagery"),
+    ("metadata", "No EXIF metadata found (may have been stripped)"),
+    ("metadata", "Image shows signs of editing (software: Adobe Photoshop 25.0)"),
+    ("metadata", "Camera make/model missing from metadata"),
+    ("reverse_search", "Near-duplicate of 1 previously analysed image(s)"),
+]
+RECOMMENDATIONS = [
+    ["REJECT: Document has critical issues and high fraud risk", "Immediate manual review required by compliance officer"],
+    ["HOLD: Document requires thorough manual review", "Request additional supporting documents"],
+    ["REVIEW: Document has minor issues", "Consider requesting clarification on flagged items"],
+    ["ACCEPT: Document appears legitimate", "Proceed with standard processing"],
+]
+SEVERITIES = list(ValidationSeverity)
+
+
+def synthetic_report(rng: random.Random, timestamp: datetime) -> CorroborationReport:
+    """A report shaped like an image analysis result."""
+    findings = []
+    for category, description in rng.sample(FINDINGS, rng.randint(2, 7)):
+        findings.append(ValidationIssue(
+            category=category,
+            severity=rng.choice(SEVERITIES),
+            description=description,
+            location=rng.choice([None, "region 1", "region 2", "full image"]),
+            details={"score": round(rng.random(), 4), "threshold": 0.5},
+        ))
+    score = rng.uniform(0, 100)
+    risk = RiskScore(
+        overall_score=score,
+        risk_level=SEVERITIES[min(3, int(score // 25))],
+        confidence=rng.uniform(0.5, 1.0),
+        contributing_factors=[
+            {"component": "image_analysis", "factor": f.description, "severity": f.severity.value, "impact": 2.5}
+            for f in findings
+        ],
+        recommendations=RECOMMENDATIONS[3 - min(3, int(score // 25))],
+    )
+    image = ImageAnalysisResult(
+        is_authentic=score < 50,
+        is_ai_generated=rng.random() < 0.2,
+        ai_detection_confidence=rng.random(),
+        is_tampered=score > 50,
+        tampering_confidence=rng.random(),
+        perceptual_hash=f"{rng.getrandbits(64):016x}",
+        heatmaps=["ela", "noise", "clone", "jpeg"],
+        forensic_findings=findings[1:],
+        metadata_issues=findings[:1],
+        detector_timings={name: rng.random() for name in ("ela", "noise", "clone", "jpeg", "metadata")},
+    )
+    return CorroborationReport(
+        document_id=str(uuid.UUID(int=rng.getrandbits(128))),
+        file_name=f"scan_{rng.randint(0, 99999):05d}.jpg",
+        file_type=".jpg",
+        file_hash=f"{rng.getrandbits(256):064x}",
+        analysis_timestamp=timestamp,
+        image_analysis=image,
+        risk_score=risk,
+        processing_time=rng.uniform(0.5, 5.0),
+        engines_used=["image_analyzer", "risk_scorer"],
+        total_issues_found=len(findings),
+        critical_issues_count=sum(f.severity == ValidationSeverity.CRITICAL for f in findings),
+        requires_manual_review=score > 50,
+    )
+
+
+def summary(report: CorroborationReport) -> dict:
+    return {
+        "document_id": report.document_id,
+        "timestamp": format_timestamp(report.analysis_timestamp),
+        "risk_level": report.risk_score.risk_level.value,
+        "requires_manual_review": report.requires_manual_review,
+    }
+
+
+def store_size(store: ReportStore) -> int:
+    """Database bytes after folding the WAL back into the main file."""
+    with store._lock:
+        store._conn.execute("VACUUM")
+        store._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = store.db_path.stat().st_size
+    wal = store.db_path.with_name(store.db_path.name + "-wal")
+    return size + (wal.stat().st_size if wal.exists() else 0)
+
+
+def median_read(load, ids, reads: int, rng: random.Random) -> float:
+    timings = []
+    for document_id in rng.choices(ids, k=reads):
+        start = time.perf_counter()
+        report = load(document_id)
+        timings.append(time.perf_counter() - start)
+        assert report.document_id == document_id
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=5000, help="Reports to write")
+    parser.add_argument("--reads", type=int, default=2000, help="Random reads to time")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    reports = [synthetic_report(rng, start + timedelta(minutes=i)) for i in range(args.reports)]
+    ids = [r.document_id for r in reports]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        results = []
+
+        files_dir = tmp / "files"
+        files_dir.mkdir()
+        for report in reports:
+            (files_dir / f"report_{report.document_id}.json").write_text(report.model_dump_json(indent=2))
+        # Allocated blocks: small files each occupy at least one filesystem block
+        size = sum(p.stat().st_blocks * 512 for p in files_dir.iterdir())
+
+        def load_file(document_id):
+            with open(files_dir / f"report_{document_id}.json") as f:
+                return CorroborationReport(**json.load(f))
+
+        results.append(("files", size, median_read(load_file, ids, args.reads, random.Random(1))))
+
+        for name, compact in (("sqlite-json", False), ("sqlite-compact", True)):
+            store = ReportStore(tmp / f"{name}.sqlite3", compact=compact)
+            store.put_many((summary(r), r.model_dump(mode="json")) for r in reports)
+            generator = ReportGenerator(tmp / name, report_store=store)
+
+            def load_stored(document_id):
+                return asyncio.run(generator.get_report(document_id))
+
+            def load_direct(document_id):
+                return CorroborationReport.model_validate_json(store.get(document_id))
+
+            read = median_read(load_direct, ids, args.reads, random.Random(1))
+            assert load_stored(ids[0]) == reports[0]
+            results.append((name, store_size(store), read))
+            generator.audit_writer.close()
+            store.close()
+
+    baseline_size, baseline_read = results[0][1], results[0][2]
+    print(f"{args.reports} reports")
+    print(f"{'format':16s} {'disk (KB)':>10s} {'bytes/report':>13s} {'size':>7s} {'read (us)':>10s} {'read':>7s}")
+    for name, size, read in results:
+        print(
+            f"{name:16s} {size / 1024:10.0f} {size / args.reports:13.0f} {size / baseline_size:6.2f}x "
+            f"{read * 1e6:10.1f} {read / baseline_read:6.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
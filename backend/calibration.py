@@ -0,0 +1,261 @@
+"""
+Threshold calibration for PILForensicAnalyzer.
+
+Per-image metrics (ELA variance, noise ratio, colour-channel correlation and
+FFT peak ratio) are computed over a corpus of authentic reference images in a
+process pool and stored, one entry per image (keyed by resolved path), in a
+JSON calibration file. Thresholds are percentiles of the stored samples.
+Re-running on a grown corpus only measures images that are new or changed
+(size or mtime differ), replacing the old sample of an edited image, then
+re-derives the thresholds from all samples.
+
+Usage:
+    python calibration.py /reference/images -o calibration.json
+    python batch_analysis.py /archive -o results.jsonl --calibration calibration.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from batch_analysis import ProgressReporter, iter_sources
+from image_analysis import PILForensicAnalyzer
+
+CALIBRATION_VERSION = 2
+METRICS = ("ela_variance", "noise_ratio", "color_corr", "fft_peak_ratio")
+MIN_SAMPLES = 10
+
+# Percentile of the reference distribution used for each threshold.
+# Reference images are authentic, so thresholds sit in the tails.
+DEFAULT_PERCENTILES = {
+    "ela_very_low": 1.0,
+    "ela_low": 5.0,
+    "ela_high": 95.0,
+    "ela_very_high": 99.0,
+    "noise_ratio_max": 95.0,
+    "color_corr_low": 5.0,
+    "resampling_fft_peak_ratio": 95.0,
+}
+
+_worker_analyzer: Optional[PILForensicAnalyzer] = None
+
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = PILForensicAnalyzer()
+
+
+def _measure(path: str) -> Tuple[str, Optional[Dict[str, float]], Optional[str]]:
+    try:
+        return path, _worker_analyzer.measure_calibration_metrics(path), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def sample_key(path: str) -> str:
+    """Identity of a reference image: its resolved path (one sample per image)."""
+    return os.path.realpath(path)
+
+
+def file_version(path: str) -> Dict[str, int]:
+    """Size and mtime of an image; a sample whose version differs is stale."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _upgrade_v1(samples: Dict[str, Dict[str, float]]) -> Dict[str, Dict]:
+    """Re-key version 1 samples ("path|size|mtime") by path, keeping each image's newest sample."""
+    upgraded: Dict[str, Dict] = {}
+    for key, metrics in samples.items():
+        path, size, mtime_ns = key.rsplit("|", 2)
+        sample = {"size": int(size), "mtime_ns": int(mtime_ns), "metrics": metrics}
+        path = sample_key(path)
+        if path not in upgraded or sample["mtime_ns"] > upgraded[path]["mtime_ns"]:
+            upgraded[path] = sample
+    return upgraded
+
+
+def load_calibration(path: Path) -> Dict:
+    """Load a calibration file (upgrading older versions), or return an empty one."""
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == 1:
+            data["samples"] = _upgrade_v1(data.get("samples", {}))
+            data["version"] = CALIBRATION_VERSION
+        if data.get("version") == CALIBRATION_VERSION:
+            return data
+    return {"version": CALIBRATION_VERSION, "samples": {}, "thresholds": {}, "statistics": {}}
+
+
+def save_calibration(calibration: Dict, path: Path):
+    """Write a calibration file atomically."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(calibration, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def derive_thresholds(
+    samples: Iterable[Dict[str, float]],
+    percentiles: Optional[Dict[str, float]] = None,
+) -> Tuple[Dict, Dict]:
+    """
+    Derive analyzer thresholds from metric samples.
+
+    Args:
+        samples: Per-image metric dicts
+        percentiles: Overrides for DEFAULT_PERCENTILES
+
+    Returns:
+        Tuple of (thresholds in PILForensicAnalyzer layout, per-metric summary statistics)
+    """
+    p = {**DEFAULT_PERCENTILES, **(percentiles or {})}
+    values = {
+        metric: np.array([s[metric] for s in samples if np.isfinite(s.get(metric, np.nan))], dtype=np.float64)
+        for metric in METRICS
+    }
+
+    statistics = {
+        metric: {
+            "count": int(v.size),
+            "mean": float(v.mean()) if v.size else None,
+            "std": float(v.std()) if v.size else None,
+            "p5": float(np.percentile(v, 5)) if v.size else None,
+            "p50": float(np.percentile(v, 50)) if v.size else None,
+            "p95": float(np.percentile(v, 95)) if v.size else None,
+        }
+        for metric, v in values.items()
+    }
+
+    def pct(metric: str, key: str) -> Optional[float]:
+        v = values[metric]
+        return round(float(np.percentile(v, p[key])), 4) if v.size >= MIN_SAMPLES else None
+
+    thresholds: Dict = {}
+    ela = {
+        "very_low": pct("ela_variance", "ela_very_low"),
+        "low": pct("ela_variance", "ela_low"),
+        "high": pct("ela_variance", "ela_high"),
+        "very_high": pct("ela_variance", "ela_very_high"),
+    }
+    if all(value is not None for value in ela.values()):
+        thresholds["ela"] = ela
+    for key, metric in (
+        ("noise_ratio_max", "noise_ratio"),
+        ("color_corr_low", "color_corr"),
+        ("resampling_fft_peak_ratio", "fft_peak_ratio"),
+    ):
+        value = pct(metric, key)
+        if value is not None:
+            thresholds[key] = value
+
+    return thresholds, statistics
+
+
+def calibrate(
+    inputs: Iterable[str],
+    calibration_path: Path,
+    workers: Optional[int] = None,
+    percentiles: Optional[Dict[str, float]] = None,
+    prune_missing: bool = False,
+    progress_interval: float = 5.0,
+) -> Dict:
+    """
+    Measure new reference images and update the persisted thresholds.
+
+    Args:
+        inputs: Reference directories, globs, list files or image paths
+        calibration_path: JSON calibration file (created if missing)
+        workers: Worker processes (defaults to the CPU count)
+        percentiles: Overrides for DEFAULT_PERCENTILES
+        prune_missing: Drop samples whose image no longer exists
+        progress_interval: Seconds between progress lines
+
+    Returns:
+        The updated calibration dict (with ``thresholds``)
+    """
+    calibration_path = Path(calibration_path)
+    calibration = load_calibration(calibration_path)
+    samples: Dict[str, Dict] = calibration["samples"]
+
+    keys = {}
+    versions = {}
+    for source in iter_sources(inputs):
+        if os.path.isfile(source):
+            key = sample_key(source)
+            keys[key] = source
+            versions[key] = file_version(source)
+
+    pending: List[str] = []
+    for key, source in keys.items():
+        sample = samples.get(key)
+        if sample is None or {k: sample.get(k) for k in versions[key]} != versions[key]:
+            # New or edited: a stale sample must not outlive a failed re-measurement
+            samples.pop(key, None)
+            pending.append(source)
+
+    if prune_missing:
+        for key in list(samples):
+            if key not in keys and not os.path.exists(key):
+                del samples[key]
+
+    errors: Dict[str, str] = {}
+    if pending:
+        progress = ProgressReporter(len(pending), interval=progress_interval)
+        key_for = {source: key for key, source in keys.items()}
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker) as executor:
+            futures = [executor.submit(_measure, source) for source in pending]
+            for future in as_completed(futures):
+                source, metrics, error = future.result()
+                if metrics is None:
+                    errors[source] = error
+                else:
+                    key = key_for[source]
+                    samples[key] = {**versions[key], "metrics": {m: round(metrics[m], 6) for m in METRICS}}
+                progress.update(failed=metrics is None)
+        progress.report()
+
+    thresholds, statistics = derive_thresholds([s["metrics"] for s in samples.values()], percentiles)
+    calibration.update({
+        "version": CALIBRATION_VERSION,
+        "updated": datetime.now().isoformat(),
+        "sample_count": len(samples),
+        "percentiles": {**DEFAULT_PERCENTILES, **(percentiles or {})},
+        "thresholds": thresholds,
+        "statistics": statistics,
+        "last_run": {"measured": len(pending) - len(errors), "failed": len(errors), "errors": errors},
+    })
+    save_calibration(calibration, calibration_path)
+    return calibration
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Calibrate PILForensicAnalyzer thresholds from reference images")
+    parser.add_argument("inputs", nargs="+", help="Reference directories, glob patterns, .txt path lists or files")
+    parser.add_argument("-o", "--output", default="calibration.json", help="Calibration file (updated in place)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--prune-missing", action="store_true", help="Drop samples for images that no longer exist")
+    args = parser.parse_args(argv)
+
+    start = time.monotonic()
+    calibration = calibrate(args.inputs, Path(args.output), workers=args.workers, prune_missing=args.prune_missing)
+    print(json.dumps({
+        "sample_count": calibration["sample_count"],
+        "last_run": {k: v for k, v in calibration["last_run"].items() if k != "errors"},
+        "thresholds": calibration["thresholds"],
+        "elapsed": round(time.monotonic() - start, 2),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
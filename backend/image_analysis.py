@@ -1,14 +1,29 @@
-from PIL import Image, ImageChops, ImageEnhance, ImageFilter, ImageStat
-import numpy as np
+from PIL import Image
+import copy
 import json
-import os
-import requests
 from datetime import datetime
-import hashlib
 from pathlib import Path
 from io import BytesIO
-import math
-from collections import defaultdict
+
+from backend.config import settings
+from backend.forensics.detectors import (
+    DEFAULT_THRESHOLDS,
+    PIL_ANALYZER_DETECTORS,
+    color_correlation,
+    ela_variance,
+    features_from_tiled,
+    fft_peak_ratio,
+    get_detection_engine,
+    noise_ratio,
+    registry,
+)
+from backend.forensics.features import FeatureStore
+from backend.forensics.prescreen import get_quantization_tables
+from backend.forensics.registry import DetectionContext
+from backend.forensics.tiling import TiledStatistics
+from backend.services.url_fetcher import get_url_fetcher
+
+URL_IMAGE_EXTENSIONS = (".jpg", ".png", ".tiff", ".bmp", ".gif", ".webp")
 
 class PILForensicAnalyzer:
     """
@@ -16,33 +31,72 @@ class PILForensicAnalyzer:
     - Adds: JPEG quantization inspection, resampling detection (FFT peaks),
       median-filter tampering detection, color-channel correlation, EXIF-camera checks,
       adaptive thresholds calibrated from a folder of reference images.
+    - Pixel and forensic detectors come from the shared registry
+      (backend.forensics.detectors) and run cheapest first; once the risk
+      score reaches the critical threshold the remaining ones are skipped.
     """
 
-    def __init__(self, calibration=None):
+    def __init__(self, calibration=None, memoize_features=True, detectors=None, early_exit=True):
         # results and state
-        self.results = {
-            'metadata_anomalies': [],
-            'pixel_anomalies': [],
-            'forensic_indicators': [],
-            'risk_score': 0,
-            'analysis_timestamp': datetime.now().isoformat()
-        }
+        self._reset_results()
         self.image_path = ""
         self.original_image = None
+        self._features = None
+        self._detector_score = 0
+        self.memoize_features = memoize_features
+        self._tiled_stats = None
+        self.tiled_min_pixels = settings.TILED_ANALYSIS_MIN_PIXELS
+
+        # registry detectors to run (validated up front) and the shared engine
+        self.detectors = [d.name for d in registry.select(detectors or PIL_ANALYZER_DETECTORS)]
+        self.early_exit = early_exit
+        self.engine = get_detection_engine()
 
         # calibration thresholds (default values, will be overridden by calibrate())
-        self.thresholds = {
-            'ela': { 'very_low': 15, 'low': 40, 'high': 600, 'very_high': 1000 },
-            'noise_ratio_max': 3.0,
-            'edge_consistency_diff': 20,
-            'resampling_fft_peak_ratio': 8.0,
-            'color_corr_low': 0.85,
-            'clone_block_size': 32,
-            'clone_distance_min_blocks': 2
-        }
+        self.thresholds = copy.deepcopy(DEFAULT_THRESHOLDS)
 
         # calibration summary stats (populated by calibrate_from_folder)
         self.calibration_summary = calibration or {}
+        self._apply_calibration(self.calibration_summary)
+
+    def _apply_calibration(self, calibration):
+        """Override default thresholds with calibrated ones (nested 'ela' dict is merged)."""
+        for key, value in (calibration or {}).get('thresholds', {}).items():
+            if isinstance(value, dict) and isinstance(self.thresholds.get(key), dict):
+                self.thresholds[key] = {**self.thresholds[key], **value}
+            else:
+                self.thresholds[key] = value
+
+    @classmethod
+    def from_calibration_file(cls, path):
+        """Create an analyzer using thresholds persisted by calibrate_from_folder."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(calibration=json.load(f))
+
+    def calibrate_from_folder(self, folder, calibration_path='calibration.json', workers=None, percentiles=None):
+        """
+        Calibrate thresholds from a folder of authentic reference images.
+
+        Metrics are computed in parallel and stored per image in
+        ``calibration_path``; re-running only processes images that are new or
+        changed since the last run. Returns the calibration dict.
+        """
+        from calibration import calibrate
+
+        calibration = calibrate([str(folder)], Path(calibration_path), workers=workers, percentiles=percentiles)
+        self.calibration_summary = calibration
+        self._apply_calibration(calibration)
+        return calibration
+
+    def _reset_results(self):
+        """Start a fresh result set, so one analyzer can process many images."""
+        self.results = {
+            'metadata_anomalies': [],
+            'pixel_anomalies': [],
+            'forensic_indicators': [],
+            'risk_score': 0,
+            'analysis_timestamp': datetime.now().isoformat()
+        }
 
     # -----------------------------
     # Input selection / main pipeline
@@ -59,43 +113,106 @@ class PILForensicAnalyzer:
             else:
                 print("❌ Invalid response. Please type 'A' for file or 'B' for URL.\n")
 
-    def analyze_image(self):
-        """Complete forensic analysis using PIL"""
+    def analyze_image(self, source=None):
+        """
+        Complete forensic analysis using PIL.
+
+        ``source`` may be a file path or an http(s) URL; when omitted the
+        user is prompted for one (interactive mode).
+        """
         try:
-            ans = self.url_or_file()
-
-            if ans == "A":
-                self.image_path = Path(input("Please paste the Image File Path here: ").strip().strip('"').strip("'"))
-
-                with Image.open(self.image_path) as img:
-                    if img.format not in ["JPEG", "PNG", "TIFF"]:
-                        img = img.convert("RGB")
-                    self.original_image = img.copy()
-                    # Run analyses
-                    self._analyze_metadata(img)
-                    self._analyze_pixel_anomalies(img)
-                    self._deep_forensic_inspection(img)
-                    self._calculate_risk_score()
-                    return self.results
-
-            elif ans == "B":
-                self.image_path = input("Please paste the Image URL here: ").strip()
-                response = requests.get(self.image_path, timeout=30)
-                response.raise_for_status()
-
-                with Image.open(BytesIO(response.content)) as img:
-                    if img.format not in ["JPEG", "PNG", "TIFF"]:
-                        img = img.convert("RGB")
-                    self.original_image = img.copy()
-                    self._analyze_metadata(img)
-                    self._analyze_pixel_anomalies(img)
-                    self._deep_forensic_inspection(img)
-                    self._calculate_risk_score()
-                    return self.results
+            if source is None:
+                ans = self.url_or_file()
+                if ans == "A":
+                    source = Path(input("Please paste the Image File Path here: ").strip().strip('"').strip("'"))
+                else:
+                    source = input("Please paste the Image URL here: ").strip()
+
+            self._reset_results()
+            if isinstance(source, str) and source.lower().startswith(("http://", "https://")):
+                return self.analyze_url(source)
+            return self.analyze_file(source)
 
         except Exception as e:
             return {'error': f'Analysis failed: {str(e)}'}
 
+    def analyze_file(self, path):
+        """Analyze an image file (non-interactive)."""
+        self._reset_results()
+        self.image_path = Path(path)
+        with Image.open(self.image_path) as img:
+            return self._run_analyses(img, self.image_path)
+
+    def analyze_url(self, url):
+        """
+        Download and analyze an image URL (non-interactive).
+
+        The download goes through the shared URL fetcher: pooled connections,
+        abort past MAX_FILE_SIZE, content sniffing, and an ETag/Last-Modified
+        disk cache, so re-checking an unchanged image costs one 304.
+        """
+        self._reset_results()
+        self.image_path = url
+        resource = get_url_fetcher().fetch_sync(url, URL_IMAGE_EXTENSIONS)
+
+        source = BytesIO(resource.content)
+        with Image.open(source) as img:
+            return self._run_analyses(img, source)
+
+    def _run_analyses(self, img, source):
+        """Run every detector on an opened image; ``source`` is its path or buffer."""
+        img = self._prepare_image(img, source)
+
+        self._analyze_metadata(img)
+        self._run_detectors(img)
+        self._calculate_risk_score()
+        self.results['tiled_analysis'] = self._tiled_stats is not None
+        return self.results
+
+    def _prepare_image(self, img, source):
+        """Reset per-image caches and pick in-memory or tiled mode; returns the image to analyze."""
+        self._features = None
+        self._tiled_stats = None
+
+        width, height = img.size
+        if width * height >= self.tiled_min_pixels and img.format in ["JPEG", "PNG", "TIFF", "BMP"]:
+            # Very large image: stream tiles instead of holding full-size copies.
+            # Only the size of original_image is used later, so keep it lazy.
+            self._tiled_stats = TiledStatistics(
+                tile_size=settings.TILED_ANALYSIS_TILE_SIZE,
+                max_decode_pixels=settings.TILED_MAX_DECODE_PIXELS,
+                clone_block_size=self.thresholds.get('clone_block_size', 32),
+            ).compute(source)
+            self.original_image = img
+        else:
+            if img.format not in ["JPEG", "PNG", "TIFF"]:
+                img = img.convert("RGB")
+            self.original_image = img.copy()
+
+        # Primitives (RGB, gray, ELA, noise map, FFT) are computed once per image.
+        # Tiled mode seeds the store with the streamed statistics; detectors
+        # needing anything else (the FFT check) use the thumbnail.
+        # Quantization tables always come from the header of the original.
+        header = {'quantization_tables': get_quantization_tables(img)}
+        if self._tiled_stats:
+            self._features = features_from_tiled(self._tiled_stats, memoize=self.memoize_features, extra=header)
+        else:
+            self._features = FeatureStore(img, memoize=self.memoize_features, precomputed=header)
+        return img
+
+    def measure_calibration_metrics(self, path):
+        """Compute the calibrated metrics (ELA variance, noise ratio, colour correlation, FFT peak ratio) for one image."""
+        self._reset_results()
+        self.image_path = Path(path)
+        with Image.open(self.image_path) as img:
+            self._prepare_image(img, self.image_path)
+            return {
+                'ela_variance': ela_variance(self._features),
+                'noise_ratio': noise_ratio(self._features),
+                'color_corr': color_correlation(self._features),
+                'fft_peak_ratio': fft_peak_ratio(self._features),
+            }
+
     # -----------------------------
     # Metadata analysis (enhanced)
     # -----------------------------
@@ -144,307 +261,37 @@ class PILForensicAnalyzer:
         self.results['metadata_anomalies'] = anomalies
 
     # -----------------------------
-    # Pixel-level analysis (improved)
-    # -----------------------------
-    def _analyze_pixel_anomalies(self, img):
-        anomalies = []
-        img_rgb = img.convert('RGB')
-
-        # ELA
-        ela_result = self._perform_ela(img_rgb)
-        ela_variance = float(np.array(ela_result).var())
-
-        ela_risk = self._interpret_ela_with_context(ela_variance, img)
-        if ela_risk['level'] != 'NORMAL':
-            anomalies.append(ela_risk['message'])
-
-        # noise ratio (local)
-        noise_ratio = self._calc_noise_ratio(img_rgb)
-        if noise_ratio > self.thresholds.get('noise_ratio_max', 3.0):
-            anomalies.append(f"NOISE_INCONSISTENCY: noise_ratio={noise_ratio:.2f}")
-
-        # color-channel correlation
-        color_corr = self._calc_color_correlation(img_rgb)
-        if color_corr < self.thresholds.get('color_corr_low', 0.85):
-            anomalies.append(f"COLOR_CHANNEL_LOW_CORR: corr={color_corr:.2f}")
-
-        # edge consistency
-        edge_anoms = self._check_edge_consistency(img_rgb)
-        anomalies.extend(edge_anoms)
-
-        # JPEG quantization (if available)
-        q_anom = self._analyze_quantization_tables(img_rgb)
-        if q_anom:
-            anomalies.append(q_anom)
-
-        # add to results
-        self.results['ela_variance'] = ela_variance
-        self.results['ela_interpretation'] = ela_risk
-        self.results['noise_ratio'] = noise_ratio
-        self.results['color_channel_corr'] = color_corr
-        self.results['pixel_anomalies'] = anomalies
-
-        return anomalies
-
-    def _interpret_ela_with_context(self, ela_variance, img):
-        # Use calibrated thresholds if available, else fallback to defaults.
-        t = self.thresholds.get('ela', {})
-        very_low = t.get('very_low', 15)
-        low = t.get('low', 40)
-        high = t.get('high', 600)
-        very_high = t.get('very_high', 1000)
-
-        is_web_image = str(self.image_path).startswith(('http://', 'https://'))
-        image_size = img.size
-        total_pixels = image_size[0] * image_size[1]
-        # treat small images more tolerant
-        if is_web_image or total_pixels < 1_000_000:
-            # slightly relax boundaries
-            very_low *= 0.9
-            low *= 0.95
-
-        # Interpretation
-        if ela_variance < very_low:
-            return {'level': 'HIGH_RISK', 'message': 'EXTREMELY_LOW_ELA: possible synthetic or over-smoothed image.', 'risk_boost': 12}
-        elif ela_variance < low:
-            return {'level': 'LOW_RISK', 'message': 'LOW_ELA: likely recompressed/web image or slight processing.', 'risk_boost': 1}
-        elif ela_variance > very_high:
-            return {'level': 'HIGH_RISK', 'message': 'VERY_HIGH_ELA: strong manipulation signal (multiple edits).', 'risk_boost': 12}
-        elif ela_variance > high:
-            return {'level': 'MEDIUM_RISK', 'message': 'HIGH_ELA_VARIANCE: inconsistent compression patterns.', 'risk_boost': 6}
-        else:
-            return {'level': 'NORMAL', 'message': 'Normal compression pattern', 'risk_boost': 0}
-
-    # -----------------------------
-    # Deep forensic inspection (new detectors)
-    # -----------------------------
-    def _deep_forensic_inspection(self, img):
-        indicators = []
-
-        img_rgb = img.convert('RGB')
-
-        # clone detection
-        clone_regions = self._detect_clone_regions(img_rgb, block_size=self.thresholds.get('clone_block_size', 32))
-        if clone_regions:
-            indicators.append(f"CLONE_DETECTED: {len(clone_regions)} similar regions found.")
-
-        # resampling detection via FFT peaks
-        if self._detect_resampling_fft(img_rgb):
-            indicators.append("RESAMPLING_DETECTED: Periodic patterns in frequency domain suggest resizing/resampling.")
-
-        # median filter / local smoothing detection
-        if self._detect_median_filter(img_rgb):
-            indicators.append("MEDIAN_FILTER_DETECTED: Strong median filtering/smoothing detected.")
-
-        # noise pattern
-        if not self._analyze_noise_patterns(img_rgb):
-            indicators.append("NOISE_INCONSISTENCY: Uneven noise distribution detected.")
-
-        # compression artifacts
-        if self._analyze_compression_artifacts(img_rgb):
-            indicators.append("COMPRESSION_ANOMALIES: Multiple compression levels detected.")
-
-        # color temperature
-        if self._analyze_color_temperature(img_rgb):
-            indicators.append("COLOR_TEMPERATURE_INCONSISTENCY: Lighting inconsistency detected.")
-
-        self.results['forensic_indicators'] = indicators
-
-    # -----------------------------
-    # Helper & detection functions
+    # Pixel-level and forensic detectors (shared registry)
     # -----------------------------
-    def _perform_ela(self, img, quality=90):
-        temp_path = "_temp_ela.jpg"
-        img.save(temp_path, "JPEG", quality=quality)
-        recompressed = Image.open(temp_path)
-        ela_image = ImageChops.difference(img, recompressed)
-        ela_image = ImageEnhance.Brightness(ela_image).enhance(20)
-        try:
-            os.remove(temp_path)
-        except OSError:
-            pass
-        return ela_image
-
-    def _calc_noise_ratio(self, img):
-        """Return ratio max_noise / min_noise across sampled regions (used in your previous logic)."""
-        width, height = img.size
-        region_size = min(100, max(1, width // 4), max(1, height // 4))
-        regions = []
-        for y in range(0, max(1, height - region_size), region_size):
-            for x in range(0, max(1, width - region_size), region_size):
-                region = img.crop((x, y, x + region_size, y + region_size))
-                gray = region.convert('L')
-                blurred = gray.filter(ImageFilter.GaussianBlur(2))
-                noise = ImageChops.difference(gray, blurred)
-                stat = ImageStat.Stat(noise)
-                noise_level = stat.var[0] if stat.var else 0.0
-                regions.append(noise_level)
-        if not regions:
-            return 0.0
-        mx = max(regions)
-        mn = min(regions) if min(regions) > 0 else 1e-5
-        return mx / mn
-
-    def _calc_color_correlation(self, img):
-        """Pearson-like correlation between R,G,B channels (mean over image)."""
-        arr = np.array(img).astype(float)
-        r = arr[..., 0].ravel()
-        g = arr[..., 1].ravel()
-        b = arr[..., 2].ravel()
-        # numerical stability: if nearly constant, correlation not meaningful
-        def corr(a, b):
-            if np.std(a) < 1e-5 or np.std(b) < 1e-5:
-                return 1.0
-            return float(np.corrcoef(a, b)[0, 1])
-        rg = corr(r, g)
-        rb = corr(r, b)
-        gb = corr(g, b)
-        return float(np.mean([rg, rb, gb]))
-
-    def _calc_edge_diff(self, img):
-        gray = img.convert('L')
-        edges1 = gray.filter(ImageFilter.FIND_EDGES)
-        edges2 = gray.filter(ImageFilter.EDGE_ENHANCE_MORE)
-        stat1, stat2 = ImageStat.Stat(edges1), ImageStat.Stat(edges2)
-        return abs(stat1.mean[0] - stat2.mean[0])
-
-    def _check_edge_consistency(self, img):
-        anomalies = []
-        edge_diff = self._calc_edge_diff(img)
-        if edge_diff > self.thresholds.get('edge_consistency_diff', 20):
-            anomalies.append("EDGE_CONSISTENCY: Edge structures differ significantly.")
-        return anomalies
-
-    def _detect_clone_regions(self, img, block_size=32):
-        width, height = img.size
-        hashes = {}
-        similar_blocks = []
-
-        def phash(block):
-            resample = getattr(Image, "Resampling", None)
-            if resample:
-                small = block.resize((8, 8), Image.Resampling.LANCZOS).convert('L')
-            else:
-                small = block.resize((8, 8), Image.LANCZOS).convert('L')
-            pixels = np.array(small)
-            return hashlib.md5(pixels.tobytes()).hexdigest()
-
-        step_y = max(1, block_size)
-        step_x = max(1, block_size)
-        for y in range(0, max(1, height - block_size), step_y):
-            for x in range(0, max(1, width - block_size), step_x):
-                block = img.crop((x, y, min(x + block_size, width), min(y + block_size, height)))
-                h = phash(block)
-                if h in hashes:
-                    prev_x, prev_y = hashes[h]
-                    dist = math.hypot(x - prev_x, y - prev_y)
-                    if dist > block_size * self.thresholds.get('clone_distance_min_blocks', 2):
-                        similar_blocks.append({'block1': (prev_x, prev_y), 'block2': (x, y)})
-                else:
-                    hashes[h] = (x, y)
-        return similar_blocks[:10]
-
-    def _analyze_compression_artifacts(self, img):
-        ela = self._perform_ela(img)
-        var = ImageStat.Stat(ela).var[0]
-        return var > 1000
-
-    def _analyze_color_temperature(self, img):
-        r, g, b = img.split()
-        rs, gs, bs = ImageStat.Stat(r).mean[0], ImageStat.Stat(g).mean[0], ImageStat.Stat(b).mean[0]
-        rg_ratio = rs / max(gs, 1e-5)
-        rb_ratio = rs / max(bs, 1e-5)
-        return abs(rg_ratio - 1.0) > 0.2 or abs(rb_ratio - 1.0) > 0.2
-
-    # JPEG quantization table inspection
-    def _analyze_quantization_tables(self, img):
-        """
-        PIL stores quantization tables (if JPEG) in img.info['quantization'] (a dict).
-        Large or uniform quantization tables may indicate heavy recompression or social-media processing.
-        """
-        try:
-            qtables = img.info.get('quantization', None)
-        except Exception:
-            qtables = None
-
-        if not qtables:
-            return None
-
-        # compute simple heuristics: avg q value and variance
-        all_vals = []
-        for q in qtables.values():
-            all_vals.extend(list(q))
-        if not all_vals:
-            return None
-        avg_q = np.mean(all_vals)
-        var_q = np.var(all_vals)
-        # heuristics
-        if avg_q > 40:
-            return f"HIGH_QUANTIZATION: avg={avg_q:.1f}, var={var_q:.1f}"
-        elif var_q < 20 and avg_q > 20:
-            return f"UNIFORM_QUANTIZATION_LOW_VAR: avg={avg_q:.1f}, var={var_q:.1f}"
-        else:
-            return None
-
-    # median filter detection (local smoothing detector)
-    def _detect_median_filter(self, img):
-        gray = img.convert('L')
-        # apply median filter
-        med = gray.filter(ImageFilter.MedianFilter(size=3))
-        diff = ImageChops.difference(gray, med)
-        # if a lot of pixels changed very little, that suggests median smoothing removal of texture
-        stat = ImageStat.Stat(diff)
-        mean_diff = stat.mean[0]
-        # conservative threshold
-        return mean_diff < 1.0  # True -> median filter likely applied
-
-    # resampling detection using FFT (look for periodic peaks)
-    def _detect_resampling_fft(self, img):
-        gray = img.convert('L')
-        arr = np.array(gray, dtype=float)
-        # reduce size for FFT speed
-        h, w = arr.shape
-        max_dim = 512
-        if max(h, w) > max_dim:
-            scale = max_dim / float(max(h, w))
-            arr = np.array(gray.resize((int(w*scale), int(h*scale)), Image.Resampling.LANCZOS), dtype=float)
-
-        # compute 2D FFT magnitude and centralize
-        f = np.fft.fft2(arr)
-        fshift = np.fft.fftshift(f)
-        magnitude = np.abs(fshift)
-        # radial average and look for peaks away from DC
-        center = (magnitude.shape[0]//2, magnitude.shape[1]//2)
-        # compute average magnitude excluding central low-frequency region
-        r0 = 5
-        mag_no_dc = magnitude.copy()
-        mag_no_dc[center[0]-r0:center[0]+r0+1, center[1]-r0:center[1]+r0+1] = 0.0
-        # flatten and take top values
-        flat = mag_no_dc.ravel()
-        top_mean = float(np.mean(np.sort(flat)[-50:])) if flat.size >= 50 else float(np.mean(flat))
-        median_mag = float(np.median(flat))
-        if median_mag <= 0:
-            return False
-        ratio = top_mean / (median_mag + 1e-8)
-        return ratio > self.thresholds.get('resampling_fft_peak_ratio', 8.0)
-
-    # noise patterns (kept from your original)
-    def _analyze_noise_patterns(self, img):
-        width, height = img.size
-        regions = []
-        region_size = min(100, max(1, width//4), max(1, height//4))
-
-        for y in range(0, max(1, height - region_size), region_size):
-            for x in range(0, max(1, width - region_size), region_size):
-                region = img.crop((x, y, x + region_size, y + region_size))
-                gray = region.convert('L')
-                blurred = gray.filter(ImageFilter.GaussianBlur(2))
-                noise = ImageChops.difference(gray, blurred)
-                stat = ImageStat.Stat(noise)
-                noise_level = stat.var[0] if stat.var else 0
-                regions.append(noise_level)
-
-        return (max(regions) / max(1e-5, min(regions))) < self.thresholds.get('noise_ratio_max', 3.0) if regions else True
+    def _run_detectors(self, img):
+        """Run the selected registry detectors, cheapest first, and file their results."""
+        context = DetectionContext(
+            features=self._features,
+            thresholds=self.thresholds,
+            width=img.size[0],
+            height=img.size[1],
+            is_web_image=str(self.image_path).startswith(('http://', 'https://')),
+        )
+        base_score = self._metadata_score()
+        result = self.engine.run(context, self.detectors, base_score=base_score, early_exit=self.early_exit)
+
+        for name in result.executed:
+            outcome = result.outcomes[name]
+            if outcome.triggered:
+                target = 'pixel_anomalies' if registry.get(name).category == 'pixel' else 'forensic_indicators'
+                self.results[target].append(outcome.message)
+            for key in ('ela_variance', 'ela_interpretation', 'noise_ratio', 'color_channel_corr'):
+                if key in outcome.metrics:
+                    self.results[key] = outcome.metrics[key]
+
+        self._detector_score = result.score - base_score
+        self.results['detectors'] = {
+            'executed': result.executed,
+            'skipped': result.skipped,
+            'early_exit': result.exited_early,
+            'timings': result.timings,
+            'errors': {name: o.error for name, o in result.outcomes.items() if o.error},
+        }
 
     # -----------------------------
     # Compression normalization and scoring
@@ -496,9 +343,8 @@ class PILForensicAnalyzer:
                 matches.append({'profile': profile_name, 'message': profile['message'], 'confidence': confidence, 'size_match': size_match})
         return matches
 
-    def _calculate_risk_score(self):
+    def _metadata_score(self):
         score = 0
-        # metadata
         for a in self.results.get('metadata_anomalies', []):
             if "NO_EXIF_DATA" in a:
                 score += 2
@@ -508,40 +354,14 @@ class PILForensicAnalyzer:
                 score += 12
             else:
                 score += 5
+        return score
 
-        # pixel anomalies
-        for a in self.results.get('pixel_anomalies', []):
-            score += 6
-
-        # forensic indicators
-        for a in self.results.get('forensic_indicators', []):
-            if "CLONE" in a:
-                score += 20
-            elif "NOISE" in a:
-                score += 10
-            elif "COMPRESSION" in a:
-                score += 6
-            elif "COLOR_TEMPERATURE" in a:
-                score += 10
-            elif "RESAMPLING" in a:
-                score += 15
-            elif "MEDIAN_FILTER" in a:
-                score += 12
-            else:
-                score += 8
-
-        # ELA-derived boost
-        ela_interp = self.results.get('ela_interpretation', {})
-        if ela_interp:
-            score += ela_interp.get('risk_boost', 0)
-
-        # extreme ela variance
-        ela_var = float(self.results.get('ela_variance', 0))
-        if ela_var < 15 or ela_var > 1000:
-            score += 5
+    def _calculate_risk_score(self):
+        # metadata points plus the detector weights (ELA boosts included)
+        score = self._metadata_score() + self._detector_score
 
         # finalize
-        self.results['risk_score'] = min(100, score)
+        self.results['risk_score'] = int(min(100, round(score)))
 
         if self.original_image:
             self._apply_compression_normalization(self.original_image)
@@ -549,8 +369,8 @@ class PILForensicAnalyzer:
             self.results['compression_adjustment'] = "No original image available for compression normalization."
             self.results.setdefault('likely_source', 'unknown')
 
-    def generate_report(self):
-        analysis = self.analyze_image()
+    def generate_report(self, source=None):
+        analysis = self.analyze_image(source)
 
         if "error" in analysis:
             return {
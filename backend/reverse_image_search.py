@@ -1,7 +1,9 @@
-from serpapi import GoogleSearch
+import asyncio
 import json
 from pathlib import Path
 
+from backend.providers import REVERSE_SEARCH, ProviderClient
+
 class ReverseImageSearch():
     def __init__(self):
         self.query = input("Is this an Image URL or Image File?\nImage URL: A\nImage File: B\n").capitalize()
@@ -13,29 +15,38 @@ class ReverseImageSearch():
         elif self.query == "B":
             self.image_data = input("Please key in the image file path here: ")
         else:
-            self.url_or_file(self.query)
+            self.query = input("Please answer A (Image URL) or B (Image File): ").capitalize()
+            self.url_or_file()
 
     def search_now(self):
-        if self.image_data == "A":
-            self.image_data = self.query_2
-        elif self.image_data == "B":
-            self.image_data = Path(self.query_2)
-        params = {
-        "engine": "google_reverse_image",
-        "image_url": self.image_data,
-        "api_key": "d7459bdda259a14757a9335dbf6ddcbbda8093482ae160a3afa79aa0d46abdf8"
-        }
-
-        search = GoogleSearch(params)
-        results = search.get_dict()
-
-        try: 
-            json.dumps(results["image_results"], indent=4, ensure_ascii=False)
-        except KeyError:
-            if results["error"] == "Google Reverse Image hasn't returned any results for this query.":
-                message = "This image is original."
+        # API keys (SERPAPI_API_KEY, GOOGLE_VISION_API_KEY, ...) come from settings / .env
+        if self.query == "A":
+            results = asyncio.run(self.search(image_url=self.image_data))
         else:
+            image_path = Path(str(self.image_data).strip('"'))
+            results = asyncio.run(self.search(image_bytes=image_path.read_bytes(), file_name=image_path.name))
+
+        if not results:
+            return "No reverse image search provider is configured for this input."
+
+        matches = [url for result in results if result.ok for url in result.matches]
+        errors = {result.provider: result.error for result in results if not result.ok}
+        if errors:
+            print(json.dumps(errors, indent=4, ensure_ascii=False))
+
+        if matches:
+            print(json.dumps(matches, indent=4, ensure_ascii=False))
             message = "This image was stolen."
+        else:
+            message = "This image is original."
         return message
 
-ris = ReverseImageSearch()
+    async def search(self, **query):
+        client = ProviderClient()
+        try:
+            return await client.query(REVERSE_SEARCH, **query)
+        finally:
+            await client.aclose()
+
+if __name__ == "__main__":
+    ris = ReverseImageSearch()
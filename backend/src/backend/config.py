@@ -26,11 +26,73 @@ class Settings(BaseSettings):
     # Temporary file storage
     UPLOAD_DIR: str = "/tmp/uploads"
 
+    # URL ingestion (streamed downloads, on-disk ETag/Last-Modified cache)
+    URL_FETCH_TIMEOUT: float = 20.0  # Seconds per request
+    URL_FETCH_MAX_CONNECTIONS: int = 20
+    URL_FETCH_ALLOW_PRIVATE: bool = False  # Allow URLs resolving to private/loopback addresses
+    URL_CACHE_DIR: str = "/tmp/url_cache"
+    URL_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
     # Corroboration settings
     AUDIT_LOG_PATH: str = "/tmp/corroboration_audit"
+    REPORT_STORE_PATH: str = "/tmp/corroboration_audit/reports.sqlite3"  # Indexed report store (SQLite, WAL)
+    REPORT_STORE_COMPACT: bool = True  # Interned strings + zlib; False stores plain JSON
+    REPORT_COMPRESSION_LEVEL: int = 6  # zlib level of the compact encoding
+    REPORT_CACHE_SIZE: int = 256  # Parsed reports (with rendered markdown) kept in memory
+    REPORT_ETAG_CACHE_SIZE: int = 8192  # ETags remembered for 304s after a report is evicted
+    AUDIT_QUEUE_SIZE: int = 1024  # Reports waiting for the background writer before requests block
+    AUDIT_BATCH_SIZE: int = 256  # Reports written per group commit
+    AUDIT_BATCH_WINDOW: float = 0.05  # Seconds a batch may wait to fill
+    AUDIT_FSYNC: bool = True  # fsync the JSONL audit logs after every batch
+    AUDIT_SEGMENT_HOURS: int = 24  # Time span of one audit log segment (a divisor of 24)
+    AUDIT_INDEX_INTERVAL: int = 64  # Entries per sparse index block
+    AUDIT_COMPACT_AFTER_DAYS: float = 7  # Gzip segments idle this long (0 = never)
+    AUDIT_RETENTION_DAYS: float = 0  # Delete segments idle this long (0 = keep forever)
+    AUDIT_MAINTENANCE_INTERVAL: float = 3600.0  # Seconds between retention/compaction passes
     ENABLE_REVERSE_IMAGE_SEARCH: bool = False  # Set to True when API keys are configured
     ENABLE_ADVANCED_FORENSICS: bool = True
 
+    # Local perceptual-hash index (private near-duplicate search)
+    ENABLE_LOCAL_IMAGE_INDEX: bool = True
+    IMAGE_INDEX_PATH: str = "/tmp/corroboration_audit/image_index.sqlite3"
+    IMAGE_INDEX_MAX_DISTANCE: int = 6  # Hamming radius on both pHash and dHash
+
+    # Ingestion guard (content sniffing; decode budget checked from image headers before any decode)
+    IMAGE_MAX_PIXELS: int = 100_000_000  # Decoded pixels per frame; larger JPEGs are draft-decoded at 1/2-1/8
+    IMAGE_MAX_FRAMES: int = 32
+    IMAGE_MAX_DECODE_BYTES: int = 1024 * 1024 * 1024  # Estimated decode memory over all frames
+
+    # Image analysis worker pool
+    IMAGE_ANALYSIS_EXECUTOR: str = "thread"  # "thread" or "process"
+    IMAGE_ANALYSIS_WORKERS: int = 0  # 0 = use CPU count
+
+    FRAME_ANALYSIS_CONCURRENCY: int = 2  # Pages of one multi-frame image decoded and analysed at once
+
+    # Error Level Analysis recompression qualities (90 is the reference quality)
+    ELA_QUALITIES: List[int] = [75, 85, 90, 95]
+
+    # Tiled analysis for very large images
+    TILED_ANALYSIS_MIN_PIXELS: int = 40_000_000  # Stream images at or above this size
+    TILED_ANALYSIS_TILE_SIZE: int = 1600
+    TILED_MAX_DECODE_PIXELS: int = 100_000_000  # JPEGs above this use draft decoding
+
+    # Forensic heat maps (compact grids stored with reports, PNGs rendered on demand)
+    HEATMAP_GRID_EDGE: int = 256
+    HEATMAP_RENDER_EDGE: int = 1024
+
+    # AI-generation classifier (calibrated logistic regression over pixel statistics)
+    AI_CLASSIFIER_PATH: str = ""  # Trained model (JSON); empty = heuristic confidence
+    AI_CLASSIFIER_THRESHOLD: float = 0.5  # Probability above which an image counts as AI-generated
+
+    # Tamper-region localisation (connected components of thresholded forensic maps)
+    TAMPER_LOCALIZATION: bool = True
+    TAMPER_REGION_GRID_EDGE: int = 64  # Cells along the longer image edge
+    TAMPER_MAX_REGIONS: int = 5
+
+    # Quick pre-screen (/analyze-image/quick)
+    QUICK_SCREEN_DRAFT_REDUCTION: int = 8  # Decode at 1/4 or 1/8 scale
+    QUICK_SCREEN_THRESHOLD: float = 0.5  # Suspicion score that triggers full analysis
+
     # External API keys (optional - add to .env file)
     GOOGLE_VISION_API_KEY: str = ""
     TINEYE_API_KEY: str = ""
@@ -39,6 +101,16 @@ class Settings(BaseSettings):
     HIVE_AI_API_TOKEN: str = ""
     SIGHTENGINE_API_USER: str = ""
     SIGHTENGINE_API_SECRET: str = ""
+    SERPAPI_API_KEY: str = ""
+
+    # External provider client (shared pool, limits, circuit breaker, cache)
+    ENABLE_EXTERNAL_AI_DETECTION: bool = False  # Set to True when Sightengine/Hive keys are configured
+    PROVIDER_TIMEOUT: float = 15.0  # Seconds per request
+    PROVIDER_MAX_CONNECTIONS: int = 20
+    PROVIDER_CIRCUIT_FAILURES: int = 5  # Consecutive failures before the circuit opens
+    PROVIDER_CIRCUIT_RESET: float = 30.0  # Seconds before a trial request is allowed
+    PROVIDER_CACHE_SIZE: int = 1024
+    PROVIDER_CACHE_TTL: float = 24 * 3600.0
 
     # Risk scoring thresholds
     RISK_THRESHOLD_LOW: float = 25.0
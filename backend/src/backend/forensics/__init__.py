@@ -0,0 +1,22 @@
+"""Shared forensic primitives used by the image analyzers."""
+
+from backend.forensics.executor import DetectorPool, get_detector_pool
+from backend.forensics.registry import (
+    DetectionContext,
+    DetectionEngine,
+    Detector,
+    DetectorOutcome,
+    DetectorRegistry,
+    EngineResult,
+)
+
+__all__ = [
+    "DetectionContext",
+    "DetectionEngine",
+    "Detector",
+    "DetectorOutcome",
+    "DetectorPool",
+    "DetectorRegistry",
+    "EngineResult",
+    "get_detector_pool",
+]
@@ -0,0 +1,370 @@
+"""
+Calibrated AI-generation classifier over the fused pixel statistics.
+
+A logistic regression on a handful of features the analyzers already compute
+(see ``AI_FEATURES``), trained offline with Newton's method (IRLS) and
+Platt-calibrated on a held-out split, so its output is a probability rather
+than a share of heuristic weights. Models are stored as small JSON files and
+scored with one matrix product for any number of images.
+
+Usage:
+    python -m backend.forensics.classifier train /corpus -o ai_classifier.json
+    python -m backend.forensics.classifier predict ai_classifier.json image.jpg ...
+
+The training corpus holds one subdirectory per label: ``ai/`` (generated
+images) and ``authentic/``.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from backend.config import settings
+from backend.forensics.pixelstats import pixel_statistics
+
+MODEL_VERSION = 1
+
+# Feature names, in model column order
+AI_FEATURES = (
+    "log_noise_level",
+    "color_entropy",
+    "edge_score",
+    "log_symmetry_difference",
+    "color_correlation",
+    "log_pixel_variance",
+    "quadrant_variance_spread",
+    "channel_mean_spread",
+)
+
+# Pixel statistics the features are derived from
+STAT_NAMES = (
+    "noise_level",
+    "color_entropy",
+    "edge_score",
+    "symmetry_difference",
+    "color_correlation",
+    "pixel_variance",
+    "quadrant_variances",
+    "channel_means",
+)
+
+LABEL_DIRECTORIES = {"ai": 1, "authentic": 0}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".webp"}
+
+
+def ai_features(stats: Mapping[str, Any]) -> np.ndarray:
+    """
+    Feature vector of one image.
+
+    Args:
+        stats: Pixel statistics (at least the ``STAT_NAMES`` entries of
+            PixelStatistics.compute())
+
+    Returns:
+        float64 array ordered as ``AI_FEATURES``
+    """
+    quadrants = np.asarray(stats["quadrant_variances"], dtype=np.float64)
+    means = np.asarray(stats["channel_means"], dtype=np.float64)
+    return np.array([
+        math.log1p(stats["noise_level"]),
+        stats["color_entropy"],
+        stats["edge_score"],
+        math.log1p(stats["symmetry_difference"]),
+        stats["color_correlation"],
+        math.log1p(stats["pixel_variance"]),
+        float(quadrants.std() / (quadrants.mean() + 1.0)),
+        float((means.max() - means.min()) / 255.0),
+    ], dtype=np.float64)
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def _fit_logistic(design: np.ndarray, labels: np.ndarray, l2: float, max_iter: int = 50) -> np.ndarray:
+    """
+    L2-regularised logistic regression by iteratively reweighted least squares.
+
+    The last column of ``design`` is the intercept and is not regularised.
+    """
+    n_params = design.shape[1]
+    penalty = np.full(n_params, l2)
+    penalty[-1] = 0.0
+    coefficients = np.zeros(n_params)
+    for _ in range(max_iter):
+        p = _sigmoid(design @ coefficients)
+        gradient = design.T @ (p - labels) + penalty * coefficients
+        hessian = (design.T * (p * (1.0 - p))) @ design + np.diag(penalty + 1e-9)
+        step = np.linalg.solve(hessian, gradient)
+        coefficients -= step
+        if np.abs(step).max() < 1e-8:
+            break
+    return coefficients
+
+
+@dataclass
+class AIClassifier:
+    """
+    Standardised logistic regression with Platt calibration.
+
+    Attributes:
+        mean: Per-feature training mean
+        scale: Per-feature training standard deviation
+        weights: Coefficients of the standardised features
+        bias: Intercept
+        calibration: Platt ``(a, b)``; probability = sigmoid(a * logit + b)
+        feature_names: Feature order the model was trained with
+        metrics: Held-out evaluation recorded at training time
+    """
+
+    mean: np.ndarray
+    scale: np.ndarray
+    weights: np.ndarray
+    bias: float
+    calibration: Tuple[float, float] = (1.0, 0.0)
+    feature_names: Tuple[str, ...] = AI_FEATURES
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def fit(
+        cls,
+        features: np.ndarray,
+        labels: np.ndarray,
+        l2: float = 1.0,
+        calibration_fraction: float = 0.25,
+        seed: int = 0,
+    ) -> "AIClassifier":
+        """
+        Train on a labelled feature matrix.
+
+        A stratified ``calibration_fraction`` of the samples is held out: the
+        regression is fitted on the rest, the Platt scaling on the held-out
+        logits, and the held-out log loss, Brier score and accuracy are
+        stored in ``metrics``. Without enough held-out samples of both
+        classes the model is fitted on everything and left uncalibrated.
+
+        Args:
+            features: (n, len(AI_FEATURES)) matrix from ai_features()
+            labels: 1 for AI-generated, 0 for authentic
+            l2: Ridge penalty on the standardised coefficients
+            calibration_fraction: Share of each class held out for calibration
+            seed: Seed of the held-out split
+
+        Raises:
+            ValueError: If the shapes disagree or a class is missing
+        """
+        features = np.asarray(features, dtype=np.float64)
+        labels = np.asarray(labels, dtype=np.float64)
+        if features.ndim != 2 or features.shape[0] != labels.shape[0]:
+            raise ValueError("features must be (n, d) with one label per row")
+        if labels.min() == labels.max():
+            raise ValueError("Training data must contain both AI-generated and authentic images")
+
+        rng = np.random.default_rng(seed)
+        held_out = np.zeros(labels.shape[0], dtype=bool)
+        for value in (0.0, 1.0):
+            members = np.flatnonzero(labels == value)
+            count = int(len(members) * calibration_fraction)
+            if count < 10:
+                held_out[:] = False
+                break
+            held_out[rng.choice(members, count, replace=False)] = True
+        train = ~held_out
+
+        mean = features[train].mean(axis=0)
+        scale = features[train].std(axis=0)
+        scale[scale < 1e-12] = 1.0
+        standardised = (features - mean) / scale
+        design = np.hstack([standardised, np.ones((len(labels), 1))])
+        coefficients = _fit_logistic(design[train], labels[train], l2)
+        model = cls(mean=mean, scale=scale, weights=coefficients[:-1], bias=float(coefficients[-1]))
+
+        if held_out.any():
+            logits = model.decision_function(features[held_out])
+            platt = _fit_logistic(np.column_stack([logits, np.ones_like(logits)]), labels[held_out], l2=1e-3)
+            model.calibration = (float(platt[0]), float(platt[1]))
+            model.metrics = evaluate(model, features[held_out], labels[held_out])
+        model.metrics["train_samples"] = int(train.sum())
+        model.metrics["calibration_samples"] = int(held_out.sum())
+        return model
+
+    def decision_function(self, features: np.ndarray) -> np.ndarray:
+        """Uncalibrated logits of an (n, d) feature matrix."""
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        return ((features - self.mean) / self.scale) @ self.weights + self.bias
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Calibrated probability of being AI-generated, for every row at once.
+
+        Args:
+            features: (n, d) matrix (or a single (d,) vector)
+
+        Returns:
+            (n,) array of probabilities
+        """
+        a, b = self.calibration
+        return _sigmoid(a * self.decision_function(features) + b)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": MODEL_VERSION,
+            "features": list(self.feature_names),
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "weights": self.weights.tolist(),
+            "bias": self.bias,
+            "calibration": list(self.calibration),
+            "metrics": self.metrics,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "AIClassifier":
+        """
+        Rebuild a model saved with to_dict().
+
+        Raises:
+            ValueError: If the model was saved by another version or for other features
+        """
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported AI classifier version: {data.get('version')}")
+        if tuple(data["features"]) != AI_FEATURES:
+            raise ValueError("AI classifier was trained on a different feature set")
+        return cls(
+            mean=np.asarray(data["mean"], dtype=np.float64),
+            scale=np.asarray(data["scale"], dtype=np.float64),
+            weights=np.asarray(data["weights"], dtype=np.float64),
+            bias=float(data["bias"]),
+            calibration=tuple(data.get("calibration", (1.0, 0.0))),
+            metrics=dict(data.get("metrics", {})),
+        )
+
+    def save(self, path: Path):
+        """Write the model as JSON (atomically)."""
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=1))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "AIClassifier":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+def evaluate(model: AIClassifier, features: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    """Log loss, Brier score and accuracy (at 0.5) of ``model`` on labelled samples."""
+    labels = np.asarray(labels, dtype=np.float64)
+    p = np.clip(model.predict_proba(features), 1e-7, 1 - 1e-7)
+    return {
+        "log_loss": round(float(-np.mean(labels * np.log(p) + (1 - labels) * np.log(1 - p))), 4),
+        "brier": round(float(np.mean((p - labels) ** 2)), 4),
+        "accuracy": round(float(np.mean((p >= 0.5) == (labels == 1))), 4),
+    }
+
+
+_classifier: Optional[AIClassifier] = None
+_classifier_path: Optional[str] = None
+
+
+def get_ai_classifier() -> Optional[AIClassifier]:
+    """The model at ``settings.AI_CLASSIFIER_PATH`` (loaded once), or None when unset."""
+    global _classifier, _classifier_path
+    path = settings.AI_CLASSIFIER_PATH
+    if not path:
+        return None
+    if _classifier is None or _classifier_path != path:
+        _classifier = AIClassifier.load(Path(path))
+        _classifier_path = path
+    return _classifier
+
+
+# -----------------------------
+# Offline feature extraction, training and batch scoring
+# -----------------------------
+def image_features(path: str) -> np.ndarray:
+    """Feature vector of an image file."""
+    with Image.open(path) as image:
+        return ai_features(pixel_statistics(np.asarray(image.convert("RGB"))))
+
+
+def feature_matrix(paths: Sequence[str], workers: Optional[int] = None) -> Tuple[np.ndarray, List[str]]:
+    """
+    Features of many images, extracted in a process pool.
+
+    Returns:
+        (matrix of the readable images, their paths); unreadable files are
+        reported on stderr and skipped
+    """
+    rows: List[np.ndarray] = []
+    kept: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(path, pool.submit(image_features, path)) for path in paths]
+        for path, future in futures:
+            try:
+                rows.append(future.result())
+                kept.append(path)
+            except Exception as e:
+                print(f"Skipping {path}: {e}", file=sys.stderr)
+    matrix = np.vstack(rows) if rows else np.zeros((0, len(AI_FEATURES)))
+    return matrix, kept
+
+
+def labelled_corpus(root: Path) -> List[Tuple[str, int]]:
+    """(path, label) of every image under ``root/ai`` and ``root/authentic``."""
+    samples = []
+    for directory, label in LABEL_DIRECTORIES.items():
+        for path in sorted((root / directory).rglob("*")):
+            if path.suffix.lower() in IMAGE_SUFFIXES:
+                samples.append((str(path), label))
+    return samples
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="Train a model from a labelled corpus")
+    train.add_argument("corpus", type=Path, help="Directory with ai/ and authentic/ subdirectories")
+    train.add_argument("-o", "--output", type=Path, default=Path("ai_classifier.json"))
+    train.add_argument("--l2", type=float, default=1.0, help="Ridge penalty")
+    train.add_argument("--calibration-fraction", type=float, default=0.25)
+    train.add_argument("--workers", type=int, default=None)
+
+    predict = commands.add_parser("predict", help="Score images with a trained model (JSON lines)")
+    predict.add_argument("model", type=Path)
+    predict.add_argument("images", nargs="+")
+    predict.add_argument("--workers", type=int, default=None)
+
+    args = parser.parse_args(argv)
+    if args.command == "train":
+        samples = labelled_corpus(args.corpus)
+        labels_by_path = dict(samples)
+        features, paths = feature_matrix([path for path, _ in samples], args.workers)
+        labels = np.array([labels_by_path[path] for path in paths])
+        try:
+            model = AIClassifier.fit(features, labels, l2=args.l2, calibration_fraction=args.calibration_fraction)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        model.save(args.output)
+        print(json.dumps({"output": str(args.output), **model.metrics}))
+        return 0
+
+    model = AIClassifier.load(args.model)
+    features, paths = feature_matrix(args.images, args.workers)
+    for path, probability in zip(paths, model.predict_proba(features) if paths else []):
+        print(json.dumps({"path": path, "ai_probability": round(float(probability), 4)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""Blockwise 8x8 DCT statistics and double-JPEG-compression detection."""
+
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Sequence
+
+import numpy as np
+from scipy.ndimage import median_filter, uniform_filter
+
+BLOCK = 8
+
+# Low/mid AC frequencies in zig-zag order (row-major indices into an 8x8 block);
+# higher frequencies are mostly quantised to zero and carry no periodicity
+ANALYSIS_FREQUENCIES = (1, 8, 16, 9, 2, 3, 10, 17, 24, 32, 25, 18, 11, 4, 5)
+
+# Raw (unquantised) coefficient range kept in the histograms
+HISTOGRAM_RANGE = 512
+
+
+def _dct_matrix(n: int = BLOCK) -> np.ndarray:
+    """Orthonormal DCT-II basis, as used by JPEG."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    basis = np.cos((2 * i + 1) * k * np.pi / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+_DCT = _dct_matrix()
+
+
+def block_dct(gray: np.ndarray) -> np.ndarray:
+    """
+    DCT coefficients of every full 8x8 block, as JPEG computes them.
+
+    The level-shifted image is viewed as a (rows, cols, 8, 8) stack and
+    transformed with a single batched matrix product; partial blocks at the
+    right/bottom edge are ignored.
+
+    Args:
+        gray: 2D luminance array (uint8 or float)
+
+    Returns:
+        float32 array of shape (rows, cols, 64), coefficients in row-major order
+    """
+    rows, cols = gray.shape[0] // BLOCK, gray.shape[1] // BLOCK
+    if rows == 0 or cols == 0:
+        return np.zeros((rows, cols, BLOCK * BLOCK), dtype=np.float32)
+
+    blocks = gray[:rows * BLOCK, :cols * BLOCK].astype(np.float32)
+    blocks -= 128.0
+    blocks = blocks.reshape(rows, BLOCK, cols, BLOCK).swapaxes(1, 2)
+    coefficients = _DCT @ blocks @ _DCT.T
+    return coefficients.reshape(rows, cols, BLOCK * BLOCK)
+
+
+def coefficient_histograms(
+    coefficients: np.ndarray,
+    frequencies: Sequence[int] = ANALYSIS_FREQUENCIES,
+) -> np.ndarray:
+    """
+    Histograms of rounded raw coefficients for each analysed frequency.
+
+    Histograms of disjoint block sets can simply be added, so tiled analyses
+    accumulate them tile by tile.
+
+    Returns:
+        int64 array of shape (len(frequencies), 2 * HISTOGRAM_RANGE + 1); bin
+        ``HISTOGRAM_RANGE`` holds the value 0
+    """
+    width = 2 * HISTOGRAM_RANGE + 1
+    values = coefficients.reshape(-1, BLOCK * BLOCK)[:, list(frequencies)]
+    bins = np.clip(np.rint(values), -HISTOGRAM_RANGE, HISTOGRAM_RANGE).astype(np.intp)
+    bins += HISTOGRAM_RANGE + np.arange(len(frequencies), dtype=np.intp) * width
+    counts = np.bincount(bins.ravel(), minlength=width * len(frequencies))
+    return counts.reshape(len(frequencies), width)
+
+
+def quantization_steps(
+    qtables: Optional[Mapping[int, Sequence[int]]],
+    frequencies: Sequence[int] = ANALYSIS_FREQUENCIES,
+) -> Optional[List[int]]:
+    """Luminance quantization step of each analysed frequency (None without a JPEG table)."""
+    table = list(qtables.get(0, ())) if qtables else []
+    if len(table) < BLOCK * BLOCK:
+        return None
+    return [max(1, int(table[f])) for f in frequencies]
+
+
+def estimate_steps(histograms: np.ndarray, max_step: int = 32, min_share: float = 0.7) -> List[int]:
+    """
+    Estimate each frequency's last quantization step from raw histograms.
+
+    Coefficients of a decoded JPEG sit on multiples of the step, up to the
+    pixel rounding error, so the step is the largest ``p`` for which most
+    non-zero coefficients are exact multiples of ``p``. For a random lattice
+    that share is about ``1 / p``; never-compressed images yield 1.
+    """
+    values = np.arange(-HISTOGRAM_RANGE, HISTOGRAM_RANGE + 1)
+    significant = np.abs(values) > 1
+    steps = []
+    for histogram in histograms:
+        counts = histogram[significant]
+        total = counts.sum()
+        step = 1
+        if total >= 50:
+            for p in range(max_step, 1, -1):
+                if counts[values[significant] % p == 0].sum() >= min_share * total:
+                    step = p
+                    break
+        steps.append(step)
+    return steps
+
+
+def requantize(histogram: np.ndarray, step: int) -> np.ndarray:
+    """Re-bin a raw coefficient histogram to multiples of ``step`` (bin ``len // 2`` holds 0)."""
+    limit = HISTOGRAM_RANGE // step
+    raw = np.arange(-HISTOGRAM_RANGE, HISTOGRAM_RANGE + 1)
+    target = np.clip(np.rint(raw / step), -limit, limit).astype(np.intp) + limit
+    return np.bincount(target, weights=histogram, minlength=2 * limit + 1)
+
+
+def histogram_period(histogram: np.ndarray, max_period: int = 12, min_correlation: float = 0.4) -> int:
+    """
+    Period of the peaks-and-gaps pattern left by a second quantization.
+
+    The histogram is compared with its median-smoothed envelope; a double
+    quantization leaves a residual that repeats every few bins, which shows
+    up as a strong autocorrelation at that lag. The zero bin and its
+    neighbours are ignored, and only the bins holding 98% of the remaining
+    mass are used.
+
+    Args:
+        histogram: Quantised coefficient histogram (centre bin holds 0)
+        max_period: Largest lag considered
+        min_correlation: Normalised autocorrelation the best lag must reach
+
+    Returns:
+        Period in bins (1 when no periodic pattern is present)
+    """
+    centre = histogram.size // 2
+    mass = histogram.astype(np.float64)
+    mass[centre] = 0.0
+    total = mass.sum()
+    if total < 200:
+        return 1
+
+    radial = mass[centre:] + mass[centre::-1]
+    half = int(np.searchsorted(np.cumsum(radial), 0.98 * total)) + 1
+    half = min(max(half, 2 * max_period), centre)
+    window = histogram[centre - half:centre + half + 1].astype(np.float64)
+
+    envelope = median_filter(window, size=5, mode="nearest")
+    residual = (window - envelope) / np.sqrt(envelope + 1.0)
+    residual[half - 1:half + 2] = 0.0
+    residual -= residual.mean()
+    energy = float(np.dot(residual, residual))
+    if energy <= 0:
+        return 1
+
+    lags = np.arange(2, min(max_period, residual.size - 1) + 1)
+    if lags.size == 0:
+        return 1
+    correlation = np.array([np.dot(residual[:-lag], residual[lag:]) for lag in lags]) / energy
+    best = int(np.argmax(correlation))
+    return int(lags[best]) if correlation[best] >= min_correlation else 1
+
+
+@dataclass
+class DoubleJPEGAnalysis:
+    """
+    Result of the double-compression analysis.
+
+    Attributes:
+        periods: Detected period per analysed frequency (1 = none)
+        steps: Quantization step per analysed frequency
+        periodic_frequencies: Number of frequencies with a period of 2 or more
+        double_compressed: Whether enough frequencies show the pattern
+        block_map: Per 8x8 block probability that the block does not follow
+            the double-compression statistics (None without block coefficients)
+        tampered_ratio: Share of blocks with a probability above 0.5
+    """
+
+    periods: List[int]
+    steps: List[int]
+    periodic_frequencies: int
+    double_compressed: bool
+    block_map: Optional[np.ndarray] = None
+    tampered_ratio: float = 0.0
+
+
+def analyze_double_jpeg(
+    histograms: np.ndarray,
+    steps: Optional[Sequence[int]],
+    coefficients: Optional[np.ndarray] = None,
+    min_periodic: int = 5,
+    frequencies: Sequence[int] = ANALYSIS_FREQUENCIES,
+) -> DoubleJPEGAnalysis:
+    """
+    Detect double JPEG compression and localise blocks that break its pattern.
+
+    A second quantization with a different step leaves periodic peaks and
+    gaps in the per-frequency coefficient histograms. Blocks pasted from a
+    singly compressed source do not share that pattern: for every periodic
+    frequency a block's coefficient is scored by its share of the histogram
+    mass within its period (authentic model) against a uniform share
+    (tampered model), and the per-frequency likelihood ratios are combined
+    into a posterior probability per block.
+
+    Args:
+        histograms: coefficient_histograms() result
+        steps: Quantization step per frequency; when None (e.g. a decoded
+            JPEG saved as PNG) the steps are estimated with estimate_steps
+        coefficients: block_dct() result, needed for the localisation map
+        min_periodic: Periodic frequencies required to call the image double compressed
+        frequencies: Frequencies the histograms were built for
+
+    Returns:
+        DoubleJPEGAnalysis
+    """
+    if steps is None:
+        steps = estimate_steps(histograms)
+    quantised = [requantize(h, s) for h, s in zip(histograms, steps)]
+    periods = [histogram_period(h) for h in quantised]
+    periodic = [i for i, p in enumerate(periods) if p >= 2]
+    result = DoubleJPEGAnalysis(
+        periods=periods,
+        steps=list(steps),
+        periodic_frequencies=len(periodic),
+        double_compressed=len(periodic) >= min_periodic,
+    )
+    if not result.double_compressed or coefficients is None or coefficients.size == 0:
+        return result
+
+    rows, cols = coefficients.shape[:2]
+    flat = coefficients.reshape(-1, BLOCK * BLOCK)
+    log_ratio = np.zeros(rows * cols, dtype=np.float64)
+    for i in periodic:
+        hist, period = quantised[i], periods[i]
+        limit = hist.size // 2
+        # Share of each bin within its period (periods anchored at the zero bin)
+        k = np.arange(hist.size) - limit
+        group = np.floor_divide(k, period)
+        group_total = np.bincount(group - group.min(), weights=hist)[group - group.min()]
+        share = np.where(group_total > 0, hist / np.maximum(group_total, 1), 1.0 / period)
+        evidence = np.log(np.clip(share * period, 1e-3, None))
+
+        values = np.clip(np.rint(flat[:, frequencies[i]] / steps[i]), -limit, limit).astype(np.intp) + limit
+        log_ratio += evidence[values]
+
+    # Pool the evidence of each 3x3 block neighbourhood: single blocks are
+    # noisy, pasted regions span several blocks
+    log_ratio = uniform_filter(log_ratio.reshape(rows, cols), size=3, mode="nearest")
+
+    # P(tampered) = 1 / (1 + prod(P_authentic / P_tampered))
+    posterior = 1.0 / (1.0 + np.exp(np.clip(log_ratio, -50, 50)))
+    result.block_map = posterior.astype(np.float32)
+    result.tampered_ratio = float((posterior > 0.5).mean())
+    return result
@@ -0,0 +1,445 @@
+"""
+Built-in detectors of the shared registry.
+
+Every detector reads its primitives from the analysis' FeatureStore and its
+thresholds from the DetectionContext, so both analyzers (and the tiled path,
+which seeds the store with streamed statistics) run the same code. Weights
+are risk points on the 0-100 scale; costs are relative and only used to
+order execution.
+"""
+
+import hashlib
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageChops, ImageFilter, ImageStat
+
+from backend.config import settings
+from backend.forensics.classifier import AI_FEATURES, STAT_NAMES, ai_features, get_ai_classifier
+from backend.forensics.dct import DoubleJPEGAnalysis, analyze_double_jpeg, coefficient_histograms, quantization_steps
+from backend.forensics.ela import REFERENCE_QUALITY
+from backend.forensics.features import FeatureStore
+from backend.forensics.heatmaps import block_duplicates
+from backend.forensics.prescreen import assess_quantization, get_quantization_tables
+from backend.forensics.registry import DetectionContext, DetectionEngine, DetectorOutcome, DetectorRegistry
+
+DEFAULT_THRESHOLDS: Dict[str, Any] = {
+    'ela': {'very_low': 15, 'low': 40, 'high': 600, 'very_high': 1000},
+    'noise_ratio_max': 3.0,
+    'edge_consistency_diff': 20,
+    'resampling_fft_peak_ratio': 8.0,
+    'color_corr_low': 0.85,
+    'clone_block_size': 32,
+    'clone_distance_min_blocks': 2,
+    'clone_duplicate_ratio': 0.05,
+    'double_jpeg_block_ratio': 0.01,  # Share of 8x8 blocks that break the double-compression pattern
+    'noise_inconsistency_ratio': 50.0,  # 95th / 5th percentile of block noise variance
+    'ela_anomaly_ratio': 0.15,
+}
+
+# Default subsets: each entry point keeps the detectors it was tuned with
+IMAGE_ANALYZER_DETECTORS = (
+    "aspect_ratio",
+    "ai_edge_smoothness",
+    "ai_symmetry",
+    "ai_color_entropy",
+    "ai_noise_level",
+    "ai_classifier",
+    "compression_consistency",
+    "noise_inconsistency",
+    "clone_duplicates",
+    "ela_anomaly",
+)
+PIL_ANALYZER_DETECTORS = (
+    "quantization",
+    "color_temperature",
+    "edge_consistency",
+    "color_correlation",
+    "noise_ratio",
+    "noise_pattern",
+    "resampling_fft",
+    "median_filter",
+    "ela_variance",
+    "compression_artifacts",
+    "clone_regions",
+)
+
+registry = DetectorRegistry()
+
+
+def features_from_tiled(stats: Dict[str, Any], extra: Optional[Dict[str, Any]] = None, **kwargs) -> FeatureStore:
+    """
+    FeatureStore over the thumbnail of a tiled analysis, seeded with its streamed statistics.
+
+    Args:
+        stats: TiledStatistics.compute() result
+        extra: Further precomputed values (e.g. header-only quantization tables)
+        **kwargs: Passed to FeatureStore
+    """
+    precomputed = {k: v for k, v in stats.items() if k not in ("thumbnail", "ela")}
+    precomputed["ela_statistics"] = stats["ela"]
+    precomputed.update(extra or {})
+    return FeatureStore(Image.fromarray(stats["thumbnail"]), precomputed=precomputed, **kwargs)
+
+
+# -----------------------------
+# Metrics (cached in the feature store under their own names)
+# -----------------------------
+def ela_variance(features: FeatureStore) -> float:
+    """Variance of the 20x enhanced reference-quality ELA map."""
+    return features.get("ela_variance", lambda: float(features.ela.enhanced(REFERENCE_QUALITY, 20).var()))
+
+
+def noise_ratio(features: FeatureStore) -> float:
+    """Max/min regional noise variance."""
+    return float(features.noise_map.ratio)
+
+
+def color_correlation(features: FeatureStore) -> float:
+    """Mean pairwise Pearson correlation of the R, G and B channels."""
+    return _pixel_stat(features, "color_correlation")
+
+
+def fft_peak_ratio(features: FeatureStore) -> float:
+    """Mean of the 50 strongest non-DC FFT magnitudes relative to the median magnitude."""
+    def compute():
+        magnitude = features.fft_magnitude
+        center = (magnitude.shape[0] // 2, magnitude.shape[1] // 2)
+        r0 = 5
+        mag_no_dc = magnitude.copy()
+        mag_no_dc[center[0]-r0:center[0]+r0+1, center[1]-r0:center[1]+r0+1] = 0.0
+        flat = mag_no_dc.ravel()
+        top_mean = float(np.mean(np.sort(flat)[-50:])) if flat.size >= 50 else float(np.mean(flat))
+        median_mag = float(np.median(flat))
+        if median_mag <= 0:
+            return 0.0
+        return top_mean / (median_mag + 1e-8)
+    return features.get("fft_peak_ratio", compute)
+
+
+def _edge_diff(features: FeatureStore) -> float:
+    def compute():
+        gray = features.gray
+        stat1 = ImageStat.Stat(gray.filter(ImageFilter.FIND_EDGES))
+        stat2 = ImageStat.Stat(gray.filter(ImageFilter.EDGE_ENHANCE_MORE))
+        return abs(stat1.mean[0] - stat2.mean[0])
+    return features.get("edge_diff", compute)
+
+
+def _median_mean_diff(features: FeatureStore) -> float:
+    def compute():
+        gray = features.gray
+        med = gray.filter(ImageFilter.MedianFilter(size=3))
+        return ImageStat.Stat(ImageChops.difference(gray, med)).mean[0]
+    return features.get("median_mean_diff", compute)
+
+
+def _pixel_stat(features: FeatureStore, name: str) -> Any:
+    """One value of the fused pixel statistics (tiled analyses seed these individually)."""
+    return features.get(name, lambda: features.pixel_stats[name])
+
+
+def _quantization_tables(features: FeatureStore):
+    return features.get("quantization_tables", lambda: get_quantization_tables(features.image))
+
+
+def double_jpeg(features: FeatureStore) -> DoubleJPEGAnalysis:
+    """Double-compression analysis of the luminance DCT, with a per-block map when the full grid is available."""
+    def compute():
+        if features.has("dct_histograms"):
+            # Tiled analyses stream the histograms; the thumbnail has no block grid
+            histograms, coefficients = features.get("dct_histograms", lambda: None), None
+            if histograms is None:
+                return DoubleJPEGAnalysis(periods=[], steps=[], periodic_frequencies=0, double_compressed=False)
+        else:
+            coefficients = features.dct_coefficients
+            histograms = coefficient_histograms(coefficients)
+        return analyze_double_jpeg(histograms, quantization_steps(_quantization_tables(features)), coefficients)
+    return features.get("double_jpeg", compute)
+
+
+def _clone_pairs(features: FeatureStore, block_size: int, min_blocks: float) -> List[Dict]:
+    """Pairs of distant blocks whose 8x8 downscales are identical (first 10)."""
+    def compute():
+        img = features.rgb
+        width, height = img.size
+        hashes = {}
+        similar_blocks = []
+        step = max(1, block_size)
+        for y in range(0, max(1, height - block_size), step):
+            for x in range(0, max(1, width - block_size), step):
+                block = img.crop((x, y, min(x + block_size, width), min(y + block_size, height)))
+                small = block.resize((8, 8), Image.Resampling.LANCZOS).convert('L')
+                h = hashlib.md5(np.asarray(small).tobytes()).hexdigest()
+                if h in hashes:
+                    prev_x, prev_y = hashes[h]
+                    if math.hypot(x - prev_x, y - prev_y) > block_size * min_blocks:
+                        similar_blocks.append({'block1': (prev_x, prev_y), 'block2': (x, y)})
+                else:
+                    hashes[h] = (x, y)
+        return similar_blocks[:10]
+    return features.get("clone_pairs", compute)
+
+
+def clone_blocks(features: FeatureStore) -> Tuple[float, np.ndarray]:
+    """Duplicate ratio and match map of exactly repeated 32 px blocks."""
+    return features.get("clone_blocks", lambda: block_duplicates(features.rgb_array))
+
+
+def _flag(triggered: bool, weight: float, message: str = "", **metrics) -> DetectorOutcome:
+    return DetectorOutcome(triggered=triggered, score=weight if triggered else 0.0, message=message, metrics=metrics)
+
+
+# -----------------------------
+# Pixel-level detectors
+# -----------------------------
+def interpret_ela(variance: float, thresholds: Dict[str, Any], total_pixels: int, is_web_image: bool) -> Dict:
+    """Classify an ELA variance against (calibrated) thresholds, relaxed for small or web images."""
+    t = {**DEFAULT_THRESHOLDS['ela'], **thresholds.get('ela', {})}
+    very_low, low, high, very_high = t['very_low'], t['low'], t['high'], t['very_high']
+    if is_web_image or total_pixels < 1_000_000:
+        very_low *= 0.9
+        low *= 0.95
+
+    if variance < very_low:
+        return {'level': 'HIGH_RISK', 'message': 'EXTREMELY_LOW_ELA: possible synthetic or over-smoothed image.', 'risk_boost': 12}
+    elif variance < low:
+        return {'level': 'LOW_RISK', 'message': 'LOW_ELA: likely recompressed/web image or slight processing.', 'risk_boost': 1}
+    elif variance > very_high:
+        return {'level': 'HIGH_RISK', 'message': 'VERY_HIGH_ELA: strong manipulation signal (multiple edits).', 'risk_boost': 12}
+    elif variance > high:
+        return {'level': 'MEDIUM_RISK', 'message': 'HIGH_ELA_VARIANCE: inconsistent compression patterns.', 'risk_boost': 6}
+    return {'level': 'NORMAL', 'message': 'Normal compression pattern', 'risk_boost': 0}
+
+
+@registry.register("ela_variance", inputs=("ela",), cost=30, weight=23, category="pixel")
+def detect_ela_variance(ctx: DetectionContext) -> DetectorOutcome:
+    variance = ela_variance(ctx.features)
+    interpretation = interpret_ela(variance, ctx.thresholds, ctx.width * ctx.height, ctx.is_web_image)
+    abnormal = interpretation['level'] != 'NORMAL'
+    # anomaly (6) + context boost + extreme-variance bonus (5)
+    score = (6 if abnormal else 0) + interpretation['risk_boost'] + (5 if variance < 15 or variance > 1000 else 0)
+    return DetectorOutcome(
+        triggered=abnormal,
+        score=score,
+        message=interpretation['message'],
+        metrics={'ela_variance': variance, 'ela_interpretation': interpretation},
+    )
+
+
+@registry.register("noise_ratio", inputs=("noise_map",), cost=10, weight=6, category="pixel")
+def detect_noise_ratio(ctx: DetectionContext) -> DetectorOutcome:
+    ratio = noise_ratio(ctx.features)
+    return _flag(
+        ratio > ctx.thresholds.get('noise_ratio_max', 3.0), 6,
+        f"NOISE_INCONSISTENCY: noise_ratio={ratio:.2f}", noise_ratio=ratio,
+    )
+
+
+@registry.register("color_correlation", inputs=("pixel_stats",), cost=5, weight=6, category="pixel")
+def detect_color_correlation(ctx: DetectionContext) -> DetectorOutcome:
+    corr = color_correlation(ctx.features)
+    return _flag(
+        corr < ctx.thresholds.get('color_corr_low', 0.85), 6,
+        f"COLOR_CHANNEL_LOW_CORR: corr={corr:.2f}", color_channel_corr=corr,
+    )
+
+
+@registry.register("edge_consistency", inputs=("gray",), cost=5, weight=6, category="pixel")
+def detect_edge_consistency(ctx: DetectionContext) -> DetectorOutcome:
+    diff = _edge_diff(ctx.features)
+    return _flag(
+        diff > ctx.thresholds.get('edge_consistency_diff', 20), 6,
+        "EDGE_CONSISTENCY: Edge structures differ significantly.", edge_diff=diff,
+    )
+
+
+@registry.register("quantization", inputs=("header",), cost=0.1, weight=6, category="pixel", severity="low")
+def detect_quantization(ctx: DetectionContext) -> DetectorOutcome:
+    tables = _quantization_tables(ctx.features)
+    summary = assess_quantization(tables)
+    if not summary or not summary['label']:
+        return DetectorOutcome(triggered=False)
+    return _flag(True, 6, f"{summary['label']}: avg={summary['avg']:.1f}, var={summary['var']:.1f}")
+
+
+# -----------------------------
+# Forensic detectors
+# -----------------------------
+@registry.register("clone_regions", inputs=("rgb",), cost=60, weight=20, severity="high")
+def detect_clone_regions(ctx: DetectionContext) -> DetectorOutcome:
+    pairs = _clone_pairs(
+        ctx.features, ctx.thresholds.get('clone_block_size', 32), ctx.thresholds.get('clone_distance_min_blocks', 2),
+    )
+    return _flag(bool(pairs), 20, f"CLONE_DETECTED: {len(pairs)} similar regions found.", clone_pairs=len(pairs))
+
+
+@registry.register("resampling_fft", inputs=("fft_magnitude",), cost=12, weight=15, severity="medium")
+def detect_resampling_fft(ctx: DetectionContext) -> DetectorOutcome:
+    ratio = fft_peak_ratio(ctx.features)
+    return _flag(
+        ratio > ctx.thresholds.get('resampling_fft_peak_ratio', 8.0), 15,
+        "RESAMPLING_DETECTED: Periodic patterns in frequency domain suggest resizing/resampling.",
+        fft_peak_ratio=ratio,
+    )
+
+
+@registry.register("median_filter", inputs=("gray",), cost=15, weight=12, severity="medium")
+def detect_median_filter(ctx: DetectionContext) -> DetectorOutcome:
+    mean_diff = _median_mean_diff(ctx.features)
+    # many pixels barely changed by a 3x3 median -> texture already smoothed away
+    return _flag(
+        mean_diff < 1.0, 12,
+        "MEDIAN_FILTER_DETECTED: Strong median filtering/smoothing detected.", median_mean_diff=mean_diff,
+    )
+
+
+@registry.register("noise_pattern", inputs=("noise_map",), cost=10, weight=10, severity="low")
+def detect_noise_pattern(ctx: DetectionContext) -> DetectorOutcome:
+    noise_map = ctx.features.noise_map
+    uneven = noise_map.variances.size > 0 and noise_map.ratio >= ctx.thresholds.get('noise_ratio_max', 3.0)
+    return _flag(uneven, 10, "NOISE_INCONSISTENCY: Uneven noise distribution detected.")
+
+
+@registry.register("compression_artifacts", inputs=("dct",), cost=14, weight=6, severity="medium")
+def detect_compression_artifacts(ctx: DetectionContext) -> DetectorOutcome:
+    analysis = double_jpeg(ctx.features)
+    return _flag(
+        analysis.double_compressed, 6,
+        "COMPRESSION_ANOMALIES: Multiple compression levels detected "
+        f"(double quantization in {analysis.periodic_frequencies} DCT frequencies).",
+        periodic_frequencies=analysis.periodic_frequencies,
+    )
+
+
+@registry.register("color_temperature", inputs=("pixel_stats",), cost=5, weight=10, severity="low")
+def detect_color_temperature(ctx: DetectionContext) -> DetectorOutcome:
+    rs, gs, bs = _pixel_stat(ctx.features, "channel_means")
+    rg_ratio = rs / max(gs, 1e-5)
+    rb_ratio = rs / max(bs, 1e-5)
+    return _flag(
+        abs(rg_ratio - 1.0) > 0.2 or abs(rb_ratio - 1.0) > 0.2, 10,
+        "COLOR_TEMPERATURE_INCONSISTENCY: Lighting inconsistency detected.",
+        rg_ratio=rg_ratio, rb_ratio=rb_ratio,
+    )
+
+
+# -----------------------------
+# AI-generation heuristics (ImageAnalyzer confidence = score / total weight)
+# -----------------------------
+@registry.register("ai_noise_level", inputs=("pixel_stats",), cost=5, weight=12, category="ai")
+def detect_ai_noise_level(ctx: DetectionContext) -> DetectorOutcome:
+    # Laplacian variance of the channel-mean grayscale as noise estimate
+    level = _pixel_stat(ctx.features, "noise_level")
+    return _flag(level < 5.0, 12, "Very low sensor noise", noise_level=level)
+
+
+@registry.register("ai_color_entropy", inputs=("pixel_stats",), cost=5, weight=8, category="ai")
+def detect_ai_color_entropy(ctx: DetectionContext) -> DetectorOutcome:
+    entropy = _pixel_stat(ctx.features, "color_entropy")
+    return _flag(entropy < 5.0, 8, "Low colour entropy", color_entropy=entropy)
+
+
+@registry.register("ai_edge_smoothness", inputs=("pixel_stats",), cost=5, weight=8, category="ai")
+def detect_ai_edge_smoothness(ctx: DetectionContext) -> DetectorOutcome:
+    edge_score = _pixel_stat(ctx.features, "edge_score")
+    return _flag(edge_score > 0.8, 8, "Very consistent edges", edge_score=edge_score)
+
+
+@registry.register("ai_symmetry", inputs=("pixel_stats",), cost=5, weight=12, category="ai")
+def detect_ai_symmetry(ctx: DetectionContext) -> DetectorOutcome:
+    # Tiled analyses don't stream this one; it comes from the thumbnail's statistics
+    difference = _pixel_stat(ctx.features, "symmetry_difference")
+    return _flag(difference < 5.0, 12, "Near-perfect left-right symmetry", symmetry_difference=difference)
+
+
+@registry.register("ai_classifier", inputs=("pixel_stats",), cost=6, weight=0, category="ai")
+def detect_ai_classifier(ctx: DetectionContext) -> DetectorOutcome:
+    # Calibrated probability; ImageAnalyzer prefers it to the heuristic weights when a model is configured
+    model = get_ai_classifier()
+    if model is None:
+        return DetectorOutcome(triggered=False)
+    vector = ai_features({name: _pixel_stat(ctx.features, name) for name in STAT_NAMES})
+    probability = round(float(model.predict_proba(vector)[0]), 4)
+    return _flag(
+        probability >= settings.AI_CLASSIFIER_THRESHOLD, 0, "AI-generation classifier",
+        probability=probability, features=dict(zip(AI_FEATURES, np.round(vector, 4).tolist())),
+    )
+
+
+# -----------------------------
+# Tampering detectors (ImageAnalyzer findings)
+# -----------------------------
+@registry.register("ela_anomaly", inputs=("ela",), cost=32, weight=40, category="tampering", severity="critical")
+def detect_ela_anomaly(ctx: DetectionContext) -> DetectorOutcome:
+    stats = ctx.features.get("ela_statistics", lambda: ctx.features.ela.statistics())
+    reference = stats[REFERENCE_QUALITY]
+    if reference["max_error"] == 0:
+        return DetectorOutcome(triggered=False, metrics={"confidence": 0.0})
+
+    # Report errors on the brightness-normalised scale (max error -> 255)
+    mean_error = reference["mean_error"] * 255.0 / reference["max_error"]
+    anomaly_ratio = reference["anomaly_ratio"]
+    return _flag(
+        anomaly_ratio > ctx.thresholds.get('ela_anomaly_ratio', 0.15), 40,
+        "Image shows signs of tampering (ELA analysis)",
+        confidence=round(min(anomaly_ratio * 3, 1.0), 3),
+        anomaly_ratio=round(anomaly_ratio, 4),
+        mean_error=round(float(mean_error), 2),
+        max_error=255,
+        quality_curve={str(q): round(s["mean_error"], 3) for q, s in stats.items()},
+    )
+
+
+@registry.register("clone_duplicates", inputs=("rgb_array",), cost=20, weight=25, category="tampering", severity="high")
+def detect_clone_duplicates(ctx: DetectionContext) -> DetectorOutcome:
+    ratio = ctx.features.get("clone_duplicate_ratio", lambda: clone_blocks(ctx.features)[0])
+    return _flag(
+        ratio > ctx.thresholds.get('clone_duplicate_ratio', 0.05), 25,
+        "Detected potentially cloned/copied regions in image", duplicate_ratio=round(ratio, 4),
+    )
+
+
+@registry.register("compression_consistency", inputs=("dct",), cost=14, weight=15, category="tampering")
+def detect_compression_consistency(ctx: DetectionContext) -> DetectorOutcome:
+    # Blocks pasted into a double-compressed image don't share its DCT histogram pattern
+    analysis = double_jpeg(ctx.features)
+    return _flag(
+        analysis.double_compressed
+        and analysis.tampered_ratio >= ctx.thresholds.get('double_jpeg_block_ratio', 0.01),
+        15,
+        "Inconsistent compression levels detected across image",
+        double_compressed=analysis.double_compressed,
+        inconsistent_block_ratio=round(analysis.tampered_ratio, 4),
+    )
+
+
+@registry.register("noise_inconsistency", inputs=("noise_map",), cost=10, weight=5, category="tampering", severity="low")
+def detect_noise_inconsistency(ctx: DetectionContext) -> DetectorOutcome:
+    noise_map = ctx.features.noise_map
+    if noise_map.variances.size < 4:
+        return DetectorOutcome(triggered=False)
+    ratio = noise_map.robust_ratio()
+    return _flag(
+        ratio > ctx.thresholds.get('noise_inconsistency_ratio', 50.0), 5,
+        "Noise level varies strongly between image regions",
+        noise_inconsistency_ratio=round(ratio, 2), block_size=noise_map.block_size,
+    )
+
+
+@registry.register("aspect_ratio", inputs=("size",), cost=0, weight=2, category="tampering", severity="low")
+def detect_aspect_ratio(ctx: DetectionContext) -> DetectorOutcome:
+    # Unusual dimensions are common in fake documents
+    aspect_ratio = ctx.width / ctx.height
+    return _flag(
+        aspect_ratio > 5 or aspect_ratio < 0.2, 2,
+        f"Unusual aspect ratio: {aspect_ratio:.2f}", width=ctx.width, height=ctx.height,
+    )
+
+
+def get_detection_engine(critical_threshold: Optional[float] = None) -> DetectionEngine:
+    """Engine over the built-in registry; stops at the critical risk threshold by default."""
+    if critical_threshold is None:
+        critical_threshold = settings.RISK_THRESHOLD_HIGH
+    return DetectionEngine(registry, critical_threshold=critical_threshold)
@@ -0,0 +1,161 @@
+"""In-memory, multi-quality Error Level Analysis (ELA)."""
+
+import io
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_QUALITIES = (75, 85, 90, 95)
+
+# Quality used by the existing single-quality thresholds in both analyzers
+REFERENCE_QUALITY = 90
+
+# Difference values histogrammed per chunk (bincount widens its input to intp)
+_HISTOGRAM_CHUNK = 1 << 20
+
+
+def _difference(original: np.ndarray, recompressed: np.ndarray) -> np.ndarray:
+    # max - min stays in uint8 and avoids a signed temporary copy
+    return np.maximum(original, recompressed) - np.minimum(original, recompressed)
+
+
+def _row_bands(array: np.ndarray) -> Iterable[slice]:
+    rows = max(1, _HISTOGRAM_CHUNK // max(1, array[0].size))
+    return (slice(top, top + rows) for top in range(0, array.shape[0], rows))
+
+
+def difference_histogram(original: np.ndarray, recompressed: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    256-bin histogram of ``|original - recompressed|`` over all channels.
+
+    The difference is built a band of rows at a time, so no full-size map
+    (nor its widened copy) is ever allocated. Without ``recompressed``,
+    ``original`` is taken to be a difference map already.
+    """
+    counts = np.zeros(256, dtype=np.int64)
+    for band in _row_bands(original):
+        values = original[band] if recompressed is None else _difference(original[band], recompressed[band])
+        counts += np.bincount(values.ravel(), minlength=256)
+    return counts
+
+
+def histogram_statistics(counts: np.ndarray) -> Dict[str, float]:
+    """Mean, standard deviation, maximum and ``mean + 2 * std`` exceedance of a 256-bin histogram."""
+    total = int(counts.sum())
+    if total == 0:
+        return {"mean_error": 0.0, "std_error": 0.0, "max_error": 0, "anomaly_ratio": 0.0}
+    values = np.arange(256, dtype=np.float64)
+    mean = float((counts * values).sum() / total)
+    std = float(np.sqrt((counts * (values - mean) ** 2).sum() / total))
+    nonzero = np.flatnonzero(counts)
+    return {
+        "mean_error": mean,
+        "std_error": std,
+        "max_error": int(nonzero[-1]),
+        "anomaly_ratio": float(counts[values > mean + 2 * std].sum() / total),
+    }
+
+
+class ELAEngine:
+    """
+    Recompresses one image at several JPEG qualities and caches the results.
+
+    Recompression happens entirely in memory, so concurrent analyses never
+    share temporary files. Buffers a caller asks for (encoded bytes,
+    recompressions, difference maps) are cached on the engine, so every
+    detector that works on the same image (ELA, compression-artifact
+    analysis, heat maps) reuses them instead of re-encoding. ``statistics``
+    only needs histograms: it recompresses one quality at a time and drops
+    everything but the reference difference map, which the heat map and
+    variance detectors read afterwards.
+    """
+
+    def __init__(self, image: Image.Image, qualities: Sequence[int] = DEFAULT_QUALITIES):
+        """
+        Initialize the ELA engine.
+
+        Args:
+            image: Source image (converted to RGB if necessary)
+            qualities: JPEG qualities to recompress at
+        """
+        self.image = image if image.mode == "RGB" else image.convert("RGB")
+        self.original = np.asarray(self.image)
+        self.qualities = tuple(sorted(set(qualities) | {REFERENCE_QUALITY}))
+
+        self._encoded: Dict[int, bytes] = {}
+        self._recompressed: Dict[int, np.ndarray] = {}
+        self._differences: Dict[int, np.ndarray] = {}
+        self._enhanced: Dict[tuple, np.ndarray] = {}
+
+    @classmethod
+    def from_array(cls, img_array: np.ndarray, qualities: Sequence[int] = DEFAULT_QUALITIES) -> "ELAEngine":
+        """Build an engine from an RGB uint8 array."""
+        return cls(Image.fromarray(img_array), qualities=qualities)
+
+    def encoded(self, quality: int) -> bytes:
+        """JPEG bytes of the image recompressed at ``quality``."""
+        if quality not in self._encoded:
+            buffer = io.BytesIO()
+            self.image.save(buffer, format="JPEG", quality=quality)
+            self._encoded[quality] = buffer.getvalue()
+        return self._encoded[quality]
+
+    def recompressed(self, quality: int) -> np.ndarray:
+        """Decoded RGB array of the recompressed image."""
+        if quality not in self._recompressed:
+            with Image.open(io.BytesIO(self.encoded(quality))) as compressed:
+                self._recompressed[quality] = np.asarray(compressed.convert("RGB"))
+        return self._recompressed[quality]
+
+    def _decode(self, quality: int) -> np.ndarray:
+        """Recompression at ``quality``, without caching it (or its bytes) if not cached yet."""
+        if quality in self._recompressed:
+            return self._recompressed[quality]
+        data = self._encoded.get(quality)
+        if data is None:
+            buffer = io.BytesIO()
+            self.image.save(buffer, format="JPEG", quality=quality)
+            data = buffer.getvalue()
+        with Image.open(io.BytesIO(data)) as compressed:
+            return np.asarray(compressed.convert("RGB"))
+
+    def difference(self, quality: int) -> np.ndarray:
+        """Absolute per-pixel difference between the original and a recompression."""
+        if quality not in self._differences:
+            self._differences[quality] = _difference(self.original, self._decode(quality))
+        return self._differences[quality]
+
+    def histogram(self, quality: int) -> np.ndarray:
+        """256-bin histogram of the difference map at ``quality`` (all channels)."""
+        if quality in self._differences:
+            return difference_histogram(self._differences[quality])
+        return difference_histogram(self.original, self._decode(quality))
+
+    def enhanced(self, quality: int = REFERENCE_QUALITY, scale: float = 20.0) -> np.ndarray:
+        """Difference map multiplied by ``scale`` and clipped, like ``ImageEnhance.Brightness``."""
+        key = (quality, scale)
+        if key not in self._enhanced:
+            diff = self.difference(quality).astype(np.float32)
+            diff *= scale
+            np.clip(diff, 0, 255, out=diff)
+            self._enhanced[key] = diff.astype(np.uint8)
+        return self._enhanced[key]
+
+    def statistics(self, qualities: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, float]]:
+        """
+        Per-quality ELA statistics from 256-bin difference histograms.
+
+        Qualities are processed one at a time and their maps are never
+        stacked, so peak memory stays at about one recompression above the
+        source image however many qualities are requested. For each quality
+        the mean, standard deviation and maximum error are returned along
+        with the fraction of values above ``mean + 2 * std``.
+        """
+        stats = {}
+        for quality in tuple(qualities or self.qualities):
+            if quality == REFERENCE_QUALITY:
+                # Kept: the heat map and variance detectors read this map
+                self.difference(quality)
+            stats[quality] = histogram_statistics(self.histogram(quality))
+        return stats
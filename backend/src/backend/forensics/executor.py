@@ -0,0 +1,145 @@
+"""Worker pool for running CPU-bound forensic detectors off the event loop."""
+
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from backend.config import settings
+from backend.forensics.sharedmem import SharedArray
+
+
+def _timed_call(func: Callable, *args: Any) -> Tuple[Any, float]:
+    """Run ``func`` inside the worker and measure its own execution time."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class DetectorPool:
+    """
+    Dispatches synchronous detector functions to a thread or process pool.
+
+    Detectors are pure numpy/PIL work, so running them on the event loop blocks
+    every other request. Thread mode relies on numpy and PIL releasing the GIL
+    for the heavy kernels; process mode isolates large images completely but
+    requires the callables and arguments to be picklable.
+    """
+
+    MODES = ("thread", "process")
+
+    def __init__(self, max_workers: Optional[int] = None, mode: str = "thread"):
+        """
+        Initialize the detector pool.
+
+        Args:
+            max_workers: Number of workers (defaults to the CPU count)
+            mode: Either "thread" or "process"
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported executor mode: {mode}. Allowed: {list(self.MODES)}")
+
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """Underlying executor, created on first use."""
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="detector",
+                )
+        return self._executor
+
+    @property
+    def shares_memory(self) -> bool:
+        """Whether jobs see the caller's arrays directly (else pass SharedArray handles)."""
+        return self.mode == "thread"
+
+    async def run(self, func: Callable, *args: Any, shared: Sequence[SharedArray] = ()) -> Tuple[Any, float]:
+        """
+        Run a single detector in the pool.
+
+        Args:
+            func: Synchronous detector callable
+            *args: Positional arguments for the detector
+            shared: Shared arrays whose handles are among ``args``; the job
+                holds a reference to each until the worker has finished with
+                it, even if the awaiting request is cancelled first
+
+        Returns:
+            Tuple of (detector result, execution time in seconds)
+        """
+        for array in shared:
+            array.acquire()
+        try:
+            future = self.executor.submit(_timed_call, func, *args)
+        except BaseException:
+            for array in shared:
+                array.release()
+            raise
+        for array in shared:
+            future.add_done_callback(lambda _, array=array: array.release())
+        return await asyncio.wrap_future(future)
+
+    async def run_all(
+        self,
+        jobs: Dict[str, Tuple[Callable, Tuple[Any, ...]]],
+        shared: Sequence[SharedArray] = (),
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run independent detectors in parallel.
+
+        Args:
+            jobs: Mapping of detector name to (callable, args)
+            shared: Shared arrays every job references (see run)
+
+        Returns:
+            Tuple of (results by name, execution time by name)
+        """
+        names = list(jobs)
+        outcomes = await asyncio.gather(
+            *(self.run(func, *args, shared=shared) for func, args in jobs.values())
+        )
+
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        for name, (result, elapsed) in zip(names, outcomes):
+            results[name] = result
+            timings[name] = round(elapsed, 4)
+
+        return results, timings
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the pool configuration."""
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "started": self._executor is not None,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the underlying executor, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_detector_pool: Optional[DetectorPool] = None
+
+
+def get_detector_pool() -> DetectorPool:
+    """Return the process-wide detector pool configured from settings."""
+    global _detector_pool
+    if _detector_pool is None:
+        _detector_pool = DetectorPool(
+            max_workers=settings.IMAGE_ANALYSIS_WORKERS or None,
+            mode=settings.IMAGE_ANALYSIS_EXECUTOR,
+        )
+    return _detector_pool
@@ -0,0 +1,126 @@
+"""Per-analysis memoisation of image primitives shared between detectors."""
+
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+from backend.forensics.dct import block_dct
+from backend.forensics.ela import DEFAULT_QUALITIES, ELAEngine
+from backend.forensics.noise import NoiseMap
+from backend.forensics.pixelstats import PixelStatistics
+
+FFT_MAX_DIM = 512
+
+
+class FeatureStore:
+    """
+    Lazily computes and caches image primitives for one analysis run.
+
+    Each primitive (RGB image, grayscale image, RGB array, fused pixel
+    statistics, 8x8 block DCT, ELA engine, noise map, FFT magnitude) is built on first access and reused by every later
+    detector. Create a new store per image; nothing is shared across images.
+    With ``memoize=False`` every access recomputes, which is only useful for
+    benchmarking.
+
+    Derived metrics are cached under their own names through ``get``, and
+    ``precomputed`` seeds values that were obtained elsewhere (e.g. tiled
+    statistics of a very large image), so detectors never recompute them.
+    """
+
+    def __init__(
+        self,
+        image: Image.Image,
+        ela_qualities: Sequence[int] = DEFAULT_QUALITIES,
+        memoize: bool = True,
+        precomputed: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize the feature store.
+
+        Args:
+            image: Source image of the current analysis
+            ela_qualities: Recompression qualities for the ELA engine
+            memoize: Cache primitives (disable only for benchmarks)
+            precomputed: Values to serve as already-cached primitives or metrics
+        """
+        self.image = image
+        self.ela_qualities = tuple(ela_qualities)
+        self.memoize = memoize
+        self._cache: Dict[str, Any] = dict(precomputed or {})
+        self.timings: Dict[str, float] = {}
+        self.hits: Dict[str, int] = {}
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the cached primitive ``name``, computing it with ``factory`` on a miss."""
+        if name in self._cache:
+            self.hits[name] = self.hits.get(name, 0) + 1
+            return self._cache[name]
+
+        start = time.perf_counter()
+        value = factory()
+        self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+        if self.memoize:
+            self._cache[name] = value
+        return value
+
+    def has(self, name: str) -> bool:
+        """Whether ``name`` is cached (i.e. some detector already paid for it)."""
+        return name in self._cache
+
+    @property
+    def rgb(self) -> Image.Image:
+        """Image in RGB mode."""
+        return self.get("rgb", lambda: self.image if self.image.mode == "RGB" else self.image.convert("RGB"))
+
+    @property
+    def gray(self) -> Image.Image:
+        """Image in grayscale ("L") mode."""
+        return self.get("gray", lambda: self.rgb.convert("L"))
+
+    @property
+    def rgb_array(self) -> np.ndarray:
+        """RGB pixels as a uint8 array."""
+        return self.get("rgb_array", lambda: np.asarray(self.rgb))
+
+    @property
+    def pixel_stats(self) -> Dict[str, Any]:
+        """Single-pass histogram, gradient, Laplacian and colour statistics (see PixelStatistics)."""
+        return self.get("pixel_stats", lambda: PixelStatistics().compute(self.rgb_array))
+
+    @property
+    def dct_coefficients(self) -> np.ndarray:
+        """8x8 block DCT of the luminance, shape (rows, cols, 64) (see block_dct)."""
+        return self.get("dct_coefficients", lambda: block_dct(np.asarray(self.gray)))
+
+    @property
+    def ela(self) -> ELAEngine:
+        """ELA engine; its recompressions and difference maps are cached internally."""
+        return self.get("ela", lambda: ELAEngine(self.rgb, qualities=self.ela_qualities))
+
+    @property
+    def noise_map(self) -> NoiseMap:
+        """Regional noise-variance map of the grayscale image."""
+        return self.get("noise_map", lambda: NoiseMap.from_image(self.gray))
+
+    @property
+    def fft_magnitude(self) -> np.ndarray:
+        """Centred 2D FFT magnitude of the grayscale image, downscaled to at most FFT_MAX_DIM."""
+        return self.get("fft_magnitude", self._compute_fft_magnitude)
+
+    def _compute_fft_magnitude(self) -> np.ndarray:
+        gray = self.gray
+        w, h = gray.size
+        if max(h, w) > FFT_MAX_DIM:
+            scale = FFT_MAX_DIM / float(max(h, w))
+            gray = gray.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
+        arr = np.asarray(gray, dtype=np.float64)
+        return np.abs(np.fft.fftshift(np.fft.fft2(arr)))
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Compute time and cache hits per primitive."""
+        return {
+            name: {"seconds": round(seconds, 4), "hits": self.hits.get(name, 0)}
+            for name, seconds in self.timings.items()
+        }
@@ -0,0 +1,51 @@
+"""Lazy access to the frames (pages) of multi-frame images such as scanned TIFFs."""
+
+from pathlib import Path
+from typing import Iterator, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+ImagePath = Union[str, Path]
+
+
+def frame_count(image: Image.Image) -> int:
+    """Number of frames an opened image declares (1 for single-frame formats)."""
+    return int(getattr(image, "n_frames", 1))
+
+
+def load_frame(path: ImagePath, index: int) -> np.ndarray:
+    """
+    Decode one frame into an RGB array.
+
+    The file is opened and seeked to ``index``; no other frame is decoded,
+    so a worker holds a single page regardless of the page count.
+
+    Raises:
+        EOFError: If the image has no frame ``index``
+    """
+    with Image.open(path) as image:
+        image.seek(index)
+        return np.array(image.convert("RGB"))
+
+
+def save_frame(path: ImagePath, index: int, target: ImagePath) -> Tuple[int, int]:
+    """
+    Write one frame as a standalone PNG (e.g. for per-page OCR).
+
+    Returns:
+        (width, height) of the frame
+    """
+    with Image.open(path) as image:
+        image.seek(index)
+        frame = image.convert("RGB") if image.mode not in ("1", "L", "RGB") else image
+        frame.save(target, format="PNG")
+        return image.size
+
+
+def iter_frame_sizes(path: ImagePath) -> Iterator[Tuple[int, Tuple[int, int]]]:
+    """(index, (width, height)) of every frame, read from the headers without decoding pixels."""
+    with Image.open(path) as image:
+        for index in range(frame_count(image)):
+            image.seek(index)
+            yield index, image.size
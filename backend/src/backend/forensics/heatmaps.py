@@ -0,0 +1,128 @@
+"""Compact forensic heat maps (ELA, noise, clone matches, double JPEG) and their PNG rendering."""
+
+from typing import Dict, Tuple
+
+import numpy as np
+from PIL import Image
+
+HEATMAP_KINDS = ("ela", "noise", "clone", "jpeg")
+
+# Dark blue -> purple -> orange -> pale yellow, sampled into a 256-entry LUT
+_COLOR_ANCHORS = np.array([
+    [0, 0, 4],
+    [87, 16, 110],
+    [188, 55, 84],
+    [249, 142, 9],
+    [252, 255, 164],
+], dtype=np.float32)
+
+
+def _build_lut() -> np.ndarray:
+    positions = np.linspace(0, 255, len(_COLOR_ANCHORS))
+    levels = np.arange(256)
+    return np.stack(
+        [np.interp(levels, positions, _COLOR_ANCHORS[:, c]) for c in range(3)],
+        axis=1,
+    ).astype(np.uint8)
+
+
+COLOR_LUT = _build_lut()
+
+
+def pool_map(values: np.ndarray, max_edge: int = 256, reduce: str = "mean") -> np.ndarray:
+    """
+    Downsample a 2D map by integer block pooling so its longer edge fits ``max_edge``.
+
+    Args:
+        values: 2D array
+        max_edge: Maximum output edge length
+        reduce: "mean" or "max" pooling
+
+    Returns:
+        float32 2D array
+    """
+    height, width = values.shape[:2]
+    factor = max(1, -(-max(height, width) // max_edge))
+    if factor == 1:
+        return values.astype(np.float32)
+
+    rows, cols = height // factor, width // factor
+    if rows == 0 or cols == 0:
+        return np.zeros((max(rows, 1), max(cols, 1)), dtype=np.float32)
+
+    blocks = values[:rows * factor, :cols * factor].reshape(rows, factor, cols, factor)
+    pooled = blocks.max(axis=(1, 3)) if reduce == "max" else blocks.mean(axis=(1, 3), dtype=np.float32)
+    return pooled.astype(np.float32)
+
+
+def to_uint8(values: np.ndarray) -> np.ndarray:
+    """Normalise a non-negative map to uint8 (its maximum maps to 255)."""
+    peak = float(values.max()) if values.size else 0.0
+    if peak <= 0:
+        return np.zeros(values.shape, dtype=np.uint8)
+    return np.round(values * (255.0 / peak)).astype(np.uint8)
+
+
+def ela_heatmap(difference: np.ndarray, max_edge: int = 256) -> np.ndarray:
+    """Compact ELA map from a per-pixel recompression difference (H x W x 3)."""
+    per_pixel = difference.max(axis=2) if difference.ndim == 3 else difference
+    return to_uint8(pool_map(per_pixel, max_edge))
+
+
+def probability_heatmap(probabilities: np.ndarray, max_edge: int = 256) -> np.ndarray:
+    """Compact map of per-block probabilities in [0, 1] (1 maps to 255; not rescaled to the peak)."""
+    pooled = pool_map(probabilities, max_edge, reduce="max")
+    return np.round(np.clip(pooled, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+
+def block_duplicates(img_array: np.ndarray, block_size: int = 32) -> Tuple[float, np.ndarray]:
+    """
+    Find ``block_size`` blocks whose pixels exactly repeat elsewhere in the image.
+
+    All full blocks are compared at once by viewing each block as one opaque
+    byte string and counting duplicates with ``np.unique``.
+
+    Returns:
+        Tuple of (duplicate ratio ``1 - unique / total``, uint8 2D map with
+        255 for duplicated blocks and 0 otherwise)
+    """
+    height, width = img_array.shape[:2]
+    rows, cols = height // block_size, width // block_size
+    if rows == 0 or cols == 0:
+        return 0.0, np.zeros((0, 0), dtype=np.uint8)
+
+    channels = img_array.shape[2] if img_array.ndim == 3 else 1
+    blocks = img_array[:rows * block_size, :cols * block_size].reshape(
+        rows, block_size, cols, block_size, channels
+    ).swapaxes(1, 2)
+    blocks = np.ascontiguousarray(blocks).reshape(rows * cols, -1)
+
+    keys = blocks.view(np.dtype((np.void, blocks.shape[1]))).ravel()
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    duplicated = counts[inverse.ravel()] > 1
+    duplicate_ratio = 1.0 - counts.size / float(rows * cols)
+    return duplicate_ratio, (duplicated.reshape(rows, cols) * 255).astype(np.uint8)
+
+
+def render_heatmap(values: np.ndarray, max_edge: int = 1024) -> Image.Image:
+    """
+    Colourise a uint8 map and upscale it with nearest-neighbour sampling.
+
+    Args:
+        values: uint8 2D map
+        max_edge: Longer edge of the rendered image
+
+    Returns:
+        RGB PIL image
+    """
+    image = Image.fromarray(COLOR_LUT[values])
+    height, width = values.shape
+    scale = max(1, max_edge // max(height, width, 1))
+    if scale > 1:
+        image = image.resize((width * scale, height * scale), Image.Resampling.NEAREST)
+    return image
+
+
+def compact_maps(maps: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Keep only non-empty maps of known kinds."""
+    return {kind: m for kind, m in maps.items() if kind in HEATMAP_KINDS and m is not None and m.size}
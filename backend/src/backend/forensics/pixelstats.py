@@ -0,0 +1,221 @@
+"""Fused single-pass pixel statistics shared by the AI-generation and colour detectors."""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+# Pixels per row band; bounds the size of every scratch buffer
+BAND_PIXELS = 1 << 16
+
+# Offsets that map (channel, value) to a single bincount bin
+_CHANNEL_OFFSETS = np.arange(3, dtype=np.intp) * 256
+
+
+class PixelStatistics:
+    """
+    Computes the whole-image statistics of an RGB array in one pass.
+
+    The image is walked in row bands that never straddle the horizontal
+    midline. For every band the kernel
+
+    - adds per-quadrant, per-channel histograms with a single ``bincount``
+      over channel-offset values (means, variances and entropies are derived
+      from the 4 x 3 x 256 counts, so no float copy of the image is needed),
+    - builds the channel-mean grayscale once in float32, with a one-row halo,
+      and derives the Laplacian (reflect borders, as ``scipy.ndimage.convolve``)
+      and the horizontal and vertical gradients from it,
+    - accumulates the channel cross-products of values centred on the band's
+      exact (histogram) means, merged across bands with the parallel
+      co-moment update, for the colour correlation, and the absolute
+      left/right mirror difference.
+
+    All scratch buffers are allocated once per band shape and reused, so peak
+    extra memory is a few times ``BAND_PIXELS`` regardless of image size. An
+    instance can be reused across images; buffers are reallocated only when
+    the image width changes.
+    """
+
+    def __init__(self, band_pixels: int = BAND_PIXELS):
+        """
+        Initialize the kernel.
+
+        Args:
+            band_pixels: Target number of pixels per row band
+        """
+        self.band_pixels = band_pixels
+        self._buffers: Optional[Dict[str, np.ndarray]] = None
+        self._shape = (0, 0)
+
+    def _allocate(self, rows: int, width: int) -> Dict[str, np.ndarray]:
+        if self._buffers is None or self._shape != (rows, width):
+            half = width // 2
+            self._buffers = {
+                "index": np.empty(rows * max(width - half, half, 1) * 3, dtype=np.intp),
+                "padded": np.empty((rows + 2, width + 2), dtype=np.float32),
+                "laplacian": np.empty((rows, width), dtype=np.float32),
+                "scratch": np.empty((rows, width), dtype=np.float32),
+                "centred": np.empty((rows, width, 3), dtype=np.float32),
+                "mirror": np.empty((rows, half, 3), dtype=np.int16),
+            }
+            self._shape = (rows, width)
+        return self._buffers
+
+    def compute(self, rgb: np.ndarray) -> Dict[str, object]:
+        """
+        Statistics of a (H, W, 3) uint8 array.
+
+        Args:
+            rgb: RGB pixels
+
+        Returns:
+            Dictionary with ``channel_means``, ``pixel_variance``,
+            ``color_entropy``, ``color_correlation``, ``quadrant_variances``,
+            ``noise_level``, ``edge_score`` and ``symmetry_difference``
+        """
+        rgb = np.asarray(rgb, dtype=np.uint8)
+        height, width = rgb.shape[:2]
+        n = height * width
+        if n == 0:
+            raise ValueError("Cannot compute statistics of an empty image")
+
+        rows = max(1, min(height, self.band_pixels // max(width, 1)))
+        buf = self._allocate(rows, width)
+        half_w = width // 2
+        mid = height // 2
+
+        counts = np.zeros((4, 3, 256), dtype=np.int64)
+        cross = np.zeros((3, 3), dtype=np.float64)
+        band_means = []
+        values = np.arange(256, dtype=np.float64)
+        lap_sum = lap_sq = 0.0
+        edge_x = edge_y = 0.0
+        mirror_sum = 0
+
+        for y0, y1 in _bands(height, mid, rows):
+            band = rgb[y0:y1]
+            b = y1 - y0
+
+            # Histograms per quadrant (top: 0, 1; bottom: 2, 3)
+            top = 0 if y0 < mid else 2
+            band_counts = np.zeros((3, 256), dtype=np.int64)
+            for quadrant, view in ((top, band[:, :half_w]), (top + 1, band[:, half_w:])):
+                size = view.shape[0] * view.shape[1] * 3
+                if size == 0:
+                    continue
+                index = buf["index"][:size].reshape(view.shape)
+                np.add(view, _CHANNEL_OFFSETS, out=index)
+                hist = np.bincount(index.ravel(), minlength=768).reshape(3, 256)
+                counts[quadrant] += hist
+                band_counts += hist
+
+            # Grayscale with a one-row halo and reflected borders
+            padded = buf["padded"][:b + 2]
+            gray = padded[:, 1:-1]
+            above = y0 - 1 if y0 > 0 else 0
+            below = y1 if y1 < height else height - 1
+            _gray_rows(rgb[above:above + 1], gray[:1])
+            _gray_rows(band, gray[1:-1])
+            _gray_rows(rgb[below:below + 1], gray[-1:])
+            padded[:, 0] = padded[:, 1]
+            padded[:, -1] = padded[:, -2]
+            centre = padded[1:-1, 1:-1]
+
+            laplacian = buf["laplacian"][:b]
+            scratch = buf["scratch"][:b]
+            np.add(padded[:-2, 1:-1], padded[2:, 1:-1], out=laplacian)
+            laplacian += padded[1:-1, :-2]
+            laplacian += padded[1:-1, 2:]
+            np.multiply(centre, 4.0, out=scratch)
+            laplacian -= scratch
+            lap_sum += float(laplacian.sum(dtype=np.float64))
+            np.square(laplacian, out=scratch)
+            lap_sq += float(scratch.sum(dtype=np.float64))
+
+            if width > 1:
+                dx = scratch[:, :width - 1]
+                np.subtract(centre[:, 1:], centre[:, :-1], out=dx)
+                edge_x += float(np.abs(dx, out=dx).sum(dtype=np.float64))
+            dy_rows = min(y1, height - 1) - y0
+            if dy_rows > 0:
+                dy = scratch[:dy_rows]
+                np.subtract(padded[2:2 + dy_rows, 1:-1], centre[:dy_rows], out=dy)
+                edge_y += float(np.abs(dy, out=dy).sum(dtype=np.float64))
+
+            # Centre on the band's exact means so float32 products don't cancel
+            band_mean = (band_counts @ values) / (b * width)
+            band_means.append((b * width, band_mean))
+            centred = buf["centred"][:b]
+            np.subtract(band, band_mean.astype(np.float32), out=centred)
+            flat = centred.reshape(-1, 3)
+            cross += (flat.T @ flat).astype(np.float64)
+
+            if half_w:
+                mirror = buf["mirror"][:b]
+                np.subtract(band[:, :half_w], band[:, :width - half_w - 1:-1], out=mirror, dtype=np.int16)
+                mirror_sum += int(np.abs(mirror, out=mirror).sum(dtype=np.int64))
+
+        channel_counts = counts.sum(axis=0)
+        means = (channel_counts @ values) / n
+
+        # Pearson correlation; band co-moments merged around the global means
+        for count, band_mean in band_means:
+            shift = band_mean - means
+            cross += count * np.outer(shift, shift)
+        cov = cross / n
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+
+        def corr(a: int, c: int) -> float:
+            # numerical stability: if nearly constant, correlation not meaningful
+            if std[a] < 1e-5 or std[c] < 1e-5:
+                return 1.0
+            return float(cov[a, c] / (std[a] * std[c]))
+
+        lap_mean = lap_sum / n
+        return {
+            "channel_means": [float(m) for m in means],
+            "pixel_variance": _variance(channel_counts.sum(axis=0), values),
+            "color_entropy": float(np.mean([_entropy(channel_counts[c]) for c in range(3)])),
+            "color_correlation": float(np.mean([corr(0, 1), corr(0, 2), corr(1, 2)])),
+            "quadrant_variances": [_variance(counts[q].sum(axis=0), values) for q in range(4)],
+            "noise_level": max(lap_sq / n - lap_mean * lap_mean, 0.0),
+            "edge_score": min(
+                (edge_x / max(height * (width - 1), 1) + edge_y / max((height - 1) * width, 1)) / 50.0, 1.0,
+            ),
+            # No mirror pair in a 1 px wide image: report the largest possible difference
+            "symmetry_difference": mirror_sum / (height * half_w * 3) if half_w else 255.0,
+        }
+
+
+def _bands(height: int, mid: int, rows: int):
+    """Row ranges of at most ``rows`` rows that never cross ``mid``."""
+    for start, stop in ((0, mid), (mid, height)):
+        for y0 in range(start, stop, rows):
+            yield y0, min(y0 + rows, stop)
+
+
+def _gray_rows(rows: np.ndarray, out: np.ndarray):
+    """Channel-mean grayscale of uint8 RGB rows into a float32 buffer."""
+    np.add(rows[..., 0], rows[..., 1], out=out, dtype=np.float32)
+    out += rows[..., 2]
+    out /= 3.0
+
+
+def _variance(counts: np.ndarray, values: np.ndarray) -> float:
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    mean = float((counts * values).sum() / total)
+    return float((counts * (values - mean) ** 2).sum() / total)
+
+
+def _entropy(counts: np.ndarray) -> float:
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    p = counts[counts > 0] / total
+    return float(-np.sum(p * np.log2(p)))
+
+
+def pixel_statistics(rgb: np.ndarray) -> Dict[str, object]:
+    """One-shot PixelStatistics.compute() with fresh buffers."""
+    return PixelStatistics().compute(rgb)
@@ -0,0 +1,94 @@
+"""Cheap pre-screen signals from image headers and draft-mode decoding."""
+
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+def get_quantization_tables(image: Image.Image) -> Optional[Mapping[int, Sequence[int]]]:
+    """
+    Return JPEG quantization tables parsed from the header, if any.
+
+    Pillow exposes them as ``image.quantization`` as soon as the file is
+    opened, so no pixel data is decoded.
+    """
+    return getattr(image, "quantization", None) or image.info.get("quantization")
+
+
+def assess_quantization(qtables: Optional[Mapping[int, Sequence[int]]]) -> Optional[Dict[str, object]]:
+    """
+    Summarise quantization tables and flag heavy or uniform recompression.
+
+    Returns:
+        Dict with ``avg``, ``var`` and ``label`` (None when unremarkable),
+        or None when no tables are available
+    """
+    if not qtables:
+        return None
+
+    values = np.concatenate([np.asarray(list(q), dtype=np.float64) for q in qtables.values()])
+    if values.size == 0:
+        return None
+
+    avg_q = float(values.mean())
+    var_q = float(values.var())
+
+    label = None
+    if avg_q > 40:
+        label = "HIGH_QUANTIZATION"
+    elif var_q < 20 and avg_q > 20:
+        label = "UNIFORM_QUANTIZATION_LOW_VAR"
+
+    return {"avg": avg_q, "var": var_q, "label": label}
+
+
+def draft_decode(image: Image.Image, reduction: int = 8) -> Tuple[np.ndarray, float]:
+    """
+    Decode an image at reduced resolution.
+
+    JPEGs are decoded with DCT scaling (``draft``), which skips most of the
+    decoding work. Other formats are decoded normally and then reduced.
+
+    Args:
+        image: Freshly opened (not yet loaded) image
+        reduction: Target reduction factor (e.g. 4 or 8)
+
+    Returns:
+        Tuple of (RGB uint8 array, decode scale relative to the full image)
+    """
+    full_width = image.size[0]
+    if image.format == "JPEG":
+        image.draft("RGB", (max(1, image.size[0] // reduction), max(1, image.size[1] // reduction)))
+        reduced = image.convert("RGB")
+    else:
+        reduced = image.convert("RGB").reduce(reduction) if reduction > 1 else image.convert("RGB")
+
+    return np.asarray(reduced), reduced.size[0] / float(full_width)
+
+
+def coarse_statistics(img_array: np.ndarray) -> Dict[str, float]:
+    """Colour and edge statistics on a small RGB array."""
+    pixels = img_array.reshape(-1, 3)
+    total = max(pixels.shape[0], 1)
+
+    entropies = []
+    for channel in range(3):
+        counts = np.bincount(pixels[:, channel], minlength=256)
+        p = counts[counts > 0] / total
+        entropies.append(float(-np.sum(p * np.log2(p))))
+
+    gray = img_array.mean(axis=2, dtype=np.float32)
+    grad_x = np.abs(np.diff(gray, axis=1)).mean() if gray.shape[1] > 1 else 0.0
+    grad_y = np.abs(np.diff(gray, axis=0)).mean() if gray.shape[0] > 1 else 0.0
+    means = pixels.mean(axis=0)
+
+    return {
+        "color_entropy": float(np.mean(entropies)),
+        "edge_strength": float(grad_x + grad_y),
+        "mean_r": float(means[0]),
+        "mean_g": float(means[1]),
+        "mean_b": float(means[2]),
+        "rg_ratio": float(means[0] / max(means[1], 1e-5)),
+        "rb_ratio": float(means[0] / max(means[2], 1e-5)),
+    }
@@ -0,0 +1,168 @@
+"""Tamper-region localisation from forensic maps."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+from scipy.ndimage import find_objects, label
+
+from backend.forensics.noise import block_variances
+
+# Robust z-score at which an ELA or noise cell counts as suspicious (suspicion 0.5)
+DEFAULT_Z_THRESHOLD = 6.0
+
+_EIGHT_CONNECTED = np.ones((3, 3), dtype=bool)
+
+# ELA error and noise both follow image texture, so their agreement counts as one piece of evidence
+_EVIDENCE_GROUPS = {"ela": "content", "noise": "content", "clone": "clone", "jpeg": "jpeg"}
+
+
+@dataclass
+class SuspiciousRegion:
+    """
+    One connected suspicious area, in original image pixels.
+
+    Attributes:
+        x: Left edge
+        y: Top edge
+        width: Box width
+        height: Box height
+        score: Mean suspicion inside the region in [0, 1], discounted unless independent maps agree
+        sources: Maps that flag the region (ela, noise, clone, jpeg)
+        area_ratio: Share of the image covered by the region's cells
+    """
+
+    x: int
+    y: int
+    width: int
+    height: int
+    score: float
+    sources: List[str]
+    area_ratio: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bbox": [self.x, self.y, self.width, self.height],
+            "score": self.score,
+            "sources": self.sources,
+            "area_ratio": self.area_ratio,
+        }
+
+
+def robust_suspicion(values: np.ndarray, z_threshold: float = DEFAULT_Z_THRESHOLD, two_sided: bool = False) -> np.ndarray:
+    """
+    Map values to [0, 1] by their robust z-score (median / MAD).
+
+    A z-score of ``z_threshold`` maps to 0.5 and twice that saturates at 1,
+    so only cells that stand out from the rest of the same image score high.
+
+    Args:
+        values: 2D map
+        z_threshold: z-score that counts as suspicious
+        two_sided: Score deviations in both directions (else only high values)
+    """
+    if values.size == 0:
+        return np.zeros(values.shape, dtype=np.float32)
+    values = values.astype(np.float64)
+    median = float(np.median(values))
+    spread = 1.4826 * float(np.median(np.abs(values - median)))
+    if spread <= 0:
+        spread = float(values.std()) or 1.0
+    z = (values - median) / spread
+    if two_sided:
+        z = np.abs(z)
+    return np.clip(z / (2.0 * z_threshold), 0.0, 1.0).astype(np.float32)
+
+
+def grid_shape(width: int, height: int, grid_edge: int) -> Tuple[int, int]:
+    """(rows, cols) of the common localisation grid; its longer edge has ``grid_edge`` cells."""
+    scale = grid_edge / float(max(width, height, 1))
+    return max(1, round(height * scale)), max(1, round(width * scale))
+
+
+def _resample(values: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """Resample a [0, 1] map onto the common grid (area-averaged when shrinking)."""
+    if values.shape == shape:
+        return values.astype(np.float32)
+    image = Image.fromarray(values.astype(np.float32))
+    resample = Image.Resampling.BOX if values.shape[0] >= shape[0] else Image.Resampling.NEAREST
+    return np.asarray(image.resize((shape[1], shape[0]), resample), dtype=np.float32)
+
+
+def locate_regions(
+    suspicion: Dict[str, np.ndarray],
+    width: int,
+    height: int,
+    grid_edge: int = 64,
+    max_regions: int = 5,
+    min_cells: int = 4,
+    max_area_ratio: float = 0.5,
+) -> List[SuspiciousRegion]:
+    """
+    Find ranked suspicious regions in per-map suspicion grids.
+
+    Every map is resampled onto one small grid covering the whole image,
+    combined by taking the per-cell maximum, thresholded at 0.5 and split
+    into 8-connected components. Components smaller than ``min_cells`` are
+    noise; components larger than ``max_area_ratio`` of the image describe
+    the whole image rather than a region and are dropped.
+
+    Args:
+        suspicion: Map kind -> 2D suspicion values in [0, 1] (any resolution)
+        width: Original image width in pixels
+        height: Original image height in pixels
+        grid_edge: Cells along the longer edge of the common grid
+        max_regions: Number of regions returned
+        min_cells: Smallest component kept
+        max_area_ratio: Largest component kept, as a share of the image
+
+    Returns:
+        Regions sorted by score, then size (best first)
+    """
+    maps = {kind: values for kind, values in suspicion.items() if values is not None and values.size}
+    if not maps:
+        return []
+
+    shape = grid_shape(width, height, grid_edge)
+    stacked = np.stack([_resample(values, shape) for values in maps.values()])
+    kinds = list(maps)
+    hot = stacked >= 0.5
+    combined = stacked.max(axis=0)
+
+    labels, _ = label(hot.any(axis=0), structure=_EIGHT_CONNECTED)
+    total_cells = float(shape[0] * shape[1])
+    cell_w = width / float(shape[1])
+    cell_h = height / float(shape[0])
+
+    regions: List[Tuple[float, int, SuspiciousRegion]] = []
+    for index, box in enumerate(find_objects(labels), start=1):
+        if box is None:
+            continue
+        component = labels[box] == index
+        cells = int(component.sum())
+        if cells < min_cells or cells / total_cells > max_area_ratio:
+            continue
+
+        sources = [kinds[k] for k in range(len(kinds)) if hot[k][box][component].any()]
+        # Agreement between independent maps is stronger evidence than one map alone
+        groups = {_EVIDENCE_GROUPS.get(source, source) for source in sources}
+        agreement = min(1.0, 0.4 + 0.3 * (len(groups) - 1))
+        score = round(float(combined[box][component].mean()) * agreement, 3)
+
+        rows, cols = box
+        x0, y0 = int(cols.start * cell_w), int(rows.start * cell_h)
+        x1 = min(width, int(np.ceil(cols.stop * cell_w)))
+        y1 = min(height, int(np.ceil(rows.stop * cell_h)))
+        regions.append((score, cells, SuspiciousRegion(
+            x=x0, y=y0, width=x1 - x0, height=y1 - y0,
+            score=score, sources=sources, area_ratio=round(cells / total_cells, 4),
+        )))
+
+    regions.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return [region for _, _, region in regions[:max_regions]]
+
+
+def flat_blocks(gray: np.ndarray, block_size: int, min_std: float = 2.0) -> np.ndarray:
+    """Mask of featureless ``block_size`` blocks (uniform backgrounds repeat without being clones)."""
+    return block_variances(gray, block_size) < min_std ** 2
@@ -0,0 +1,217 @@
+"""Detector registry and cost-ordered detection engine shared by both analyzers."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.forensics.features import FeatureStore
+
+
+@dataclass
+class DetectionContext:
+    """Everything a detector may read for one image."""
+
+    features: FeatureStore
+    thresholds: Dict[str, Any]
+    width: int
+    height: int
+    is_web_image: bool = False
+
+
+@dataclass
+class DetectorOutcome:
+    """
+    Result of one detector.
+
+    ``score`` is the detector's contribution in risk points (at most its
+    weight); it can be non-zero even when ``triggered`` is False.
+    """
+
+    triggered: bool
+    score: float = 0.0
+    message: str = ""
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Detector:
+    """
+    A registered detector.
+
+    Attributes:
+        name: Unique detector name (used for per-request subsets)
+        func: Callable taking a DetectionContext and returning a DetectorOutcome
+        inputs: Feature-store primitives the detector reads
+        cost: Expected relative cost (detectors run cheapest first)
+        weight: Maximum risk points the detector can contribute
+        category: Grouping used by the analyzers (pixel, forensic, ai, tampering)
+        severity: Severity of a triggered finding (low, medium, high, critical)
+    """
+
+    name: str
+    func: Callable[[DetectionContext], DetectorOutcome]
+    inputs: Tuple[str, ...]
+    cost: float
+    weight: float
+    category: str = "forensic"
+    severity: str = "medium"
+
+
+class DetectorRegistry:
+    """Named collection of detectors."""
+
+    def __init__(self):
+        self._detectors: Dict[str, Detector] = {}
+
+    def register(
+        self,
+        name: str,
+        inputs: Sequence[str],
+        cost: float,
+        weight: float,
+        category: str = "forensic",
+        severity: str = "medium",
+    ) -> Callable:
+        """Decorator registering a detector function under ``name``."""
+        def decorator(func: Callable[[DetectionContext], DetectorOutcome]):
+            if name in self._detectors:
+                raise ValueError(f"Detector already registered: {name}")
+            self._detectors[name] = Detector(name, func, tuple(inputs), cost, weight, category, severity)
+            return func
+        return decorator
+
+    def get(self, name: str) -> Detector:
+        return self._detectors[name]
+
+    def names(self) -> List[str]:
+        return sorted(self._detectors)
+
+    def select(self, names: Optional[Iterable[str]] = None) -> List[Detector]:
+        """
+        Resolve a detector subset, ordered cheapest first.
+
+        Raises:
+            ValueError: If a name is not registered
+        """
+        if names is None:
+            selected = list(self._detectors.values())
+        else:
+            unknown = [n for n in names if n not in self._detectors]
+            if unknown:
+                raise ValueError(f"Unknown detectors: {unknown}. Available: {self.names()}")
+            selected = [self._detectors[n] for n in dict.fromkeys(names)]
+        return sorted(selected, key=lambda d: (d.cost, d.name))
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Detector metadata, cheapest first."""
+        return [
+            {
+                "name": d.name,
+                "inputs": list(d.inputs),
+                "cost": d.cost,
+                "weight": d.weight,
+                "category": d.category,
+                "severity": d.severity,
+            }
+            for d in self.select()
+        ]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._detectors
+
+
+@dataclass
+class EngineResult:
+    """Outcome of one engine run."""
+
+    score: float
+    outcomes: Dict[str, DetectorOutcome]
+    executed: List[str]
+    skipped: List[str]
+    timings: Dict[str, float]
+    exited_early: bool
+    categories: Dict[str, str] = field(default_factory=dict)
+
+    def by_category(self, category: str) -> Dict[str, DetectorOutcome]:
+        """Outcomes of the executed detectors in ``category``."""
+        return {name: o for name, o in self.outcomes.items() if self.categories.get(name) == category}
+
+
+class DetectionEngine:
+    """
+    Runs a detector subset cheapest first with early exit.
+
+    Detector scores are non-negative and additive, so once the running score
+    (including any ``base_score`` from e.g. metadata checks) reaches the
+    critical threshold the engine's own score cannot fall below it and the
+    remaining, more expensive detectors are skipped. That only holds for
+    callers whose verdict is this score: callers that read individual
+    outcomes (ImageAnalyzer feeds them to RiskScorer) must pass
+    ``early_exit=False``, or a skipped detector reads as a clean one.
+    """
+
+    def __init__(self, registry: DetectorRegistry, critical_threshold: float = 75.0):
+        """
+        Initialize the engine.
+
+        Args:
+            registry: Detector registry
+            critical_threshold: Score at which remaining detectors are skipped
+        """
+        self.registry = registry
+        self.critical_threshold = critical_threshold
+
+    def run(
+        self,
+        context: DetectionContext,
+        detectors: Optional[Iterable[str]] = None,
+        base_score: float = 0.0,
+        early_exit: bool = True,
+    ) -> EngineResult:
+        """
+        Run detectors against one image.
+
+        Args:
+            context: Detection context (features, thresholds, image size)
+            detectors: Detector names (defaults to every registered detector)
+            base_score: Points already accumulated by checks outside the engine
+            early_exit: Stop once the score reaches the critical threshold
+
+        Returns:
+            EngineResult with per-detector outcomes and timings
+        """
+        plan = self.registry.select(detectors)
+        score = base_score
+        outcomes: Dict[str, DetectorOutcome] = {}
+        timings: Dict[str, float] = {}
+        executed: List[str] = []
+        exited_early = False
+
+        for detector in plan:
+            if early_exit and score >= self.critical_threshold:
+                exited_early = True
+                break
+
+            start = time.perf_counter()
+            try:
+                outcome = detector.func(context)
+            except Exception as e:
+                outcome = DetectorOutcome(triggered=False, error=f"{e.__class__.__name__}: {e}")
+            timings[detector.name] = round(time.perf_counter() - start, 4)
+
+            outcome.score = max(0.0, min(outcome.score, detector.weight))
+            outcomes[detector.name] = outcome
+            executed.append(detector.name)
+            score += outcome.score
+
+        skipped = [d.name for d in plan if d.name not in outcomes]
+        return EngineResult(
+            score=min(score, 100.0),
+            outcomes=outcomes,
+            executed=executed,
+            skipped=skipped,
+            timings=timings,
+            exited_early=exited_early,
+            categories={d.name: d.category for d in plan},
+        )
@@ -0,0 +1,130 @@
+"""Zero-copy transport of image arrays to process-pool workers through shared memory."""
+
+import gc
+import threading
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedArrayHandle:
+    """
+    Picklable reference to an array in shared memory (a few dozen bytes).
+
+    Attributes:
+        name: Shared memory block name
+        shape: Array shape
+        dtype: numpy dtype string
+    """
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedArray:
+    """
+    Owner side of an array in shared memory, with reference-counted cleanup.
+
+    The creator holds the first reference; every pool job that receives the
+    handle holds another (see DetectorPool.run). The block is unlinked when
+    the last reference is released, so a worker that is still attached when
+    the request that created it is cancelled keeps a valid mapping.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype: Any = np.uint8):
+        """
+        Allocate the block.
+
+        Args:
+            shape: Array shape
+            dtype: Element type
+        """
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        self._shm: Optional[SharedMemory] = SharedMemory(create=True, size=max(size, 1))
+        self.handle = SharedArrayHandle(self._shm.name, tuple(int(n) for n in shape), dtype.str)
+        self._refs = 1
+        self._lock = threading.Lock()
+
+    @property
+    def array(self) -> np.ndarray:
+        """Owner-side view of the block (only valid while a reference is held)."""
+        if self._shm is None:
+            raise ValueError("Shared array already released")
+        return np.ndarray(self.handle.shape, dtype=self.handle.dtype, buffer=self._shm.buf)
+
+    def acquire(self) -> SharedArrayHandle:
+        """Take a reference for a job; returns the handle to send to it."""
+        with self._lock:
+            if self._refs == 0:
+                raise ValueError("Shared array already released")
+            self._refs += 1
+            return self.handle
+
+    def release(self):
+        """Drop a reference; the last one closes and unlinks the block (thread-safe)."""
+        with self._lock:
+            self._refs -= 1
+            if self._refs > 0 or self._shm is None:
+                return
+            shm, self._shm = self._shm, None
+        _close(shm)
+        shm.unlink()
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def _close(shm: SharedMemory):
+    """Close a mapping, collecting leftover views (e.g. cached in dropped objects) first."""
+    try:
+        shm.close()
+    except BufferError:
+        gc.collect()
+        try:
+            shm.close()
+        except BufferError:
+            # A view is still alive somewhere; the mapping is freed with it
+            pass
+
+
+def _view(shm: SharedMemory, handle: SharedArrayHandle) -> np.ndarray:
+    return np.ndarray(handle.shape, dtype=handle.dtype, buffer=shm.buf)
+
+
+def call_with_array(func: Callable, handle: SharedArrayHandle, *args: Any) -> Any:
+    """
+    Run ``func(array, *args)`` on a zero-copy view of the shared array (a pool job).
+
+    The view is only valid during the call; ``func`` must return copies,
+    not views of it.
+    """
+    shm = SharedMemory(name=handle.name)
+    try:
+        array = _view(shm, handle)
+        try:
+            return func(array, *args)
+        finally:
+            del array
+    finally:
+        _close(shm)
+
+
+def fill_shared(handle: SharedArrayHandle, producer: Callable, *args: Any):
+    """Write ``producer(*args)`` into the shared array (e.g. decode an image inside a worker)."""
+    shm = SharedMemory(name=handle.name)
+    try:
+        array = _view(shm, handle)
+        try:
+            array[...] = producer(*args)
+        finally:
+            del array
+    finally:
+        _close(shm)
@@ -0,0 +1,570 @@
+"""Tiled, memory-bounded statistics for very large images."""
+
+import hashlib
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image, ImageFilter
+from scipy.ndimage import convolve
+
+from backend.forensics.dct import ANALYSIS_FREQUENCIES, HISTOGRAM_RANGE, block_dct, coefficient_histograms
+from backend.forensics.ela import DEFAULT_QUALITIES, REFERENCE_QUALITY, ELAEngine
+from backend.forensics.noise import NoiseMap, block_variances, noise_residual, region_size_for
+
+ImageSource = Union[str, Path, BinaryIO]
+
+# Bytes per pixel for raw rawmodes that can be decoded region by region
+_RAW_BYTES_PER_PIXEL = {
+    "L": 1, "P": 1,
+    "RGB": 3, "BGR": 3,
+    "RGBA": 4, "BGRA": 4, "RGBX": 4, "BGRX": 4, "XBGR": 4,
+}
+
+_LAPLACIAN = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]], dtype=np.float32)
+
+
+def _retile(tile, extents: Tuple[int, int, int, int], offset: int, args):
+    """Copy a PIL tile descriptor with new extents, offset and args."""
+    if hasattr(tile, "_replace"):
+        return tile._replace(extents=extents, offset=offset, args=args)
+    return (tile[0], extents, offset, args)
+
+
+@dataclass
+class Tile:
+    """One tile of an image, including a halo of context pixels."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    data: np.ndarray
+    halo_left: int
+    halo_top: int
+
+    @property
+    def core(self) -> np.ndarray:
+        """Tile pixels without the halo."""
+        return self.data[
+            self.halo_top:self.halo_top + self.height,
+            self.halo_left:self.halo_left + self.width,
+        ]
+
+    def crop_core(self, array: np.ndarray) -> np.ndarray:
+        """Crop an array with the same layout as ``data`` down to the core."""
+        return array[
+            self.halo_top:self.halo_top + self.height,
+            self.halo_left:self.halo_left + self.width,
+        ]
+
+
+class TileReader:
+    """
+    Streams an image as overlapping RGB tiles.
+
+    Uncompressed (raw) images such as plain TIFF, BMP or PPM are decoded one
+    rectangle at a time straight from the file. JPEGs larger than the decode
+    budget use draft (DCT-scaled) decoding. Other formats are decoded once
+    into a single uint8 buffer; all float work still happens per tile.
+    """
+
+    def __init__(
+        self,
+        source: ImageSource,
+        tile_size: int = 1600,
+        halo: int = 8,
+        max_decode_pixels: Optional[int] = None,
+    ):
+        """
+        Initialize the tile reader.
+
+        Args:
+            source: Image path or binary file object
+            tile_size: Edge length of the tile core in pixels
+            halo: Context pixels added around each tile for filters
+            max_decode_pixels: Pixel budget for JPEG draft decoding
+        """
+        self.source = source
+        self.tile_size = tile_size
+        self.halo = halo
+        self.max_decode_pixels = max_decode_pixels
+
+        self.image = self._open()
+        self.format = self.image.format
+        self.original_size = self.image.size
+        self.scale = 1.0
+        self._full: Optional[np.ndarray] = None
+
+        if (
+            self.format == "JPEG"
+            and max_decode_pixels
+            and self.original_size[0] * self.original_size[1] > max_decode_pixels
+        ):
+            reduction = math.sqrt(self.original_size[0] * self.original_size[1] / max_decode_pixels)
+            target = (
+                max(1, int(self.original_size[0] / reduction)),
+                max(1, int(self.original_size[1] / reduction)),
+            )
+            self.image.draft("RGB", target)
+            self.scale = self.image.size[0] / self.original_size[0]
+
+        self._raw = self._raw_layout()
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Size of the image as decoded (after any draft reduction)."""
+        return self.image.size
+
+    @property
+    def streaming(self) -> bool:
+        """Whether tiles are decoded directly from the file."""
+        return self._raw is not None
+
+    def _open(self) -> Image.Image:
+        if isinstance(self.source, (str, Path)):
+            return Image.open(self.source)
+        self.source.seek(0)
+        return Image.open(self.source)
+
+    def _raw_layout(self) -> Optional[Tuple]:
+        """Return (tile, bytes_per_pixel, stride) when region decoding is possible."""
+        tiles = self.image.tile
+        if self.scale != 1.0 or len(tiles) != 1:
+            return None
+
+        tile = tiles[0]
+        name, extents, offset, args = tile
+        if name != "raw" or not isinstance(args, tuple) or len(args) < 3:
+            return None
+        if tuple(extents) != (0, 0) + self.image.size:
+            return None
+
+        rawmode, stride, orientation = args[:3]
+        bytes_per_pixel = _RAW_BYTES_PER_PIXEL.get(rawmode)
+        if bytes_per_pixel is None or orientation not in (1, -1):
+            return None
+
+        stride = stride or self.image.size[0] * bytes_per_pixel
+        return tile, bytes_per_pixel, stride
+
+    def read_region(self, box: Tuple[int, int, int, int]) -> np.ndarray:
+        """Decode the RGB pixels inside ``box`` = (left, top, right, bottom)."""
+        left, top, right, bottom = box
+
+        if self._raw is not None:
+            tile, bytes_per_pixel, stride = self._raw
+            _, _, offset, args = tile
+            rawmode, _, orientation = args[:3]
+            height = self.image.size[1]
+
+            first_row = top if orientation == 1 else height - bottom
+            region_offset = offset + first_row * stride + left * bytes_per_pixel
+
+            region = self._open()
+            region.tile = [_retile(
+                tile,
+                (0, 0, right - left, bottom - top),
+                region_offset,
+                (rawmode, stride, orientation) + tuple(args[3:]),
+            )]
+            region._size = (right - left, bottom - top)
+            if hasattr(region, "_tile_size"):
+                # TIFF allocates its buffer from the strip/tile size
+                region._tile_size = region._size
+            region.load()
+            return np.asarray(region.convert("RGB"))
+
+        if self._full is None:
+            self._full = np.asarray(self.image.convert("RGB"))
+        return self._full[top:bottom, left:right]
+
+    def tiles(self) -> Iterator[Tile]:
+        """Yield tiles in row-major order."""
+        width, height = self.size
+        for y in range(0, height, self.tile_size):
+            for x in range(0, width, self.tile_size):
+                core_w = min(self.tile_size, width - x)
+                core_h = min(self.tile_size, height - y)
+                left = max(0, x - self.halo)
+                top = max(0, y - self.halo)
+                right = min(width, x + core_w + self.halo)
+                bottom = min(height, y + core_h + self.halo)
+
+                yield Tile(
+                    x=x,
+                    y=y,
+                    width=core_w,
+                    height=core_h,
+                    data=self.read_region((left, top, right, bottom)),
+                    halo_left=x - left,
+                    halo_top=y - top,
+                )
+
+    def close(self):
+        """Release the decoded buffer and file handle."""
+        self._full = None
+        self.image.close()
+
+    def __enter__(self) -> "TileReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HistogramAccumulator:
+    """Per-channel 256-bin histograms accumulated tile by tile."""
+
+    def __init__(self, channels: int = 3):
+        self.counts = np.zeros((channels, 256), dtype=np.int64)
+
+    def add(self, array: np.ndarray):
+        """Add a (H, W, channels) or (H, W) uint8 array."""
+        if array.ndim == 2:
+            array = array[..., None]
+        for channel in range(array.shape[2]):
+            self.counts[channel] += np.bincount(array[..., channel].ravel(), minlength=256)
+
+    @staticmethod
+    def _moments(counts: np.ndarray, values: np.ndarray) -> Tuple[float, float]:
+        total = counts.sum()
+        if total == 0:
+            return 0.0, 0.0
+        mean = float((counts * values).sum() / total)
+        var = float((counts * (values - mean) ** 2).sum() / total)
+        return mean, var
+
+    def mean_var(self, channel: Optional[int] = None, scale: float = 1.0) -> Tuple[float, float]:
+        """Mean and variance of ``min(value * scale, 255)`` over one or all channels."""
+        counts = self.counts.sum(axis=0) if channel is None else self.counts[channel]
+        values = np.minimum(np.arange(256, dtype=np.float64) * scale, 255.0)
+        if scale != 1.0:
+            values = np.floor(values)
+        return self._moments(counts, values)
+
+    def max_value(self) -> int:
+        """Largest value seen in any channel."""
+        nonzero = np.nonzero(self.counts.sum(axis=0))[0]
+        return int(nonzero[-1]) if nonzero.size else 0
+
+    def fraction_above(self, threshold: float) -> float:
+        """Fraction of all samples strictly above ``threshold``."""
+        counts = self.counts.sum(axis=0)
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        return float(counts[np.arange(256) > threshold].sum() / total)
+
+    def entropy(self, channel: int) -> float:
+        """Shannon entropy (bits) of one channel."""
+        counts = self.counts[channel]
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        p = counts[counts > 0] / total
+        return float(-np.sum(p * np.log2(p)))
+
+
+class MomentAccumulator:
+    """Running count, sum and sum of squares for streaming mean/variance."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def add(self, array: np.ndarray):
+        values = array.astype(np.float64, copy=False)
+        self.count += values.size
+        self.total += float(values.sum())
+        self.total_sq += float(np.square(values).sum())
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        if not self.count:
+            return 0.0
+        return max(self.total_sq / self.count - self.mean ** 2, 0.0)
+
+
+class TiledStatistics:
+    """
+    Computes the image statistics used by both analyzers in one tiled pass.
+
+    Every accumulator is either a fixed-size histogram, a running moment or a
+    per-block summary, so peak memory is bounded by the tile size rather than
+    by the full image.
+    """
+
+    def __init__(
+        self,
+        tile_size: int = 1600,
+        max_decode_pixels: Optional[int] = None,
+        ela_qualities=DEFAULT_QUALITIES,
+        thumbnail_size: int = 512,
+        clone_block_size: int = 32,
+    ):
+        """
+        Initialize the tiled statistics engine.
+
+        Args:
+            tile_size: Requested tile edge; rounded to keep block grids aligned
+            max_decode_pixels: Pixel budget for JPEG draft decoding
+            ela_qualities: JPEG qualities for ELA
+            thumbnail_size: Maximum edge of the accumulated thumbnail
+            clone_block_size: Block size for clone hashing
+        """
+        self.tile_size = tile_size
+        self.max_decode_pixels = max_decode_pixels
+        self.ela_qualities = tuple(sorted(set(ela_qualities) | {REFERENCE_QUALITY}))
+        self.thumbnail_size = thumbnail_size
+        self.clone_block_size = clone_block_size
+
+    def _aligned_tile_size(self, region_size: int) -> int:
+        # Tiles must align with JPEG MCUs (16), noise regions and clone blocks
+        grid = math.lcm(16, region_size, self.clone_block_size)
+        return max(1, self.tile_size // grid) * grid
+
+    def compute(self, source: ImageSource) -> Dict[str, object]:
+        """
+        Stream ``source`` tile by tile and return aggregated statistics.
+
+        Args:
+            source: Image path or binary file object
+
+        Returns:
+            Dictionary of statistics consumed by ImageAnalyzer and PILForensicAnalyzer
+        """
+        with TileReader(source, tile_size=self.tile_size, max_decode_pixels=self.max_decode_pixels) as probe:
+            width, height = probe.size
+
+        region_size = region_size_for(width, height)
+        tile_size = self._aligned_tile_size(region_size)
+
+        pixels = HistogramAccumulator(3)
+        # Same quadrants as the in-memory kernel (top: 0, 1; bottom: 2, 3)
+        quadrants = [HistogramAccumulator(3) for _ in range(4)]
+        half_w, mid = width // 2, height // 2
+        left_band: Optional[np.ndarray] = None
+        mirror_sum = 0
+        ela_hists = {q: HistogramAccumulator(3) for q in self.ela_qualities}
+        dct_histograms = np.zeros((len(ANALYSIS_FREQUENCIES), 2 * HISTOGRAM_RANGE + 1), dtype=np.int64)
+        laplacian = MomentAccumulator()
+        cross = np.zeros((3, 3), dtype=np.float64)
+        edge_x = edge_y = 0.0
+        edge_x_count = edge_y_count = 0
+        find_edges = enhance_edges = median_diff = 0.0
+        filter_count = 0
+        noise_grid = np.zeros((height // region_size, width // region_size), dtype=np.float64)
+        block_hashes: List[str] = []
+        clone_first_seen: Dict[str, Tuple[int, int]] = {}
+        clone_pairs: List[Dict[str, Tuple[int, int]]] = []
+
+        thumb_scale = min(1.0, self.thumbnail_size / float(max(width, height)))
+        thumbnail = Image.new("RGB", (max(1, int(width * thumb_scale)), max(1, int(height * thumb_scale))))
+
+        with TileReader(
+            source,
+            tile_size=tile_size,
+            halo=8,
+            max_decode_pixels=self.max_decode_pixels,
+        ) as reader:
+            for tile in reader.tiles():
+                core = tile.core
+                pixels.add(core)
+
+                for index, (qx0, qy0, qx1, qy1) in enumerate((
+                    (0, 0, half_w, mid),
+                    (half_w, 0, width, mid),
+                    (0, mid, half_w, height),
+                    (half_w, mid, width, height),
+                )):
+                    x0, x1 = max(qx0, tile.x), min(qx1, tile.x + tile.width)
+                    y0, y1 = max(qy0, tile.y), min(qy1, tile.y + tile.height)
+                    if x0 < x1 and y0 < y1:
+                        quadrants[index].add(core[y0 - tile.y:y1 - tile.y, x0 - tile.x:x1 - tile.x])
+
+                # Left/right mirror difference: the left half of the current tile
+                # row is kept until the tiles holding its mirror columns arrive
+                if half_w:
+                    if tile.x == 0:
+                        left_band = np.empty((tile.height, half_w, 3), dtype=np.uint8)
+                    if tile.x < half_w:
+                        end = min(half_w, tile.x + tile.width)
+                        left_band[:, tile.x:end] = core[:, :end - tile.x]
+                    start = max(tile.x, width - half_w)
+                    end = tile.x + tile.width
+                    if start < end:
+                        right = core[:, start - tile.x:end - tile.x].astype(np.int16)
+                        mirrored = left_band[:, width - end:width - start][:, ::-1]
+                        mirror_sum += int(np.abs(right - mirrored).sum(dtype=np.int64))
+
+                # Channel cross-products for colour correlation
+                flat = core.reshape(-1, 3).astype(np.float64)
+                cross += flat.T @ flat
+
+                # ELA on the core; tile origins are MCU-aligned
+                engine = ELAEngine.from_array(np.ascontiguousarray(core), qualities=self.ela_qualities)
+                for quality, hist in ela_hists.items():
+                    hist.add(engine.difference(quality))
+                del engine
+
+                gray = tile.data.mean(axis=2, dtype=np.float32)
+
+                lap = convolve(gray, _LAPLACIAN)
+                laplacian.add(tile.crop_core(lap))
+
+                # Gradients including the one-pixel seam to the next tile
+                right = min(tile.halo_left + tile.width + 1, gray.shape[1])
+                bottom = min(tile.halo_top + tile.height + 1, gray.shape[0])
+                dx = np.abs(np.diff(gray[tile.halo_top:tile.halo_top + tile.height, tile.halo_left:right], axis=1))
+                dy = np.abs(np.diff(gray[tile.halo_top:bottom, tile.halo_left:tile.halo_left + tile.width], axis=0))
+                edge_x += float(dx.sum())
+                edge_y += float(dy.sum())
+                edge_x_count += dx.size
+                edge_y_count += dy.size
+
+                # PIL filters on the halo'd tile, statistics on the core
+                gray_image = Image.fromarray(tile.data).convert("L")
+                gray_u8 = np.asarray(gray_image)
+
+                # DCT coefficient histograms on the 8x8 grid (tile origins are MCU-aligned)
+                dct_histograms += coefficient_histograms(block_dct(tile.crop_core(gray_u8)))
+
+                find_edges += float(tile.crop_core(np.asarray(gray_image.filter(ImageFilter.FIND_EDGES))).sum(dtype=np.float64))
+                enhance_edges += float(tile.crop_core(np.asarray(gray_image.filter(ImageFilter.EDGE_ENHANCE_MORE))).sum(dtype=np.float64))
+                median = np.asarray(gray_image.filter(ImageFilter.MedianFilter(size=3)))
+                median_diff += float(tile.crop_core(
+                    np.maximum(gray_u8, median) - np.minimum(gray_u8, median)
+                ).sum(dtype=np.float64))
+                filter_count += tile.width * tile.height
+
+                # Regional noise: residual over the halo'd tile, block variance on the core
+                noise = tile.crop_core(noise_residual(gray_image))
+                tile_vars = block_variances(noise, region_size)
+                row, col = tile.y // region_size, tile.x // region_size
+                noise_grid[row:row + tile_vars.shape[0], col:col + tile_vars.shape[1]] = tile_vars
+
+                # Clone hashing on block-aligned positions
+                block = self.clone_block_size
+                for by in range(0, tile.height, block):
+                    gy = tile.y + by
+                    if gy >= height - block:
+                        break
+                    for bx in range(0, tile.width, block):
+                        gx = tile.x + bx
+                        if gx >= width - block:
+                            break
+                        region = core[by:by + block, bx:bx + block]
+                        digest = hashlib.md5(np.ascontiguousarray(region).tobytes()).hexdigest()
+                        block_hashes.append(digest)
+                        if digest in clone_first_seen:
+                            prev_x, prev_y = clone_first_seen[digest]
+                            if math.hypot(gx - prev_x, gy - prev_y) > block * 2 and len(clone_pairs) < 10:
+                                clone_pairs.append({"block1": (prev_x, prev_y), "block2": (gx, gy)})
+                        else:
+                            clone_first_seen[digest] = (gx, gy)
+
+                # Downsampled thumbnail for FFT checks
+                tx, ty = int(tile.x * thumb_scale), int(tile.y * thumb_scale)
+                tw = max(1, int((tile.x + tile.width) * thumb_scale) - tx)
+                th = max(1, int((tile.y + tile.height) * thumb_scale) - ty)
+                thumbnail.paste(Image.fromarray(np.ascontiguousarray(core)).resize((tw, th), Image.Resampling.BILINEAR), (tx, ty))
+
+                del gray, lap, noise, median
+
+            decode_scale = reader.scale
+            streamed = reader.streaming
+
+        return self._summarise(
+            width=width,
+            height=height,
+            decode_scale=decode_scale,
+            streamed=streamed,
+            pixels=pixels,
+            quadrants=quadrants,
+            # No mirror pair in a 1 px wide image: report the largest possible difference
+            symmetry_difference=mirror_sum / (height * half_w * 3) if half_w else 255.0,
+            ela_hists=ela_hists,
+            dct_histograms=dct_histograms,
+            laplacian=laplacian,
+            cross=cross,
+            edge_score=(edge_x / max(edge_x_count, 1)) + (edge_y / max(edge_y_count, 1)),
+            edge_diff=abs(find_edges - enhance_edges) / max(filter_count, 1),
+            median_mean_diff=median_diff / max(filter_count, 1),
+            noise_map=NoiseMap(noise_grid, region_size),
+            block_hashes=block_hashes,
+            clone_pairs=clone_pairs,
+            thumbnail=np.asarray(thumbnail),
+        )
+
+    def _summarise(self, **acc) -> Dict[str, object]:
+        pixels: HistogramAccumulator = acc["pixels"]
+        n = max(int(pixels.counts[0].sum()), 1)
+
+        # Pearson correlation from accumulated first and second moments
+        sums = np.array([
+            (pixels.counts[c] * np.arange(256)).sum() for c in range(3)
+        ], dtype=np.float64)
+        means = sums / n
+        cov = acc["cross"] / n - np.outer(means, means)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+
+        def corr(a: int, b: int) -> float:
+            if std[a] < 1e-5 or std[b] < 1e-5:
+                return 1.0
+            return float(cov[a, b] / (std[a] * std[b]))
+
+        color_correlation = float(np.mean([corr(0, 1), corr(0, 2), corr(1, 2)]))
+
+        ela: Dict[int, Dict[str, float]] = {}
+        for quality, hist in acc["ela_hists"].items():
+            mean, var = hist.mean_var()
+            std_error = math.sqrt(var)
+            ela[quality] = {
+                "mean_error": mean,
+                "std_error": std_error,
+                "max_error": hist.max_value(),
+                "anomaly_ratio": hist.fraction_above(mean + 2 * std_error),
+            }
+
+        reference = acc["ela_hists"][REFERENCE_QUALITY]
+        _, ela_enhanced_var = reference.mean_var(scale=20.0)
+
+        noise_map: NoiseMap = acc["noise_map"]
+
+        hashes = acc["block_hashes"]
+        duplicate_ratio = 1 - (len(set(hashes)) / len(hashes)) if hashes else 0.0
+
+        return {
+            "width": acc["width"],
+            "height": acc["height"],
+            "decode_scale": acc["decode_scale"],
+            "streamed": acc["streamed"],
+            "channel_means": [float(m) for m in means],
+            "pixel_variance": pixels.mean_var()[1],
+            "color_entropy": float(np.mean([pixels.entropy(c) for c in range(3)])),
+            "color_correlation": color_correlation,
+            "quadrant_variances": [q.mean_var()[1] for q in acc["quadrants"]],
+            "symmetry_difference": acc["symmetry_difference"],
+            "noise_level": acc["laplacian"].variance,
+            "edge_score": min(acc["edge_score"] / 50.0, 1.0),
+            "edge_diff": acc["edge_diff"],
+            "median_mean_diff": acc["median_mean_diff"],
+            "noise_ratio": noise_map.ratio,
+            "noise_regions": int(noise_map.variances.size),
+            "noise_map": noise_map,
+            "clone_duplicate_ratio": duplicate_ratio,
+            "clone_pairs": acc["clone_pairs"],
+            "ela": ela,
+            "ela_variance": ela_enhanced_var,
+            # Draft decoding moves the block grid, so the histograms are only kept at full scale
+            "dct_histograms": acc["dct_histograms"] if acc["decode_scale"] == 1.0 else None,
+            "thumbnail": acc["thumbnail"],
+        }
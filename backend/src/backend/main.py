@@ -2,12 +2,19 @@
 FastAPI application for OCR and document parsing.
 """
 
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from backend.routers import ocr, document_parser, corroboration
 from backend.config import settings
+from backend.forensics.executor import get_detector_pool
+from backend.providers import get_provider_client
+from backend.services.audit_log import get_audit_log
+from backend.services.audit_writer import get_audit_writer
+from backend.services.url_fetcher import get_url_fetcher
 
 
 @asynccontextmanager
@@ -15,9 +22,20 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
     # Startup
     print("🚀 Starting FastAPI application...")
+    get_audit_log().start_maintenance(
+        settings.AUDIT_MAINTENANCE_INTERVAL,
+        retention_days=settings.AUDIT_RETENTION_DAYS,
+        compact_after_days=settings.AUDIT_COMPACT_AFTER_DAYS,
+    )
     yield
     # Shutdown
     print("👋 Shutting down FastAPI application...")
+    # Flush queued audit entries and reports before anything else goes away
+    await asyncio.to_thread(get_audit_writer().close)
+    await asyncio.to_thread(get_audit_log().stop_maintenance)
+    get_detector_pool().shutdown()
+    await get_provider_client().aclose()
+    await get_url_fetcher().aclose()
 
 
 app = FastAPI(
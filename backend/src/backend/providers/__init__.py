@@ -0,0 +1,40 @@
+"""Async clients for external image-analysis APIs."""
+
+from backend.providers.base import (
+    AI_DETECTION,
+    REVERSE_SEARCH,
+    ExternalProvider,
+    ProviderError,
+    ProviderQuery,
+    ProviderResult,
+)
+from backend.providers.catalog import (
+    BingVisualSearchProvider,
+    GoogleVisionWebProvider,
+    HiveProvider,
+    SerpApiReverseImageProvider,
+    SightengineProvider,
+    TinEyeProvider,
+)
+from backend.providers.client import ProviderClient, get_provider_client
+from backend.providers.resilience import CircuitBreaker, RateLimiter, ResponseCache
+
+__all__ = [
+    "AI_DETECTION",
+    "REVERSE_SEARCH",
+    "ExternalProvider",
+    "ProviderError",
+    "ProviderQuery",
+    "ProviderResult",
+    "BingVisualSearchProvider",
+    "GoogleVisionWebProvider",
+    "HiveProvider",
+    "SerpApiReverseImageProvider",
+    "SightengineProvider",
+    "TinEyeProvider",
+    "ProviderClient",
+    "get_provider_client",
+    "CircuitBreaker",
+    "RateLimiter",
+    "ResponseCache",
+]
@@ -0,0 +1,120 @@
+"""Base types for external image-analysis providers."""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+AI_DETECTION = "ai_detection"
+REVERSE_SEARCH = "reverse_search"
+
+
+class ProviderError(Exception):
+    """Raised when a provider call fails."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        # Non-retryable errors (bad request, auth) do not trip the circuit breaker
+        self.retryable = retryable
+
+
+@dataclass
+class ProviderQuery:
+    """Image submitted to a provider, as raw bytes and/or a public URL."""
+
+    image_bytes: Optional[bytes] = None
+    image_url: Optional[str] = None
+    file_name: str = "image"
+
+    @property
+    def cache_key(self) -> str:
+        """Content hash of the image (or its URL when no bytes are given)."""
+        if self.image_bytes is not None:
+            return hashlib.sha256(self.image_bytes).hexdigest()
+        return f"url:{self.image_url}"
+
+
+@dataclass
+class ProviderResult:
+    """Normalised provider response."""
+
+    provider: str
+    kind: str
+    ai_probability: Optional[float] = None
+    matches: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    cached: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ExternalProvider:
+    """
+    One external API.
+
+    Subclasses describe how to build the HTTP request and how to parse the
+    response; pooling, limits, hedging, circuit breaking and caching are
+    handled by ProviderClient.
+    """
+
+    name: str = "provider"
+    kind: str = AI_DETECTION
+    endpoint: str = ""
+
+    # Per-provider limits (overridable per instance)
+    max_concurrency: int = 4
+    rate_per_second: float = 5.0
+    hedge_delay: float = 0.0  # Seconds before a duplicate request is sent (0 = no hedging)
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        hedge_delay: Optional[float] = None,
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            endpoint: Override the API endpoint (e.g. a local stub server)
+            max_concurrency: Maximum in-flight requests
+            rate_per_second: Sustained request rate (0 = unlimited)
+            hedge_delay: Delay before a hedged duplicate request
+        """
+        if endpoint is not None:
+            self.endpoint = endpoint
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+        if rate_per_second is not None:
+            self.rate_per_second = rate_per_second
+        if hedge_delay is not None:
+            self.hedge_delay = hedge_delay
+
+    @property
+    def enabled(self) -> bool:
+        """Whether credentials are configured."""
+        return True
+
+    def supports(self, query: ProviderQuery) -> bool:
+        """Whether this provider can handle the query (bytes vs URL input)."""
+        return query.image_bytes is not None or query.image_url is not None
+
+    def build_request(self, query: ProviderQuery) -> Dict[str, Any]:
+        """Keyword arguments for ``httpx.AsyncClient.request``."""
+        raise NotImplementedError
+
+    def parse(self, payload: Dict[str, Any]) -> ProviderResult:
+        """Convert the decoded JSON response into a ProviderResult."""
+        raise NotImplementedError
+
+    def check_response(self, response: httpx.Response):
+        """Raise ProviderError for unsuccessful responses."""
+        if response.status_code == 429 or response.status_code >= 500:
+            raise ProviderError(f"{self.name} returned HTTP {response.status_code}")
+        if response.status_code >= 400:
+            raise ProviderError(f"{self.name} returned HTTP {response.status_code}", retryable=False)
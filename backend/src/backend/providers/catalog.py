@@ -0,0 +1,254 @@
+"""Concrete external providers for AI-generation detection and reverse image search."""
+
+import base64
+from typing import Any, Dict, List
+
+from backend.providers.base import (
+    AI_DETECTION,
+    REVERSE_SEARCH,
+    ExternalProvider,
+    ProviderQuery,
+    ProviderResult,
+)
+
+
+def _unique(urls: List[str]) -> List[str]:
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+class SightengineProvider(ExternalProvider):
+    """Sightengine ``genai`` model (probability that an image is AI-generated)."""
+
+    name = "sightengine"
+    kind = AI_DETECTION
+    endpoint = "https://api.sightengine.com/1.0/check.json"
+    max_concurrency = 2
+    rate_per_second = 1.0
+
+    def __init__(self, api_user: str, api_secret: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api_user = api_user
+        self.api_secret = api_secret
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_user and self.api_secret)
+
+    def build_request(self, query: ProviderQuery) -> Dict[str, Any]:
+        params = {"models": "genai", "api_user": self.api_user, "api_secret": self.api_secret}
+        if query.image_bytes is None:
+            return {"method": "GET", "url": self.endpoint, "params": {**params, "url": query.image_url}}
+        return {
+            "method": "POST",
+            "url": self.endpoint,
+            "data": params,
+            "files": {"media": (query.file_name, query.image_bytes)},
+        }
+
+    def parse(self, payload: Dict[str, Any]) -> ProviderResult:
+        return ProviderResult(
+            provider=self.name,
+            kind=self.kind,
+            ai_probability=float(payload["type"]["ai_generated"]),
+        )
+
+
+class HiveProvider(ExternalProvider):
+    """Hive AI-generated content classifier (synchronous task API)."""
+
+    name = "hive"
+    kind = AI_DETECTION
+    endpoint = "https://api.thehive.ai/api/v2/task/sync"
+
+    def __init__(self, api_token: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api_token = api_token
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_token)
+
+    def build_request(self, query: ProviderQuery) -> Dict[str, Any]:
+        request: Dict[str, Any] = {
+            "method": "POST",
+            "url": self.endpoint,
+            "headers": {"Authorization": f"Token {self.api_token}"},
+        }
+        if query.image_bytes is None:
+            request["data"] = {"url": query.image_url}
+        else:
+            request["files"] = {"media": (query.file_name, query.image_bytes)}
+        return request
+
+    def parse(self, payload: Dict[str, Any]) -> ProviderResult:
+        classes = payload["status"][0]["response"]["output"][0]["classes"]
+        scores = {entry["class"]: float(entry["score"]) for entry in classes}
+        return ProviderResult(
+            provider=self.name,
+            kind=self.kind,
+            ai_probability=scores.get("ai_generated", 0.0),
+        )
+
+
+class SerpApiReverseImageProvider(ExternalProvider):
+    """Google reverse image search through SerpAPI (public image URLs only)."""
+
+    name = "serpapi"
+    kind = REVERSE_SEARCH
+    endpoint = "https://serpapi.com/search.json"
+    rate_per_second = 1.0
+
+    def __init__(self, api_key: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def supports(self, query: ProviderQuery) -> bool:
+        return query.image_url is not None
+
+    def build_request(self, query: ProviderQuery) -> Dict[str, Any]:
+        return {
+            "method": "GET",
+            "url": self.endpoint,
+            "params": {
+                "engine": "google_reverse_image",
+                "image_url": query.image_url,
+                "api_key": self.api_key,
+            },
+        }
+
+    def parse(self, payload: Dict[str, Any]) -> ProviderResult:
+        # "No results" is reported as an error message, not an HTTP error
+        results = payload.get("image_results", [])
+        return ProviderResult(
+            provider=self.name,
+            kind=self.kind,
+            matches=_unique([result.get("link", "") for result in results]),
+        )
+
+
+class GoogleVisionWebProvider(ExternalProvider):
+    """Google Cloud Vision web detection (full and partial matching images)."""
+
+    name = "google_vision"
+    kind = REVERSE_SEARCH
+    endpoint = "https://vision.googleapis.com/v1/images:annotate"
+
+    def __init__(self, api_key: str, max_results: int = 20, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self.max_results = max_results
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def build_request(self, query: ProviderQuery) -> Dict[str, Any]:
+        if query.image_bytes is None:
+            image = {"source": {"imageUri": query.image_url}}
+        else:
+            image = {"content": base64.b64encode(query.image_bytes).decode("ascii")}
+        return {
+            "method": "POST",
+            "url": self.endpoint,
+            "params": {"key": self.api_key},
+            "json": {"requests": [{
+                "image": image,
+                "features": [{"type": "WEB_DETECTION", "maxResults": self.max_results}],
+            }]},
+        }
+
+    def parse(self, payload: Dict[str, Any]) -> ProviderResult:
+        web = payload["responses"][0].get("webDetection", {})
+        images = web.get("fullMatchingImages", []) + web.get("partialMatchingImages", [])
+        return ProviderResult(
+            provider=self.name,
+            kind=self.kind,
+            matches=_unique([image.get("url", "") for image in images]),
+        )
+
+
+class BingVisualSearchProvider(ExternalProvider):
+    """Bing Visual Search "PagesIncluding" results (uploaded images only)."""
+
+    name = "bing"
+    kind = REVERSE_SEARCH
+    endpoint = "https://api.bing.microsoft.com/v7.0/images/visualsearch"
+
+    def __init__(self, api_key: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def supports(self, query: ProviderQuery) -> bool:
+        return query.image_bytes is not None
+
+    def build_request(self, query: ProviderQuery) -> Dict[str, Any]:
+        return {
+            "method": "POST",
+            "url": self.endpoint,
+            "headers": {"Ocp-Apim-Subscription-Key": self.api_key},
+            "files": {"image": (query.file_name, query.image_bytes)},
+        }
+
+    def parse(self, payload: Dict[str, Any]) -> ProviderResult:
+        urls: List[str] = []
+        for tag in payload.get("tags", []):
+            for action in tag.get("actions", []):
+                if action.get("actionType") == "PagesIncluding":
+                    urls.extend(value.get("hostPageUrl", "") for value in action.get("data", {}).get("value", []))
+        return ProviderResult(provider=self.name, kind=self.kind, matches=_unique(urls))
+
+
+class TinEyeProvider(ExternalProvider):
+    """TinEye reverse image search (REST API with ``x-api-key`` authentication)."""
+
+    name = "tineye"
+    kind = REVERSE_SEARCH
+    endpoint = "https://api.tineye.com/rest/search/"
+
+    def __init__(self, api_key: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def build_request(self, query: ProviderQuery) -> Dict[str, Any]:
+        request: Dict[str, Any] = {
+            "method": "POST",
+            "url": self.endpoint,
+            "headers": {"x-api-key": self.api_key},
+        }
+        if query.image_bytes is None:
+            request["data"] = {"image_url": query.image_url}
+        else:
+            request["files"] = {"image_upload": (query.file_name, query.image_bytes)}
+        return request
+
+    def parse(self, payload: Dict[str, Any]) -> ProviderResult:
+        matches = payload.get("results", {}).get("matches", [])
+        return ProviderResult(
+            provider=self.name,
+            kind=self.kind,
+            matches=_unique([match.get("image_url", "") for match in matches]),
+        )
+
+
+def build_default_providers(settings) -> List[ExternalProvider]:
+    """Instantiate every known provider from the application settings."""
+    return [
+        SightengineProvider(settings.SIGHTENGINE_API_USER, settings.SIGHTENGINE_API_SECRET),
+        HiveProvider(settings.HIVE_AI_API_TOKEN),
+        SerpApiReverseImageProvider(settings.SERPAPI_API_KEY),
+        GoogleVisionWebProvider(settings.GOOGLE_VISION_API_KEY),
+        BingVisualSearchProvider(settings.BING_VISUAL_SEARCH_KEY),
+        TinEyeProvider(settings.TINEYE_API_KEY),
+    ]
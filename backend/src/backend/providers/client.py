@@ -0,0 +1,218 @@
+"""Async client that runs external providers over a shared connection pool."""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from backend.config import settings
+from backend.providers.base import ExternalProvider, ProviderError, ProviderQuery, ProviderResult
+from backend.providers.catalog import build_default_providers
+from backend.providers.resilience import CircuitBreaker, RateLimiter, ResponseCache
+
+
+class ProviderClient:
+    """
+    Runs provider calls with shared pooling and per-provider protection.
+
+    - One ``httpx.AsyncClient`` (one connection pool) serves every provider.
+    - Each provider gets its own concurrency semaphore, token-bucket rate
+      limiter and circuit breaker.
+    - Slow calls can be hedged: if no answer arrives within the provider's
+      ``hedge_delay``, a duplicate request is sent and the first success wins.
+    - Successful results are cached by (provider, image content hash).
+    """
+
+    def __init__(
+        self,
+        providers: Optional[Sequence[ExternalProvider]] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the provider client.
+
+        Args:
+            providers: Providers to use (defaults to all providers from settings)
+            timeout: Per-request timeout in seconds
+            max_connections: Size of the shared connection pool
+            cache: Response cache (defaults to one sized from settings)
+            transport: Custom httpx transport (e.g. for a local stub server)
+        """
+        self.providers: List[ExternalProvider] = list(
+            providers if providers is not None else build_default_providers(settings)
+        )
+        self.timeout = timeout or settings.PROVIDER_TIMEOUT
+        self.max_connections = max_connections or settings.PROVIDER_MAX_CONNECTIONS
+        self.cache = cache or ResponseCache(settings.PROVIDER_CACHE_SIZE, settings.PROVIDER_CACHE_TTL)
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._limiters = {p.name: RateLimiter(p.rate_per_second) for p in self.providers}
+        self._breakers = {
+            p.name: CircuitBreaker(settings.PROVIDER_CIRCUIT_FAILURES, settings.PROVIDER_CIRCUIT_RESET)
+            for p in self.providers
+        }
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._http
+
+    def enabled_providers(self, kind: Optional[str] = None) -> List[ExternalProvider]:
+        """Providers with credentials configured, optionally filtered by kind."""
+        return [p for p in self.providers if p.enabled and (kind is None or p.kind == kind)]
+
+    async def query(
+        self,
+        kind: str,
+        image_bytes: Optional[bytes] = None,
+        image_url: Optional[str] = None,
+        file_name: str = "image",
+    ) -> List[ProviderResult]:
+        """
+        Query every enabled provider of a kind concurrently.
+
+        Failures are returned as results with ``error`` set, never raised.
+
+        Args:
+            kind: AI_DETECTION or REVERSE_SEARCH
+            image_bytes: Raw image data
+            image_url: Public image URL (for URL-only providers)
+            file_name: File name sent with multipart uploads
+
+        Returns:
+            One ProviderResult per applicable provider
+        """
+        query = ProviderQuery(image_bytes=image_bytes, image_url=image_url, file_name=file_name)
+        providers = [p for p in self.enabled_providers(kind) if p.supports(query)]
+        if not providers:
+            return []
+        return list(await asyncio.gather(*(self.query_provider(p, query) for p in providers)))
+
+    async def query_provider(self, provider: ExternalProvider, query: ProviderQuery) -> ProviderResult:
+        """Run one provider call through the cache, circuit breaker and hedging."""
+        cache_key = (provider.name, query.cache_key)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return ProviderResult(
+                provider=cached.provider,
+                kind=cached.kind,
+                ai_probability=cached.ai_probability,
+                matches=list(cached.matches),
+                cached=True,
+            )
+
+        breaker = self._breakers.setdefault(
+            provider.name,
+            CircuitBreaker(settings.PROVIDER_CIRCUIT_FAILURES, settings.PROVIDER_CIRCUIT_RESET),
+        )
+        if not breaker.allow():
+            return ProviderResult(provider=provider.name, kind=provider.kind, error="circuit open")
+
+        start = time.perf_counter()
+        try:
+            result = await self._hedged(provider, query)
+        except ProviderError as e:
+            if e.retryable:
+                breaker.record_failure()
+            else:
+                breaker.release()
+            return ProviderResult(provider=provider.name, kind=provider.kind, error=str(e),
+                                  elapsed=round(time.perf_counter() - start, 4))
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+
+        breaker.record_success()
+        result.elapsed = round(time.perf_counter() - start, 4)
+        self.cache.put(cache_key, result)
+        return result
+
+    async def _hedged(self, provider: ExternalProvider, query: ProviderQuery) -> ProviderResult:
+        """Send the request, adding one duplicate if the first is slow."""
+        first = asyncio.ensure_future(self._attempt(provider, query))
+        if provider.hedge_delay <= 0:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=provider.hedge_delay)
+        if done:
+            return first.result()
+
+        pending = {first, asyncio.ensure_future(self._attempt(provider, query))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(self, provider: ExternalProvider, query: ProviderQuery) -> ProviderResult:
+        """One HTTP request, bounded by the provider's concurrency and rate limits."""
+        semaphore = self._semaphores.get(provider.name)
+        if semaphore is None:
+            semaphore = self._semaphores[provider.name] = asyncio.Semaphore(provider.max_concurrency)
+        limiter = self._limiters.setdefault(provider.name, RateLimiter(provider.rate_per_second))
+
+        async with semaphore:
+            await limiter.acquire()
+            try:
+                response = await self.http.request(**provider.build_request(query))
+            except httpx.HTTPError as e:
+                raise ProviderError(f"{provider.name} request failed: {e.__class__.__name__}: {e}")
+
+        provider.check_response(response)
+        try:
+            return provider.parse(response.json())
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ProviderError(f"{provider.name} returned an unexpected response: {e}", retryable=False)
+
+    def info(self) -> Dict[str, Any]:
+        """Describe provider state for health checks."""
+        return {
+            "providers": {
+                p.name: {
+                    "kind": p.kind,
+                    "enabled": p.enabled,
+                    "circuit": self._breakers[p.name].state if p.name in self._breakers else CircuitBreaker.CLOSED,
+                }
+                for p in self.providers
+            },
+            "cache": self.cache.stats(),
+        }
+
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+_provider_client: Optional[ProviderClient] = None
+
+
+def get_provider_client() -> ProviderClient:
+    """Return the process-wide provider client configured from settings."""
+    global _provider_client
+    if _provider_client is None:
+        _provider_client = ProviderClient()
+    return _provider_client
@@ -1,8 +1,9 @@
 """Document and image corroboration API endpoints."""
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import PlainTextResponse
-from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request
+from fastapi.responses import PlainTextResponse, Response
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
 import json
 
 from backend.services.corroboration_service import CorroborationService
@@ -10,16 +11,103 @@ from backend.schemas.validation import (
     CorroborationReport,
     CorroborationRequest,
     ImageAnalysisResult,
+    QuickScreenResult,
 )
+from backend.forensics.detectors import registry as detector_registry
+from backend.forensics.executor import get_detector_pool
+from backend.forensics.heatmaps import HEATMAP_KINDS
+from backend.providers import get_provider_client
+from backend.services.ingestion import IngestionError, check_upload
+from backend.services.report_cache import etag_matches
+from backend.services.report_store import page_cursor
+from backend.services.url_fetcher import UrlFetchError, get_url_fetcher
 from backend.config import settings
 
 router = APIRouter()
 corroboration_service = CorroborationService()
 
+IMAGE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".tiff", ".bmp"]
+TEXT_DOCUMENT_EXTENSIONS = [".pdf", ".docx", ".txt"]
+
+
+async def _read_input(
+    file: Optional[UploadFile],
+    url: Optional[str],
+    allowed_extensions: List[str],
+    label: str,
+) -> Tuple[bytes, str]:
+    """
+    Read an uploaded file or download a URL.
+
+    URLs are streamed through the shared fetcher: the download aborts past
+    MAX_FILE_SIZE, the type is sniffed from the content, and unchanged
+    resources are served from the revalidated disk cache. Either way the
+    content then passes the ingestion guard, which checks the sniffed type
+    and the image decode budget from the headers alone.
+
+    Returns:
+        Tuple of (contents, file name whose extension reflects the content)
+    """
+    if (file is None) == (not url):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'file' or 'url'")
+
+    if url:
+        try:
+            resource = await get_url_fetcher().fetch(url, allowed_extensions)
+        except UrlFetchError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        return _check_content(resource.content, resource.file_name, allowed_extensions)
+
+    # Validate file extension
+    file_ext = f".{file.filename.split('.')[-1].lower()}"
+    if file_ext not in allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported {label} type. Allowed: {allowed_extensions}"
+        )
+
+    # Check file size
+    contents = await file.read()
+    if len(contents) > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB"
+        )
+    return _check_content(contents, file.filename, allowed_extensions, file.content_type)
+
+
+def _check_content(
+    contents: bytes,
+    filename: str,
+    allowed_extensions: List[str],
+    content_type: Optional[str] = None,
+) -> Tuple[bytes, str]:
+    """Run the ingestion guard; the returned file name carries the sniffed extension."""
+    try:
+        filename, _ = check_upload(contents, filename, allowed_extensions, content_type)
+    except IngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return contents, filename
+
+
+def _parse_detectors(detectors: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated detector subset and reject unknown names."""
+    if not detectors:
+        return None
+    names = [name.strip() for name in detectors.split(",") if name.strip()]
+    unknown = [name for name in names if name not in detector_registry]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown detectors: {unknown}. Available: {detector_registry.names()}"
+        )
+    return names or None
+
 
 @router.post("/analyze", response_model=CorroborationReport)
 async def analyze_document(
-    file: UploadFile = File(..., description="Document or image file to analyze"),
+    file: Optional[UploadFile] = File(default=None, description="Document or image file to analyze"),
+    url: Optional[str] = Form(default=None, description="http(s) URL to analyze instead of an upload"),
     perform_format_validation: bool = Form(default=True, description="Enable format validation"),
     perform_structure_validation: bool = Form(default=True, description="Enable structure validation"),
     perform_content_validation: bool = Form(default=True, description="Enable content validation"),
@@ -27,6 +115,7 @@ async def analyze_document(
     expected_document_type: Optional[str] = Form(default=None, description="Expected document type (e.g., 'invoice', 'contract')"),
     enable_reverse_image_search: bool = Form(default=False, description="Enable reverse image search"),
     risk_threshold: float = Form(default=50.0, description="Risk score threshold for flagging (0-100)"),
+    detectors: Optional[str] = Form(default=None, description="Comma-separated image detectors to run (see /detectors)"),
 ):
     """
     Perform comprehensive document corroboration analysis.
@@ -37,23 +126,11 @@ async def analyze_document(
     - Content validation (quality, PII detection)
     - Image analysis (authenticity, AI detection, tampering)
 
+    The input is an uploaded file or an http(s) URL.
+
     Returns detailed risk assessment and recommendations.
     """
-    # Validate file extension
-    file_ext = f".{file.filename.split('.')[-1].lower()}"
-    if file_ext not in settings.ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type. Allowed: {settings.ALLOWED_EXTENSIONS}"
-        )
-
-    # Check file size
-    contents = await file.read()
-    if len(contents) > settings.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB"
-        )
+    contents, filename = await _read_input(file, url, settings.ALLOWED_EXTENSIONS, "file")
 
     # Create request object
     request = CorroborationRequest(
@@ -64,12 +141,13 @@ async def analyze_document(
         expected_document_type=expected_document_type,
         enable_reverse_image_search=enable_reverse_image_search,
         risk_threshold=risk_threshold,
+        detectors=_parse_detectors(detectors),
     )
 
     try:
         report = await corroboration_service.analyze_document(
             file_bytes=contents,
-            filename=file.filename,
+            filename=filename,
             request=request,
         )
         return report
@@ -79,8 +157,10 @@ async def analyze_document(
 
 @router.post("/analyze-image", response_model=ImageAnalysisResult)
 async def analyze_image_only(
-    file: UploadFile = File(..., description="Image file to analyze"),
+    file: Optional[UploadFile] = File(default=None, description="Image file to analyze"),
+    url: Optional[str] = Form(default=None, description="http(s) URL of the image to analyze instead of an upload"),
     enable_reverse_search: bool = Form(default=False, description="Enable reverse image search"),
+    detectors: Optional[str] = Form(default=None, description="Comma-separated image detectors to run (see /detectors)"),
 ):
     """
     Perform image-only analysis for authenticity verification.
@@ -92,92 +172,181 @@ async def analyze_image_only(
     - Forensic analysis
     - Reverse image search (optional)
 
+    The input is an uploaded file or an http(s) URL.
+
     Returns detailed image analysis results.
     """
-    # Validate file extension
-    file_ext = f".{file.filename.split('.')[-1].lower()}"
-    if file_ext not in [".png", ".jpg", ".jpeg", ".tiff", ".bmp"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported image type. Allowed: ['.png', '.jpg', '.jpeg', '.tiff', '.bmp']"
-        )
-
-    # Check file size
-    contents = await file.read()
-    if len(contents) > settings.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB"
-        )
+    detector_names = _parse_detectors(detectors)
+    contents, filename = await _read_input(file, url, IMAGE_EXTENSIONS, "image")
 
     try:
         result = await corroboration_service.analyze_image_only(
             file_bytes=contents,
-            filename=file.filename,
+            filename=filename,
             enable_reverse_search=enable_reverse_search,
+            detectors=detector_names,
         )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Image analysis failed: {str(e)}")
 
 
+@router.post("/analyze-image/quick", response_model=QuickScreenResult)
+async def quick_screen_image(
+    file: Optional[UploadFile] = File(default=None, description="Image file to pre-screen"),
+    url: Optional[str] = Form(default=None, description="http(s) URL of the image to pre-screen instead of an upload"),
+):
+    """
+    Fast pre-screen for upload triage.
+
+    Checks:
+    - EXIF editing software and timestamp mismatches (header only)
+    - JPEG quantization tables (header only)
+    - Coarse colour/edge statistics on a draft-mode (1/8 scale) decode
+
+    Returns whether the image warrants full analysis.
+    """
+    contents, _ = await _read_input(file, url, IMAGE_EXTENSIONS, "image")
+
+    try:
+        return await corroboration_service.quick_screen_image(contents)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Image pre-screen failed: {str(e)}")
+
+
+def _not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """A 304 response if the request's If-None-Match matches ``etag``."""
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
 @router.get("/report/{document_id}", response_model=CorroborationReport)
-async def get_report(document_id: str):
+async def get_report(document_id: str, request: Request):
     """
     Retrieve a previously generated corroboration report.
 
+    Responses carry a strong ETag; a request whose If-None-Match matches it
+    gets 304 Not Modified, answered from memory when the report is cached.
+
     Args:
         document_id: Unique document identifier from analysis
 
     Returns:
         Complete corroboration report with all findings
     """
-    report = await corroboration_service.get_report(document_id)
+    not_modified = _not_modified(request, corroboration_service.report_etag(document_id))
+    if not_modified:
+        return not_modified
 
-    if not report:
+    entry = await corroboration_service.get_report_entry(document_id)
+
+    if not entry:
         raise HTTPException(
             status_code=404,
             detail=f"Report not found for document_id: {document_id}"
         )
 
-    return report
+    return _not_modified(request, entry.etag) or Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={"ETag": entry.etag, "Cache-Control": "no-cache"},
+    )
 
 
 @router.get("/report/{document_id}/markdown", response_class=PlainTextResponse)
-async def get_report_markdown(document_id: str):
+async def get_report_markdown(document_id: str, request: Request):
     """
     Retrieve a report in markdown format.
 
+    The markdown is rendered once per cached report and served with a
+    strong ETag; matching conditional requests get 304 Not Modified.
+
     Args:
         document_id: Unique document identifier
 
     Returns:
         Markdown formatted report
     """
-    markdown = await corroboration_service.export_report_markdown(document_id)
+    not_modified = _not_modified(request, corroboration_service.report_etag(document_id, markdown=True))
+    if not_modified:
+        return not_modified
 
-    if not markdown:
+    entry = await corroboration_service.get_markdown_entry(document_id)
+
+    if not entry:
         raise HTTPException(
             status_code=404,
             detail=f"Report not found for document_id: {document_id}"
         )
 
-    return markdown
+    return _not_modified(request, entry.markdown_etag) or PlainTextResponse(
+        entry.markdown,
+        headers={"ETag": entry.markdown_etag, "Cache-Control": "no-cache"},
+    )
+
+
+@router.get(
+    "/report/{document_id}/heatmap/{kind}",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}}},
+)
+async def get_report_heatmap(document_id: str, kind: str):
+    """
+    Retrieve a forensic heat map as a PNG image.
+
+    The PNG is rendered from the stored compact map on first request and
+    cached next to the report files.
+
+    Args:
+        document_id: Unique document identifier
+        kind: Heat map kind (ela, noise, clone, jpeg)
+
+    Returns:
+        PNG image
+    """
+    if kind not in HEATMAP_KINDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid heat map kind. Must be one of: {', '.join(HEATMAP_KINDS)}"
+        )
+
+    png = await corroboration_service.get_heatmap_png(document_id, kind)
+
+    if png is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Heat map '{kind}' not found for document_id: {document_id}"
+        )
+
+    return Response(content=png, media_type="image/png")
 
 
 @router.get("/reports", response_model=List[Dict[str, Any]])
 async def list_reports(
+    response: Response,
     limit: int = 100,
     risk_level: Optional[str] = None,
     requires_manual_review: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    file_hash: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """
-    List corroboration reports with optional filtering.
+    List corroboration reports, newest first, with optional filtering.
+
+    Results are paginated by keyset: when a full page is returned, the
+    ``X-Next-Cursor`` response header holds the cursor for the next one.
 
     Args:
         limit: Maximum number of reports to return (default: 100)
         risk_level: Filter by risk level (low, medium, high, critical)
         requires_manual_review: Filter by manual review requirement (true/false)
+        since: Only reports analysed at or after this time (ISO 8601)
+        until: Only reports analysed before this time (ISO 8601)
+        file_hash: Only reports of files with this SHA-256 (hex)
+        cursor: Value of ``X-Next-Cursor`` from the previous page
 
     Returns:
         List of report summaries
@@ -187,17 +356,59 @@ async def list_reports(
             status_code=400,
             detail="Invalid risk_level. Must be one of: low, medium, high, critical"
         )
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
 
     try:
         reports = await corroboration_service.list_reports(
             limit=limit,
             risk_level=risk_level,
             requires_manual_review=requires_manual_review,
+            since=since,
+            until=until,
+            file_hash=file_hash,
+            cursor=cursor,
         )
-        return reports
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list reports: {str(e)}")
 
+    next_cursor = page_cursor(reports, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return reports
+
+
+@router.get("/audit-log", response_model=List[Dict[str, Any]])
+async def read_audit_log(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 1000,
+):
+    """
+    Read the audit trail for a time range.
+
+    Only the segments and index blocks that overlap the range are read.
+
+    Args:
+        since: Only entries logged at or after this time (ISO 8601)
+        until: Only entries logged before this time (ISO 8601)
+        limit: Maximum number of entries to return (default: 1000)
+
+    Returns:
+        Audit entries, oldest segment first
+    """
+    if limit < 1 or limit > 10000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 10000")
+    if since and until and since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+
+    try:
+        return await corroboration_service.read_audit_log(since=since, until=until, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read audit log: {str(e)}")
+
 
 @router.post("/validate-format")
 async def validate_format_only(
@@ -214,20 +425,7 @@ async def validate_format_only(
 
     Faster than full analysis, useful for pre-screening.
     """
-    file_ext = f".{file.filename.split('.')[-1].lower()}"
-
-    if file_ext not in [".pdf", ".docx", ".txt"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Unsupported file type for format validation"
-        )
-
-    contents = await file.read()
-    if len(contents) > settings.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB"
-        )
+    contents, filename = await _read_input(file, None, TEXT_DOCUMENT_EXTENSIONS, "file")
 
     # Create minimal request for format validation only
     request = CorroborationRequest(
@@ -240,7 +438,7 @@ async def validate_format_only(
     try:
         report = await corroboration_service.analyze_document(
             file_bytes=contents,
-            filename=file.filename,
+            filename=filename,
             request=request,
         )
         return {"format_validation": report.format_validation, "risk_score": report.risk_score}
@@ -264,20 +462,7 @@ async def validate_structure_only(
 
     Useful for verifying document structure before full analysis.
     """
-    file_ext = f".{file.filename.split('.')[-1].lower()}"
-
-    if file_ext not in [".pdf", ".docx", ".txt"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Unsupported file type for structure validation"
-        )
-
-    contents = await file.read()
-    if len(contents) > settings.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB"
-        )
+    contents, filename = await _read_input(file, None, TEXT_DOCUMENT_EXTENSIONS, "file")
 
     # Create minimal request for structure validation only
     request = CorroborationRequest(
@@ -291,7 +476,7 @@ async def validate_structure_only(
     try:
         report = await corroboration_service.analyze_document(
             file_bytes=contents,
-            filename=file.filename,
+            filename=filename,
             request=request,
         )
         return {"structure_validation": report.structure_validation, "risk_score": report.risk_score}
@@ -299,6 +484,17 @@ async def validate_structure_only(
         raise HTTPException(status_code=500, detail=f"Structure validation failed: {str(e)}")
 
 
+@router.get("/detectors")
+async def list_detectors():
+    """
+    List the registered image detectors.
+
+    Returns:
+        Detector names with their inputs, relative cost, weight and severity
+    """
+    return {"detectors": detector_registry.describe()}
+
+
 @router.get("/health")
 async def corroboration_health_check():
     """Check if corroboration service is operational."""
@@ -310,7 +506,10 @@ async def corroboration_health_check():
             "structure_validation",
             "content_validation",
             "image_analysis",
+            "image_quick_screen",
             "risk_scoring",
             "audit_trails"
-        ]
+        ],
+        "image_analysis_pool": get_detector_pool().info(),
+        "external_providers": get_provider_client().info(),
     }
@@ -4,6 +4,7 @@ from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import List, Dict, Any
 
 from backend.services.document_service import DocumentService
+from backend.services.ingestion import IngestionError, check_upload
 from backend.schemas.document import DocumentParseResponse
 from backend.config import settings
 
@@ -42,10 +43,16 @@ async def parse_document(
             detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB"
         )
 
+    # Trust the content, not the extension; image headers are checked against the decode budget
+    try:
+        filename, _ = check_upload(contents, file.filename, settings.ALLOWED_EXTENSIONS, file.content_type)
+    except IngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
     try:
         result = await document_service.parse_document_bytes(
             file_bytes=contents,
-            filename=file.filename,
+            filename=filename,
         )
         return result
     except Exception as e:
@@ -83,12 +90,18 @@ async def extract_tables(
             detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB"
         )
 
+    # Same admission policy as /parse: the content must really be a PDF or DOCX
+    try:
+        filename, _ = check_upload(contents, file.filename, [".pdf", ".docx"], file.content_type)
+    except IngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
     try:
         # Create temporary file for processing
         import tempfile
         from pathlib import Path
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp_file:
             tmp_file.write(contents)
             tmp_path = Path(tmp_file.name)
 
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 
 from backend.services.ocr_service import OCRService
+from backend.services.ingestion import IngestionError, check_upload
 from backend.schemas.ocr import OCRResponse
 from backend.config import settings
 
@@ -42,10 +43,16 @@ async def extract_text_from_image(
             detail=f"File size exceeds maximum allowed size of {settings.MAX_FILE_SIZE / (1024*1024)}MB"
         )
 
+    # Trust the content, not the extension; image headers are checked against the decode budget
+    try:
+        filename, _ = check_upload(contents, file.filename, [".png", ".jpg", ".jpeg", ".tiff", ".bmp"])
+    except IngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
     try:
         result = await ocr_service.process_image_bytes(
             file_bytes=contents,
-            filename=file.filename,
+            filename=filename,
         )
         return result
     except Exception as e:
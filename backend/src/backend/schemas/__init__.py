@@ -11,6 +11,8 @@ from backend.schemas.validation import (
     StructureValidationResult,
     ContentValidationResult,
     ImageAnalysisResult,
+    PageAnalysis,
+    QuickScreenResult,
     RiskScore,
 )
 
@@ -27,5 +29,7 @@ __all__ = [
     "StructureValidationResult",
     "ContentValidationResult",
     "ImageAnalysisResult",
+    "PageAnalysis",
+    "QuickScreenResult",
     "RiskScore",
 ]
@@ -28,6 +28,7 @@ class OCRTextResult(BaseModel):
     text: str
     confidence: float
     bounding_box: Optional[BoundingBox] = None
+    page: Optional[int] = None  # 1-based page of multi-frame images
 
 
 class OCRResponse(BaseModel):
@@ -48,6 +48,20 @@ class StructureValidationResult(BaseModel):
     issues: List[ValidationIssue] = Field(default=[], description="List of structure issues found")
 
 
+class PageAnalysis(BaseModel):
+    """Per-page summary of a multi-frame image (e.g. a scanned TIFF)."""
+
+    page: int = Field(description="1-based page (frame) number")
+    width: int = Field(description="Page width in pixels")
+    height: int = Field(description="Page height in pixels")
+    is_ai_generated: bool = Field(description="Whether the page appears to be AI-generated")
+    ai_detection_confidence: float = Field(ge=0.0, le=1.0, description="AI detection confidence for the page")
+    is_tampered: bool = Field(description="Whether the page shows signs of tampering")
+    tampering_confidence: float = Field(ge=0.0, le=1.0, description="Tampering confidence for the page")
+    perceptual_hash: Optional[str] = Field(default=None, description="pHash of the page, hex encoded")
+    finding_count: int = Field(default=0, description="Forensic findings reported for the page")
+
+
 class ImageAnalysisResult(BaseModel):
     """Results from image authenticity analysis."""
 
@@ -66,6 +80,35 @@ class ImageAnalysisResult(BaseModel):
         default=0,
         description="Number of matches found in reverse image search"
     )
+    reverse_image_match_ids: List[str] = Field(
+        default=[],
+        description="Document ids of previously analysed near-duplicate images"
+    )
+    perceptual_hash: Optional[str] = Field(
+        default=None,
+        description="64-bit perceptual hash (pHash) of the image, hex encoded"
+    )
+    document_id: Optional[str] = Field(
+        default=None,
+        description="Identifier the image was indexed and its heat maps stored under"
+    )
+    heatmaps: List[str] = Field(
+        default=[],
+        description="Heat map kinds available at /report/{document_id}/heatmap/{kind}"
+    )
+    heatmap_page: Optional[int] = Field(
+        default=None,
+        description="Page the heat maps belong to (the most suspicious one) for multi-frame images"
+    )
+    page_count: int = Field(default=1, description="Number of frames (pages) analysed")
+    pages: List[PageAnalysis] = Field(
+        default=[],
+        description="Per-page results for multi-frame images; findings carry their page number"
+    )
+    skipped_detectors: List[str] = Field(
+        default=[],
+        description="Detectors skipped because the risk score already reached the critical threshold"
+    )
     metadata_issues: List[ValidationIssue] = Field(
         default=[],
         description="Issues found in image metadata"
@@ -74,6 +117,37 @@ class ImageAnalysisResult(BaseModel):
         default=[],
         description="Forensic analysis findings"
     )
+    detector_timings: Dict[str, float] = Field(
+        default={},
+        description="Execution time of each detector in seconds"
+    )
+
+
+class QuickScreenResult(BaseModel):
+    """Results from the fast image pre-screen (headers and draft decode only)."""
+
+    requires_full_analysis: bool = Field(description="Whether the image should go through full analysis")
+    suspicion_score: float = Field(
+        ge=0.0, le=1.0,
+        description="Combined suspicion from header and coarse pixel signals (0-1)"
+    )
+    image_format: Optional[str] = Field(None, description="Detected image format")
+    width: int = Field(description="Image width in pixels")
+    height: int = Field(description="Image height in pixels")
+    draft_scale: float = Field(description="Scale of the decode used for pixel heuristics (1.0 = full)")
+    metadata_issues: List[ValidationIssue] = Field(
+        default=[],
+        description="Issues found in image metadata"
+    )
+    findings: List[ValidationIssue] = Field(
+        default=[],
+        description="Quantization and coarse pixel findings"
+    )
+    statistics: Dict[str, float] = Field(
+        default={},
+        description="Coarse colour, edge and quantization statistics"
+    )
+    processing_time: float = Field(description="Time taken to screen in seconds")
 
 
 class ContentValidationResult(BaseModel):
@@ -120,6 +194,7 @@ class CorroborationReport(BaseModel):
     document_id: str = Field(description="Unique identifier for the document")
     file_name: str = Field(description="Original file name")
     file_type: str = Field(description="File type/extension")
+    file_hash: Optional[str] = Field(default=None, description="SHA-256 of the analysed file (hex)")
     analysis_timestamp: datetime = Field(description="When the analysis was performed")
 
     # Validation results
@@ -165,3 +240,7 @@ class CorroborationRequest(BaseModel):
         ge=0.0, le=100.0,
         description="Risk score threshold for flagging (0-100)"
     )
+    detectors: Optional[List[str]] = Field(
+        None,
+        description="Image detectors to run (default: the analyzer's standard set, see /detectors)"
+    )
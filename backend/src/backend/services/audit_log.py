@@ -0,0 +1,496 @@
+"""Time-partitioned, append-only audit log with sparse block indexes, retention and compaction."""
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from backend.config import settings
+from backend.services.report_store import format_timestamp
+
+# audit_log_<YYYYMMDD>[_<HH>].jsonl[.gz|.compacting]
+_PART_PATTERN = re.compile(r"^audit_log_(\d{8}(?:_\d{2})?)\.(jsonl|jsonl\.gz|jsonl\.compacting)$")
+_TIMESTAMP_PATTERN = re.compile(rb'"timestamp":\s*"([^"]*)"')
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}")
+
+ACTIVE = "jsonl"
+COMPACTED = "jsonl.gz"
+COMPACTING = "jsonl.compacting"
+
+
+def encode_entry(entry: Dict[str, Any]) -> bytes:
+    """One compact JSONL audit line (no padding, no indentation)."""
+    return (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+
+
+def _entry_timestamp(line: bytes) -> str:
+    match = _TIMESTAMP_PATTERN.search(line)
+    return match.group(1).decode() if match else ""
+
+
+@dataclass
+class IndexBlock:
+    """
+    One sparse index entry: a run of consecutive lines in a segment file.
+
+    In compacted segments each block is a separate gzip member, so it can
+    be read and decompressed on its own.
+
+    Attributes:
+        offset: Byte offset of the block in the file
+        length: Byte length of the block
+        min_timestamp: Earliest entry timestamp in the block
+        max_timestamp: Latest entry timestamp in the block
+        count: Entries in the block
+    """
+
+    offset: int
+    length: int = 0
+    min_timestamp: str = ""
+    max_timestamp: str = ""
+    count: int = 0
+
+    def add(self, timestamp: str, size: int):
+        if not self.count or timestamp < self.min_timestamp:
+            self.min_timestamp = timestamp
+        if not self.count or timestamp > self.max_timestamp:
+            self.max_timestamp = timestamp
+        self.length += size
+        self.count += 1
+
+    def overlaps(self, since: Optional[str], until: Optional[str]) -> bool:
+        return not ((since and self.max_timestamp < since) or (until and self.min_timestamp >= until))
+
+    def to_line(self) -> str:
+        return f"{self.offset}\t{self.length}\t{self.min_timestamp}\t{self.max_timestamp}\t{self.count}\n"
+
+    @classmethod
+    def from_line(cls, line: str) -> "IndexBlock":
+        offset, length, min_timestamp, max_timestamp, count = line.rstrip("\n").split("\t")
+        return cls(int(offset), int(length), min_timestamp, max_timestamp, int(count))
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _read_index(path: Path, size: int) -> List[IndexBlock]:
+    """Index blocks of a part, dropping any that point past its end (e.g. after a crash)."""
+    blocks = []
+    try:
+        with open(_index_path(path)) as f:
+            for line in f:
+                try:
+                    block = IndexBlock.from_line(line)
+                except ValueError:
+                    break
+                if block.offset + block.length > size:
+                    break
+                blocks.append(block)
+    except FileNotFoundError:
+        pass
+    return blocks
+
+
+def _is_entry(line: bytes) -> bool:
+    try:
+        json.loads(line)
+    except ValueError:
+        return False
+    return True
+
+
+def _complete_lines(data: bytes) -> List[bytes]:
+    """Lines of ``data``, leaving out a trailing partial line."""
+    return data.splitlines(keepends=True)[: data.count(b"\n")]
+
+
+class AuditLog:
+    """
+    Audit trail split into time-partitioned, append-only segment files.
+
+    An entry goes to the segment of its own timestamp
+    (``audit_log_YYYYMMDD.jsonl``, or ``audit_log_YYYYMMDD_HH.jsonl`` for
+    segments shorter than a day). Next to every segment file, a sparse
+    ``.idx`` file records one line per block of ``index_interval`` entries:
+    the block's byte range and its earliest and latest timestamps. A range
+    query skips segments that start after the range, reads only the index
+    of the others and seeks straight to the blocks that overlap it. Entries
+    appended since the last full block are scanned from the end of the
+    last indexed block.
+
+    Retention deletes segments not written to for ``retention_days``.
+    Compaction rewrites segments idle for ``compact_after_days`` as gzip
+    files sorted by timestamp. Each index block becomes its own gzip member,
+    so the file still works with ``zcat`` and range queries can still seek
+    into it. Compaction runs in a background thread. It holds the segment
+    lock only to rename files, so writers never wait for the rewrite.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        segment_hours: int = 24,
+        index_interval: int = 64,
+        fsync: bool = True,
+    ):
+        """
+        Initialize the audit log.
+
+        Args:
+            directory: Directory of the segment files
+            segment_hours: Time span of one segment (a divisor of 24)
+            index_interval: Entries per sparse index block
+            fsync: fsync segment files after every append
+        """
+        if segment_hours <= 0 or 24 % segment_hours:
+            raise ValueError(f"segment_hours must divide 24, got {segment_hours}")
+        self.directory = directory or Path(settings.AUDIT_LOG_PATH)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_hours = segment_hours
+        self.index_interval = max(1, index_interval)
+        self.fsync = fsync
+
+        # Held by appends, by readers while they open files, and by
+        # compaction/retention while they rename or delete them
+        self._lock = threading.Lock()
+        self._blocks: Dict[Path, IndexBlock] = {}
+        self._compaction_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._maintenance: Optional[threading.Thread] = None
+
+    def segment_key(self, timestamp: str) -> str:
+        """Segment an entry with this timestamp belongs to."""
+        if not _DATE_PATTERN.match(timestamp):
+            timestamp = time.strftime("%Y-%m-%dT%H")
+        day = timestamp[:10].replace("-", "")
+        if self.segment_hours >= 24:
+            return day
+        hour = int(timestamp[11:13])
+        return f"{day}_{hour - hour % self.segment_hours:02d}"
+
+    def _part(self, key: str, kind: str) -> Path:
+        return self.directory / f"audit_log_{key}.{kind}"
+
+    def _segments(self) -> Dict[str, Dict[str, Path]]:
+        """Segment key -> {kind: path} of the part files on disk."""
+        segments: Dict[str, Dict[str, Path]] = {}
+        for path in self.directory.iterdir():
+            match = _PART_PATTERN.match(path.name)
+            if match:
+                segments.setdefault(match.group(1), {})[match.group(2)] = path
+        return segments
+
+    # Writing
+
+    def append(self, entries: List[Dict[str, Any]]):
+        """
+        Append entries to their segments, extending the sparse indexes.
+
+        Args:
+            entries: Audit entries, each with a ``timestamp`` from format_timestamp
+        """
+        by_segment: Dict[str, List[Tuple[str, bytes]]] = {}
+        for entry in entries:
+            timestamp = str(entry.get("timestamp") or "")
+            by_segment.setdefault(self.segment_key(timestamp), []).append((timestamp, encode_entry(entry)))
+
+        with self._lock:
+            for key, lines in by_segment.items():
+                self._append_segment(self._part(key, ACTIVE), lines)
+
+    def _append_segment(self, path: Path, lines: List[Tuple[str, bytes]]):
+        block = self._blocks.get(path) or self._recover_block(path)
+        with open(path, "ab") as f:
+            offset = os.fstat(f.fileno()).st_size
+            end = block.offset + block.length
+            if end < offset:
+                # Torn last line from a crash mid-write: terminate it and keep
+                # it in the open block (readers skip it)
+                block.length += offset - end + f.write(b"\n")
+            elif end > offset:
+                # Truncated underneath us: restart indexing at the new end
+                block = IndexBlock(offset)
+            f.write(b"".join(line for _, line in lines))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+        full = []
+        for timestamp, line in lines:
+            block.add(timestamp, len(line))
+            if block.count >= self.index_interval:
+                full.append(block)
+                block = IndexBlock(block.offset + block.length)
+        if full:
+            # The index is derived data: written after the entries, never fsynced
+            with open(_index_path(path), "a") as f:
+                f.write("".join(b.to_line() for b in full))
+        self._blocks[path] = block
+
+    def _recover_block(self, path: Path) -> IndexBlock:
+        """Open block of a part appended to by an earlier process (its unindexed tail)."""
+        if not path.exists():
+            return IndexBlock(0)
+        size = path.stat().st_size
+        blocks = _read_index(path, size)
+        block = IndexBlock(blocks[-1].offset + blocks[-1].length if blocks else 0)
+        with open(path, "rb") as f:
+            f.seek(block.offset)
+            for line in _complete_lines(f.read()):
+                block.add(_entry_timestamp(line), len(line))
+        return block
+
+    # Reading
+
+    def read(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Entries with ``since <= timestamp < until``, oldest segment first.
+
+        Within a segment, entries come in file order: append order for
+        active segments, timestamp order for compacted ones.
+
+        Args:
+            since: Inclusive lower bound
+            until: Exclusive upper bound
+            limit: Maximum number of entries
+
+        Returns:
+            Audit entries
+        """
+        low = format_timestamp(since) if since else None
+        high = format_timestamp(until) if until else None
+        entries: List[Dict[str, Any]] = []
+        for line in self._scan(low, high):
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Torn line left by a crash
+                continue
+            if limit is not None and len(entries) >= limit:
+                break
+        return entries
+
+    def _scan(self, since: Optional[str], until: Optional[str]) -> Iterator[bytes]:
+        with self._lock:
+            # Open everything under the lock: renames and deletes by compaction
+            # or retention cannot then pull a file out from under this read
+            opened = []
+            for key, parts in sorted(self._segments().items()):
+                if until and self._segment_start(key) >= until:
+                    continue
+                for kind in (COMPACTED, COMPACTING, ACTIVE):
+                    if kind in parts:
+                        f = open(parts[kind], "rb")
+                        size = os.fstat(f.fileno()).st_size
+                        opened.append((f, kind, _read_index(parts[kind], size), size))
+
+        try:
+            for f, kind, blocks, size in opened:
+                yield from self._scan_part(f, kind, blocks, size, since, until)
+        finally:
+            for f, *_ in opened:
+                f.close()
+
+    @staticmethod
+    def _segment_start(key: str) -> str:
+        hour = key[9:11] if len(key) > 8 else "00"
+        return f"{key[:4]}-{key[4:6]}-{key[6:8]}T{hour}:00:00"
+
+    @staticmethod
+    def _scan_part(
+        f: BinaryIO,
+        kind: str,
+        blocks: List[IndexBlock],
+        size: int,
+        since: Optional[str],
+        until: Optional[str],
+    ) -> Iterator[bytes]:
+        tail = 0
+        for block in blocks:
+            tail = block.offset + block.length
+            if not block.overlaps(since, until):
+                continue
+            f.seek(block.offset)
+            data = f.read(block.length)
+            if kind == COMPACTED:
+                data = gzip.decompress(data)
+            yield from AuditLog._filter(data.splitlines(), since, until)
+
+        if kind != COMPACTED and tail < size:
+            f.seek(tail)
+            yield from AuditLog._filter(_complete_lines(f.read(size - tail)), since, until)
+
+    @staticmethod
+    def _filter(lines: List[bytes], since: Optional[str], until: Optional[str]) -> Iterator[bytes]:
+        for line in lines:
+            timestamp = _entry_timestamp(line)
+            if (since and timestamp < since) or (until and timestamp >= until):
+                continue
+            yield line
+
+    # Retention and compaction
+
+    def maintain(
+        self,
+        retention_days: float = 0,
+        compact_after_days: float = 0,
+        now: Optional[float] = None,
+    ) -> Dict[str, int]:
+        """
+        Apply the retention policy, then compact idle segments.
+
+        Args:
+            retention_days: Delete segments not written to for this long (0 = keep)
+            compact_after_days: Compact segments not written to for this long (0 = never)
+            now: Current time as a UNIX timestamp (for tests and replays)
+
+        Returns:
+            Counts of deleted and compacted segments
+        """
+        now = time.time() if now is None else now
+        stats = {"deleted": 0, "compacted": 0}
+        with self._compaction_lock:
+            for key, parts in sorted(self._segments().items()):
+                last_write = self._last_write(parts)
+                if last_write is None:
+                    continue
+                idle_days = (now - last_write) / 86400
+                if retention_days and idle_days >= retention_days:
+                    self._delete_segment(key)
+                    stats["deleted"] += 1
+                elif compact_after_days and idle_days >= compact_after_days and set(parts) != {COMPACTED}:
+                    self.compact(key)
+                    stats["compacted"] += 1
+        return stats
+
+    @staticmethod
+    def _last_write(parts: Dict[str, Path]) -> Optional[float]:
+        """Latest modification time of a segment's parts (compaction preserves it)."""
+        times = []
+        for path in parts.values():
+            try:
+                times.append(path.stat().st_mtime)
+            except FileNotFoundError:
+                pass
+        return max(times) if times else None
+
+    def _delete_segment(self, key: str):
+        with self._lock:
+            for kind in (ACTIVE, COMPACTING, COMPACTED):
+                path = self._part(key, kind)
+                self._blocks.pop(path, None)
+                for target in (path, _index_path(path)):
+                    target.unlink(missing_ok=True)
+
+    def compact(self, key: str):
+        """
+        Rewrite a segment as a timestamp-sorted, block-compressed gzip file.
+
+        The active file is renamed aside under the lock, so appends arriving
+        meanwhile start a fresh active file. The rewrite then happens without
+        the lock, and the lock is taken again only to swap in the result.
+
+        Args:
+            key: Segment key (see segment_key)
+        """
+        active, compacting, compacted = (self._part(key, kind) for kind in (ACTIVE, COMPACTING, COMPACTED))
+        with self._lock:
+            # A leftover .compacting file (interrupted run) is merged first;
+            # the active file then waits for the next pass
+            if not compacting.exists() and active.exists():
+                os.replace(active, compacting)
+                if _index_path(active).exists():
+                    os.replace(_index_path(active), _index_path(compacting))
+                self._blocks.pop(active, None)
+
+        last_write = self._last_write({kind: path for kind, path in ((COMPACTED, compacted), (COMPACTING, compacting))})
+        lines: List[bytes] = []
+        if compacted.exists():
+            with open(compacted, "rb") as f:
+                lines.extend(gzip.decompress(f.read()).splitlines(keepends=True))
+        if compacting.exists():
+            with open(compacting, "rb") as f:
+                lines.extend(_complete_lines(f.read()))
+        # Identical lines can only come from a run interrupted after its swap;
+        # torn lines left by a crash are dropped here
+        unique = sorted((line for line in set(lines) if _is_entry(line)), key=lambda line: (_entry_timestamp(line), line))
+
+        tmp = compacted.with_name(compacted.name + ".tmp")
+        blocks = []
+        with open(tmp, "wb") as f:
+            for start in range(0, len(unique), self.index_interval):
+                chunk = unique[start:start + self.index_interval]
+                member = gzip.compress(b"".join(chunk), mtime=0)
+                block = IndexBlock(f.tell())
+                for line in chunk:
+                    block.add(_entry_timestamp(line), 0)
+                block.length = len(member)
+                f.write(member)
+                blocks.append(block)
+            f.flush()
+            os.fsync(f.fileno())
+        if last_write is not None:
+            # Keep the last-write time so retention still counts from it
+            os.utime(tmp, (last_write, last_write))
+        tmp_index = _index_path(tmp)
+        with open(tmp_index, "w") as f:
+            f.write("".join(b.to_line() for b in blocks))
+
+        with self._lock:
+            os.replace(tmp, compacted)
+            os.replace(tmp_index, _index_path(compacted))
+            for target in (compacting, _index_path(compacting)):
+                target.unlink(missing_ok=True)
+
+    def start_maintenance(self, interval: float, retention_days: float = 0, compact_after_days: float = 0):
+        """Run ``maintain`` every ``interval`` seconds in a daemon thread."""
+        if self._maintenance is not None or not (retention_days or compact_after_days):
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.maintain(retention_days=retention_days, compact_after_days=compact_after_days)
+                except Exception as e:
+                    print(f"Warning: Audit log maintenance failed: {str(e)}")
+
+        self._maintenance = threading.Thread(target=run, name="audit-log-maintenance", daemon=True)
+        self._maintenance.start()
+
+    def stop_maintenance(self):
+        """Stop the maintenance thread, waiting for a running pass to finish."""
+        if self._maintenance is not None:
+            self._stop.set()
+            self._maintenance.join()
+            self._maintenance = None
+
+
+_audit_log: Optional[AuditLog] = None
+_audit_log_lock = threading.Lock()
+
+
+def get_audit_log() -> AuditLog:
+    """Return the shared audit log configured from settings."""
+    global _audit_log
+    with _audit_log_lock:
+        if _audit_log is None:
+            _audit_log = AuditLog(
+                directory=Path(settings.AUDIT_LOG_PATH),
+                segment_hours=settings.AUDIT_SEGMENT_HOURS,
+                index_interval=settings.AUDIT_INDEX_INTERVAL,
+                fsync=settings.AUDIT_FSYNC,
+            )
+        return _audit_log
@@ -0,0 +1,195 @@
+"""Background, batched writer for the audit trail and the report store."""
+
+import asyncio
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.config import settings
+from backend.schemas.validation import CorroborationReport
+from backend.services.audit_log import AuditLog, get_audit_log
+from backend.services.report_store import ReportStore, get_report_store
+
+AuditItem = Tuple[Dict[str, Any], CorroborationReport]
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Writes audit entries and full reports off the request path.
+
+    Requests enqueue ``(audit_entry, report)`` on a bounded queue and return
+    immediately; a daemon thread drains it in batches. A batch is serialised
+    (the store's compact encoding for reports), appended to the audit log
+    segments with one write and one fsync per segment, and stored with a single
+    SQLite transaction, so the disk cost is paid once per batch rather than
+    once per report. When the queue is full, submitters wait for room, which
+    bounds the memory held by a stalled disk.
+
+    Reports stay readable through ``pending`` until their batch is committed.
+    """
+
+    def __init__(
+        self,
+        audit_log_path: Optional[Path] = None,
+        report_store: Optional[ReportStore] = None,
+        audit_log: Optional[AuditLog] = None,
+        max_queue: int = 1024,
+        max_batch: int = 256,
+        batch_window: float = 0.05,
+        fsync: bool = True,
+    ):
+        """
+        Initialize the audit writer.
+
+        Args:
+            audit_log_path: Directory of the audit log segments (ignored if audit_log is given)
+            report_store: Store that receives the full reports
+            audit_log: Segmented audit log that receives the entries
+            max_queue: Entries that may wait before submitters block
+            max_batch: Most entries written per batch
+            batch_window: Seconds to wait for a batch to fill once one entry arrived
+            fsync: fsync the audit log segments after every append (ignored if audit_log is given)
+        """
+        self.audit_log = audit_log or AuditLog(
+            directory=audit_log_path or Path(settings.AUDIT_LOG_PATH),
+            segment_hours=settings.AUDIT_SEGMENT_HOURS,
+            index_interval=settings.AUDIT_INDEX_INTERVAL,
+            fsync=fsync,
+        )
+        self.report_store = report_store or get_report_store()
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_queue))
+        self._pending: Dict[str, CorroborationReport] = {}
+        self._pending_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def pending(self, document_id: str) -> Optional[CorroborationReport]:
+        """A submitted report whose batch has not been committed yet."""
+        with self._pending_lock:
+            return self._pending.get(document_id)
+
+    async def submit(self, entry: Dict[str, Any], report: CorroborationReport):
+        """
+        Queue a report for writing.
+
+        Returns without touching the disk unless the queue is full (then it
+        waits for room) or the writer has been closed (then it writes inline
+        in a worker thread).
+
+        Args:
+            entry: Audit summary (see ReportGenerator._log_audit_trail)
+            report: Full report
+        """
+        if self._closed:
+            await asyncio.to_thread(self._write_batch, [(entry, report)])
+            return
+
+        self._ensure_started()
+        with self._pending_lock:
+            self._pending[report.document_id] = report
+        try:
+            self._queue.put_nowait((entry, report))
+        except queue.Full:
+            await asyncio.to_thread(self._queue.put, (entry, report))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch: List[AuditItem] = [item]
+            stop = False
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    timeout = deadline - time.monotonic()
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Don't take the writer down; the entries of this batch are lost
+                print(f"Warning: Failed to write audit batch of {len(batch)}: {str(e)}")
+            finally:
+                with self._pending_lock:
+                    for _, report in batch:
+                        if self._pending.get(report.document_id) is report:
+                            del self._pending[report.document_id]
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[AuditItem]):
+        """Append the batch to the audit logs, then commit its reports in one transaction."""
+        self.audit_log.append([entry for entry, _ in batch])
+        self.report_store.put_many((entry, report.model_dump(mode="json")) for entry, report in batch)
+
+    def flush(self):
+        """Block until everything submitted so far is written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write everything queued, then stop the writer thread (idempotent)."""
+        with self._start_lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+        # Entries that raced with close() landed behind the stop marker
+        leftover: List[AuditItem] = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        if leftover:
+            self._write_batch(leftover)
+            with self._pending_lock:
+                self._pending.clear()
+
+
+_audit_writer: Optional[AuditWriter] = None
+_audit_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter:
+    """Return the shared audit writer configured from settings."""
+    global _audit_writer
+    with _audit_writer_lock:
+        if _audit_writer is None:
+            _audit_writer = AuditWriter(
+                audit_log=get_audit_log(),
+                max_queue=settings.AUDIT_QUEUE_SIZE,
+                max_batch=settings.AUDIT_BATCH_SIZE,
+                batch_window=settings.AUDIT_BATCH_WINDOW,
+            )
+        return _audit_writer
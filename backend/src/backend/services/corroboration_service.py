@@ -1,15 +1,22 @@
 """Main corroboration service that orchestrates all validation services."""
 
+import asyncio
+import hashlib
+import io
 import time
 import tempfile
+import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from backend.services.document_validator import DocumentValidator
 from backend.services.image_analyzer import ImageAnalyzer
 from backend.services.risk_scorer import RiskScorer
 from backend.services.report_generator import ReportGenerator
 from backend.services.document_service import DocumentService
+from backend.services.heatmap_store import get_heatmap_store
+from backend.services.report_cache import CachedReport
 from backend.schemas.validation import (
     CorroborationReport,
     CorroborationRequest,
@@ -17,6 +24,7 @@ from backend.schemas.validation import (
     StructureValidationResult,
     ContentValidationResult,
     ImageAnalysisResult,
+    QuickScreenResult,
 )
 
 
@@ -50,6 +58,8 @@ class CorroborationService:
         """
         start_time = time.time()
         engines_used = []
+        # Assigned up front so the image index can record this document
+        document_id = str(uuid.uuid4())
 
         # Save to temporary file
         file_ext = Path(filename).suffix.lower()
@@ -81,6 +91,9 @@ class CorroborationService:
                 image_analysis = await self.image_analyzer.analyze_image(
                     tmp_path,
                     perform_reverse_search=request.enable_reverse_image_search,
+                    document_id=document_id,
+                    file_name=filename,
+                    detectors=request.detectors,
                 )
 
             # 2. Format Validation (for documents)
@@ -129,6 +142,8 @@ class CorroborationService:
                 risk_score=risk_score,
                 processing_time=processing_time,
                 engines_used=engines_used,
+                document_id=document_id,
+                file_hash=hashlib.sha256(file_bytes).hexdigest(),
             )
 
             return report
@@ -143,6 +158,7 @@ class CorroborationService:
         file_bytes: bytes,
         filename: str,
         enable_reverse_search: bool = True,
+        detectors: Optional[List[str]] = None,
     ) -> ImageAnalysisResult:
         """
         Perform image-only analysis.
@@ -151,6 +167,7 @@ class CorroborationService:
             file_bytes: Image file bytes
             filename: Original filename
             enable_reverse_search: Whether to perform reverse image search
+            detectors: Image detectors to run (default: the analyzer's standard set)
 
         Returns:
             ImageAnalysisResult with image analysis findings
@@ -165,6 +182,9 @@ class CorroborationService:
             result = await self.image_analyzer.analyze_image(
                 tmp_path,
                 perform_reverse_search=enable_reverse_search,
+                document_id=str(uuid.uuid4()),
+                file_name=filename,
+                detectors=detectors,
             )
             return result
 
@@ -172,6 +192,21 @@ class CorroborationService:
             if tmp_path.exists():
                 tmp_path.unlink()
 
+    async def quick_screen_image(self, file_bytes: bytes) -> QuickScreenResult:
+        """
+        Perform the fast image pre-screen.
+
+        The image is screened straight from memory; no temporary file is
+        written and pixels are only decoded at draft resolution.
+
+        Args:
+            file_bytes: Image file bytes
+
+        Returns:
+            QuickScreenResult with header and coarse pixel findings
+        """
+        return await self.image_analyzer.quick_screen(io.BytesIO(file_bytes))
+
     async def get_report(self, document_id: str) -> Optional[CorroborationReport]:
         """
         Retrieve a previously generated report.
@@ -184,19 +219,67 @@ class CorroborationService:
         """
         return await self.report_generator.get_report(document_id)
 
+    async def get_report_entry(self, document_id: str) -> Optional[CachedReport]:
+        """
+        Retrieve a report with its serialised JSON body and strong ETag.
+
+        Args:
+            document_id: Unique document identifier
+
+        Returns:
+            CachedReport if found, None otherwise
+        """
+        return await self.report_generator.get_report_entry(document_id)
+
+    def report_etag(self, document_id: str, markdown: bool = False) -> Optional[str]:
+        """
+        ETag of a report or its markdown when known in memory.
+
+        Lets conditional requests be answered without loading the report.
+
+        Args:
+            document_id: Unique document identifier
+            markdown: ETag of the markdown rendering instead of the JSON
+
+        Returns:
+            Strong ETag, or None if not cached
+        """
+        return self.report_generator.report_etag(document_id, markdown=markdown)
+
+    async def get_heatmap_png(self, document_id: str, kind: str) -> Optional[bytes]:
+        """
+        Retrieve a forensic heat map as PNG, rendering it on first request.
+
+        Args:
+            document_id: Unique document identifier
+            kind: Heat map kind (ela, noise, clone, jpeg)
+
+        Returns:
+            PNG bytes if the map exists, None otherwise
+        """
+        return await asyncio.to_thread(get_heatmap_store().render_png, document_id, kind)
+
     async def list_reports(
         self,
         limit: int = 100,
         risk_level: Optional[str] = None,
         requires_manual_review: Optional[bool] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        file_hash: Optional[str] = None,
+        cursor: Optional[str] = None,
     ):
         """
-        List reports from audit logs.
+        List report summaries, newest first.
 
         Args:
             limit: Maximum number of reports to return
             risk_level: Filter by risk level
             requires_manual_review: Filter by manual review requirement
+            since: Only reports analysed at or after this time
+            until: Only reports analysed before this time
+            file_hash: Only reports of files with this SHA-256
+            cursor: Resume after a previous page
 
         Returns:
             List of report summaries
@@ -211,8 +294,32 @@ class CorroborationService:
             limit=limit,
             risk_level=risk_level_enum,
             requires_manual_review=requires_manual_review,
+            since=since,
+            until=until,
+            file_hash=file_hash.lower() if file_hash else None,
+            cursor=cursor,
         )
 
+    async def read_audit_log(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        Read audit trail entries in a time range.
+
+        Args:
+            since: Only entries logged at or after this time
+            until: Only entries logged before this time
+            limit: Maximum number of entries to return
+
+        Returns:
+            Audit entries, oldest segment first
+        """
+        audit_log = self.report_generator.audit_writer.audit_log
+        return await asyncio.to_thread(audit_log.read, since, until, limit)
+
     async def export_report_markdown(self, document_id: str) -> Optional[str]:
         """
         Export a report as markdown.
@@ -223,8 +330,17 @@ class CorroborationService:
         Returns:
             Markdown formatted report if found, None otherwise
         """
-        report = await self.get_report(document_id)
-        if not report:
-            return None
+        entry = await self.get_markdown_entry(document_id)
+        return entry.markdown if entry else None
+
+    async def get_markdown_entry(self, document_id: str) -> Optional[CachedReport]:
+        """
+        Retrieve a report with its markdown rendering and its strong ETag.
+
+        Args:
+            document_id: Unique document identifier
 
-        return await self.report_generator.export_report_markdown(report)
+        Returns:
+            CachedReport with ``markdown`` set if found, None otherwise
+        """
+        return await self.report_generator.get_markdown_entry(document_id)
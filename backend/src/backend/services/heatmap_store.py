@@ -0,0 +1,113 @@
+"""Storage for forensic heat maps with lazily rendered PNG artifacts."""
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend.config import settings
+from backend.forensics.heatmaps import HEATMAP_KINDS, compact_maps, render_heatmap
+
+_DOCUMENT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class HeatmapStore:
+    """
+    Keeps heat maps next to the report files.
+
+    At analysis time only the compact uint8 grids are written (one compressed
+    ``.npz`` per document, a few KB). A PNG is rendered the first time a kind
+    is requested and cached on disk, so rendering is only paid for documents
+    a reviewer actually opens.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, render_edge: int = 1024):
+        """
+        Initialize the heat map store.
+
+        Args:
+            directory: Directory shared with the report files
+            render_edge: Longer edge of rendered PNGs
+        """
+        self.directory = directory or Path(settings.AUDIT_LOG_PATH)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.render_edge = render_edge
+        self._lock = threading.Lock()
+
+    def _maps_path(self, document_id: str) -> Optional[Path]:
+        if not _DOCUMENT_ID_PATTERN.match(document_id):
+            return None
+        return self.directory / f"heatmaps_{document_id}.npz"
+
+    def save(self, document_id: str, maps: Dict[str, np.ndarray]) -> List[str]:
+        """
+        Persist compact maps for a document.
+
+        Returns:
+            Kinds that were stored
+        """
+        path = self._maps_path(document_id)
+        maps = compact_maps(maps)
+        if path is None or not maps:
+            return []
+
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez_compressed(tmp_path, **maps)
+        os.replace(tmp_path, path)
+        return sorted(maps)
+
+    def kinds(self, document_id: str) -> List[str]:
+        """Heat map kinds stored for a document."""
+        path = self._maps_path(document_id)
+        if path is None or not path.exists():
+            return []
+        with np.load(path) as data:
+            return sorted(data.files)
+
+    def render_png(self, document_id: str, kind: str) -> Optional[bytes]:
+        """
+        Return the PNG for one heat map, rendering and caching it on first use.
+
+        Returns:
+            PNG bytes, or None if the document has no map of that kind
+        """
+        path = self._maps_path(document_id)
+        if path is None or kind not in HEATMAP_KINDS:
+            return None
+
+        png_path = self.directory / f"heatmap_{document_id}_{kind}.png"
+        if png_path.exists():
+            return png_path.read_bytes()
+
+        with self._lock:
+            if png_path.exists():
+                return png_path.read_bytes()
+            if not path.exists():
+                return None
+
+            with np.load(path) as data:
+                if kind not in data.files:
+                    return None
+                values = data[kind]
+
+            tmp_path = png_path.with_suffix(".tmp.png")
+            render_heatmap(values, self.render_edge).save(tmp_path, format="PNG", optimize=True)
+            os.replace(tmp_path, png_path)
+            return png_path.read_bytes()
+
+
+_heatmap_store: Optional[HeatmapStore] = None
+
+
+def get_heatmap_store() -> HeatmapStore:
+    """Return the shared heat map store."""
+    global _heatmap_store
+    if _heatmap_store is None:
+        _heatmap_store = HeatmapStore(
+            directory=Path(settings.AUDIT_LOG_PATH),
+            render_edge=settings.HEATMAP_RENDER_EDGE,
+        )
+    return _heatmap_store
@@ -1,24 +1,81 @@
 """Image analysis service for authenticity verification and tampering detection."""
 
-import io
-import hashlib
+import asyncio
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
-from PIL import Image, ImageChops, ImageEnhance
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+from PIL import Image
 import numpy as np
 from datetime import datetime
 import json
 
+from backend.config import settings
+from backend.forensics.detectors import (
+    DEFAULT_THRESHOLDS,
+    IMAGE_ANALYZER_DETECTORS,
+    clone_blocks,
+    double_jpeg,
+    features_from_tiled,
+    get_detection_engine,
+    registry,
+)
+from backend.forensics.ela import REFERENCE_QUALITY
+from backend.forensics.executor import get_detector_pool
+from backend.forensics.features import FeatureStore
+from backend.forensics.frames import frame_count, load_frame
+from backend.forensics.heatmaps import ela_heatmap, pool_map, probability_heatmap, to_uint8
+from backend.forensics.noise import NoiseMap
+from backend.forensics.prescreen import (
+    assess_quantization,
+    coarse_statistics,
+    draft_decode,
+    get_quantization_tables,
+)
+from backend.forensics.regions import SuspiciousRegion, flat_blocks, locate_regions, robust_suspicion
+from backend.forensics.registry import DetectionContext, EngineResult
+from backend.forensics.sharedmem import SharedArray, call_with_array, fill_shared
+from backend.forensics.tiling import TiledStatistics
+from backend.providers import AI_DETECTION, REVERSE_SEARCH, ProviderResult, get_provider_client
+from backend.services.heatmap_store import get_heatmap_store
+from backend.services.image_index import compute_hashes_from_array, get_image_index
 from backend.schemas.validation import (
     ImageAnalysisResult,
+    PageAnalysis,
+    QuickScreenResult,
     ValidationIssue,
     ValidationSeverity,
 )
 
 
+@dataclass
+class _FrameResult:
+    """Scored detector output of one image, or of one page of a multi-frame image."""
+
+    width: int
+    height: int
+    is_ai_generated: bool
+    ai_confidence: float
+    is_tampered: bool
+    tampering_confidence: float
+    findings: List[ValidationIssue]
+    heatmaps: Dict[str, np.ndarray]
+    skipped: List[str]
+    timings: Dict[str, float]
+    hashes: Tuple[int, int]
+
+
 class ImageAnalyzer:
     """Service for analyzing image authenticity and detecting tampering."""
 
+    # Weight of each issue severity in the quick pre-screen score
+    QUICK_SCREEN_WEIGHTS = {
+        ValidationSeverity.LOW: 0.1,
+        ValidationSeverity.MEDIUM: 0.3,
+        ValidationSeverity.HIGH: 0.6,
+        ValidationSeverity.CRITICAL: 1.0,
+    }
+
     def __init__(self):
         """Initialize the image analyzer."""
         pass
@@ -27,6 +84,9 @@ class ImageAnalyzer:
         self,
         image_path: Path,
         perform_reverse_search: bool = True,
+        document_id: Optional[str] = None,
+        file_name: Optional[str] = None,
+        detectors: Optional[Sequence[str]] = None,
     ) -> ImageAnalysisResult:
         """
         Perform comprehensive image analysis.
@@ -34,36 +94,122 @@ class ImageAnalyzer:
         Args:
             image_path: Path to the image file
             perform_reverse_search: Whether to perform reverse image search
+            document_id: Id under which the image is added to the local index
+            file_name: Original file name recorded in the local index
+            detectors: Registry detectors to run (defaults to IMAGE_ANALYZER_DETECTORS)
 
         Returns:
             ImageAnalysisResult with analysis findings
+
+        Raises:
+            ValueError: If the image cannot be loaded or a detector is unknown
         """
         metadata_issues: List[ValidationIssue] = []
         forensic_findings: List[ValidationIssue] = []
+        pool = get_detector_pool()
+        detector_names = [d.name for d in registry.select(detectors or IMAGE_ANALYZER_DETECTORS)]
+        with_heatmaps = document_id is not None
 
-        # Load image
         try:
-            image = Image.open(image_path)
+            with Image.open(image_path) as probe:
+                width, height = probe.size
+                frames = frame_count(probe)
+                # Header only; the double-JPEG detector needs the last quantization steps
+                header = {"quantization_tables": get_quantization_tables(probe)}
         except Exception as e:
             raise ValueError(f"Failed to load image: {str(e)}")
 
-        # 1. EXIF Metadata Analysis
-        metadata_issues.extend(await self._analyze_metadata(image, image_path))
-
-        # 2. AI-Generated Detection
-        is_ai_generated, ai_confidence = await self._detect_ai_generated(image)
+        pages: List[PageAnalysis] = []
+        heatmap_page: Optional[int] = None
+        if frames > 1:
+            # Multi-frame scans: every page is decoded and analysed in its own job
+            metadata, page_results, detector_timings = await self._analyze_pages(
+                image_path, frames, detector_names, with_heatmaps, header,
+            )
+            metadata_issues.extend(metadata)
+            frame, heatmap_page = self._combine_pages(page_results)
+            pages = [self._page_summary(page, result) for page, result in enumerate(page_results, start=1)]
+        elif width * height >= settings.TILED_ANALYSIS_MIN_PIXELS:
+            # Very large images are streamed in tiles to bound peak memory
+            results, detector_timings = await pool.run_all({
+                "metadata": (self._analyze_metadata, (image_path,)),
+                "tiled": (self._analyze_tiled, (image_path, detector_names, with_heatmaps, header)),
+            })
+            results.update(results.pop("tiled"))
+        else:
+            results, detector_timings = await self._analyze_decoded(
+                image_path, width, height, detector_names, with_heatmaps, header,
+            )
+
+        if frames == 1:
+            metadata_issues.extend(results["metadata"])
+            frame = self._score_frame(results["detectors"], results["hashes"], width, height)
+            detector_timings.update(frame.timings)
+
+        is_ai_generated, ai_confidence = frame.is_ai_generated, frame.ai_confidence
+        is_tampered, tampering_confidence = frame.is_tampered, frame.tampering_confidence
+        forensic_findings.extend(frame.findings)
+
+        # Keep the compact maps with the report; PNGs are rendered on request
+        available_heatmaps: List[str] = []
+        if document_id:
+            available_heatmaps = await asyncio.to_thread(get_heatmap_store().save, document_id, frame.heatmaps)
+
+        # 4. Reverse image search against previously analysed images (first page of multi-frame images)
+        phash, dhash = frame.hashes
+        reverse_image_match_ids: List[str] = []
+        if settings.ENABLE_LOCAL_IMAGE_INDEX and perform_reverse_search:
+            reverse_image_match_ids = await self._reverse_image_search(phash, dhash, document_id, file_name)
+            if reverse_image_match_ids:
+                forensic_findings.append(ValidationIssue(
+                    category="forensic",
+                    severity=ValidationSeverity.MEDIUM,
+                    description=f"Near-duplicate of {len(reverse_image_match_ids)} previously analysed image(s)",
+                    details={"document_ids": reverse_image_match_ids[:10]},
+                ))
+        elif settings.ENABLE_LOCAL_IMAGE_INDEX and document_id:
+            # Still index the image so later submissions can match it
+            await asyncio.to_thread(get_image_index().add, document_id, phash, dhash, file_name)
+
+        # 5. External providers (online reverse search, AI-generation APIs)
+        external_matches: List[str] = []
+        external_search = perform_reverse_search and settings.ENABLE_REVERSE_IMAGE_SEARCH
+        if external_search or settings.ENABLE_EXTERNAL_AI_DETECTION:
+            provider_results = await self._query_external_providers(
+                image_path, file_name, external_search, settings.ENABLE_EXTERNAL_AI_DETECTION,
+            )
+            for result in provider_results:
+                detector_timings[f"provider.{result.provider}"] = result.elapsed
+                if not result.ok:
+                    forensic_findings.append(ValidationIssue(
+                        category="external",
+                        severity=ValidationSeverity.LOW,
+                        description=f"External provider {result.provider} unavailable",
+                        details={"error": result.error},
+                    ))
 
-        # 3. Tampering Detection using ELA (Error Level Analysis)
-        is_tampered, tampering_confidence, ela_findings = await self._detect_tampering_ela(image_path)
-        forensic_findings.extend(ela_findings)
+            external_matches = list(dict.fromkeys(
+                url for result in provider_results
+                if result.ok and result.kind == REVERSE_SEARCH for url in result.matches
+            ))
+            if external_matches:
+                forensic_findings.append(ValidationIssue(
+                    category="forensic",
+                    severity=ValidationSeverity.MEDIUM,
+                    description=f"Image found online ({len(external_matches)} matches)",
+                    details={"urls": external_matches[:10]},
+                ))
 
-        # 4. Additional forensic checks
-        forensic_findings.extend(await self._forensic_analysis(image))
+            probabilities = [
+                result.ai_probability for result in provider_results
+                if result.ok and result.kind == AI_DETECTION and result.ai_probability is not None
+            ]
+            if probabilities:
+                external_ai = float(np.mean(probabilities))
+                ai_confidence = max(ai_confidence, round(external_ai, 3))
+                is_ai_generated = is_ai_generated or external_ai > 0.5
 
-        # 5. Reverse image search (placeholder - requires API integration)
-        reverse_image_matches = 0
-        if perform_reverse_search:
-            reverse_image_matches = await self._reverse_image_search(image_path)
+        reverse_image_matches = len(reverse_image_match_ids) + len(external_matches)
 
         # Determine overall authenticity
         is_authentic = not (is_ai_generated or is_tampered or reverse_image_matches > 5)
@@ -75,16 +221,343 @@ class ImageAnalyzer:
             is_tampered=is_tampered,
             tampering_confidence=tampering_confidence,
             reverse_image_matches=reverse_image_matches,
+            reverse_image_match_ids=reverse_image_match_ids,
+            perceptual_hash=f"{phash:016x}",
+            document_id=document_id,
+            heatmaps=available_heatmaps,
+            heatmap_page=heatmap_page if available_heatmaps else None,
+            page_count=frames,
+            pages=pages,
+            skipped_detectors=frame.skipped,
             metadata_issues=metadata_issues,
             forensic_findings=forensic_findings,
+            detector_timings=detector_timings,
+        )
+
+    async def quick_screen(self, source: Union[Path, BinaryIO]) -> QuickScreenResult:
+        """
+        Fast upload triage from headers and a draft-mode decode.
+
+        EXIF and JPEG quantization tables are read without decoding pixels;
+        colour and edge heuristics run on a 1/4 or 1/8 scale decode.
+
+        Args:
+            source: Image path or in-memory buffer
+
+        Returns:
+            QuickScreenResult indicating whether full analysis is warranted
+        """
+        start_time = time.perf_counter()
+        result, _ = await get_detector_pool().run(self._quick_screen, source)
+        result.processing_time = round(time.perf_counter() - start_time, 4)
+        return result
+
+    def _quick_screen(self, source: Union[Path, BinaryIO]) -> QuickScreenResult:
+        """Synchronous body of quick_screen, run in the detector pool."""
+        findings: List[ValidationIssue] = []
+
+        with Image.open(source) as image:
+            width, height = image.size
+            image_format = image.format
+
+            # Header-only signals
+            metadata_issues = self._check_exif(image.getexif())
+            quantization = assess_quantization(get_quantization_tables(image))
+
+            # Pixel heuristics on a reduced decode
+            draft_array, draft_scale = draft_decode(image, settings.QUICK_SCREEN_DRAFT_REDUCTION)
+
+        statistics = coarse_statistics(draft_array)
+
+        if quantization:
+            statistics["quantization_avg"] = round(quantization["avg"], 2)
+            statistics["quantization_var"] = round(quantization["var"], 2)
+            if quantization["label"]:
+                findings.append(ValidationIssue(
+                    category="compression",
+                    severity=ValidationSeverity.LOW,
+                    description=f"JPEG quantization suggests recompression ({quantization['label']})",
+                    details={"avg": round(quantization["avg"], 1), "var": round(quantization["var"], 1)},
+                ))
+
+        if statistics["color_entropy"] < 5.0:
+            findings.append(ValidationIssue(
+                category="forensic",
+                severity=ValidationSeverity.MEDIUM,
+                description="Unusually low colour entropy (possible synthetic image)",
+                details={"color_entropy": round(statistics["color_entropy"], 3)},
+            ))
+
+        if abs(statistics["rg_ratio"] - 1.0) > 0.2 or abs(statistics["rb_ratio"] - 1.0) > 0.2:
+            findings.append(ValidationIssue(
+                category="forensic",
+                severity=ValidationSeverity.LOW,
+                description="Colour balance deviates strongly from neutral",
+                details={
+                    "rg_ratio": round(statistics["rg_ratio"], 3),
+                    "rb_ratio": round(statistics["rb_ratio"], 3),
+                },
+            ))
+
+        # Combine issues as independent evidence: 1 - prod(1 - weight)
+        clean_probability = 1.0
+        for issue in metadata_issues + findings:
+            clean_probability *= 1.0 - self.QUICK_SCREEN_WEIGHTS[issue.severity]
+        suspicion_score = round(1.0 - clean_probability, 3)
+
+        return QuickScreenResult(
+            requires_full_analysis=suspicion_score >= settings.QUICK_SCREEN_THRESHOLD,
+            suspicion_score=suspicion_score,
+            image_format=image_format,
+            width=width,
+            height=height,
+            draft_scale=round(draft_scale, 4),
+            metadata_issues=metadata_issues,
+            findings=findings,
+            statistics={k: round(v, 4) for k, v in statistics.items()},
+            processing_time=0.0,
         )
 
-    async def _analyze_metadata(self, image: Image.Image, image_path: Path) -> List[ValidationIssue]:
+    async def _analyze_decoded(
+        self,
+        image_path: Path,
+        width: int,
+        height: int,
+        detectors: Sequence[str],
+        with_heatmaps: bool,
+        header: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Decode once in the pool, then run the metadata, detector and hash jobs in parallel.
+
+        Thread workers share the decoded array directly. Process workers
+        would receive a pickled copy per job (and return one from the
+        decode), so there the image is decoded straight into shared memory
+        and every job attaches a zero-copy view from its handle; the block
+        is unlinked once the last job has finished with it.
+        """
+        pool = get_detector_pool()
+        if pool.shares_memory:
+            try:
+                img_array, decode_time = await pool.run(self._load_rgb_array, image_path)
+            except Exception as e:
+                raise ValueError(f"Failed to load image: {str(e)}")
+
+            # Independent jobs run in parallel off the event loop
+            results, timings = await pool.run_all({
+                # 1. EXIF Metadata Analysis
+                "metadata": (self._analyze_metadata, (image_path,)),
+                # 2. Registry detectors (AI heuristics, ELA, forensics), cheapest first
+                "detectors": (self._run_detectors, (img_array, detectors, with_heatmaps, header)),
+                # 3. Perceptual hashes for near-duplicate search
+                "hashes": (compute_hashes_from_array, (img_array,)),
+            })
+        else:
+            with SharedArray((height, width, 3)) as shared:
+                try:
+                    _, decode_time = await pool.run(
+                        fill_shared, shared.handle, self._load_rgb_array, image_path, shared=(shared,),
+                    )
+                except Exception as e:
+                    raise ValueError(f"Failed to load image: {str(e)}")
+
+                results, timings = await pool.run_all({
+                    "metadata": (self._analyze_metadata, (image_path,)),
+                    "detectors": (
+                        call_with_array, (self._run_detectors, shared.handle, detectors, with_heatmaps, header),
+                    ),
+                    "hashes": (call_with_array, (compute_hashes_from_array, shared.handle)),
+                }, shared=(shared,))
+
+        timings["decode"] = round(decode_time, 4)
+        return results, timings
+
+    @staticmethod
+    def _load_rgb_array(image_path: Path) -> np.ndarray:
+        """Decode an image file into an RGB numpy array."""
+        with Image.open(image_path) as image:
+            return np.array(image.convert('RGB'))
+
+    def _analyze_tiled(
+        self,
+        image_path: Path,
+        detectors: Sequence[str],
+        with_heatmaps: bool = False,
+        header: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the registry detectors over streamed tiles of a very large image.
+
+        Statistics are accumulated incrementally by TiledStatistics, so peak
+        memory is bounded by the tile size. They seed the feature store, so
+        detectors read them instead of touching full-size pixels; anything
+        else (e.g. the symmetry check) runs on the accumulated thumbnail.
+        """
+        stats = TiledStatistics(
+            tile_size=settings.TILED_ANALYSIS_TILE_SIZE,
+            # Never decode more than the ingestion guard budgeted for
+            max_decode_pixels=min(settings.TILED_MAX_DECODE_PIXELS, settings.IMAGE_MAX_PIXELS),
+            ela_qualities=settings.ELA_QUALITIES,
+        ).compute(image_path)
+
+        features = features_from_tiled(stats, extra=header, ela_qualities=settings.ELA_QUALITIES)
+        return {
+            "detectors": self._run_engine(features, stats["width"], stats["height"], detectors, with_heatmaps),
+            # pHash/dHash only look at a 32x32 downscale, so the thumbnail suffices
+            "hashes": compute_hashes_from_array(stats["thumbnail"]),
+        }
+
+    async def _analyze_pages(
+        self,
+        image_path: Path,
+        frames: int,
+        detectors: Sequence[str],
+        with_heatmaps: bool,
+        header: Dict[str, Any],
+    ) -> Tuple[List[ValidationIssue], List["_FrameResult"], Dict[str, float]]:
+        """
+        Analyse every frame of a multi-frame image in parallel pool jobs.
+
+        Frames are visited lazily: each job seeks to its own frame and
+        decodes only that one, and at most FRAME_ANALYSIS_CONCURRENCY jobs
+        of one image are in flight, so memory stays bounded to a few pages
+        whatever the page count.
+
+        Returns:
+            Tuple of (metadata issues, per-page results in page order, timings)
+        """
+        pool = get_detector_pool()
+        limit = asyncio.Semaphore(max(1, settings.FRAME_ANALYSIS_CONCURRENCY))
+
+        async def analyze_page(index: int):
+            async with limit:
+                return await pool.run(self._analyze_frame, image_path, index, detectors, with_heatmaps, header)
+
+        try:
+            (metadata, _), *outcomes = await asyncio.gather(
+                pool.run(self._analyze_metadata, image_path),
+                *(analyze_page(index) for index in range(frames)),
+            )
+        except EOFError as e:
+            raise ValueError(f"Failed to load image frame: {str(e)}")
+
+        results: List[_FrameResult] = []
+        timings: Dict[str, float] = {}
+        for page, ((detection, hashes, size), elapsed) in enumerate(outcomes, start=1):
+            result = self._score_frame(detection, hashes, *size)
+            for name, seconds in result.timings.items():
+                timings[name] = round(timings.get(name, 0.0) + seconds, 4)
+            timings[f"page.{page}"] = round(elapsed, 4)
+            results.append(result)
+        return metadata, results, timings
+
+    def _analyze_frame(
+        self,
+        image_path: Path,
+        index: int,
+        detectors: Sequence[str],
+        with_heatmaps: bool = False,
+        header: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Tuple[EngineResult, Dict[str, np.ndarray], List[SuspiciousRegion]], Tuple[int, int], Tuple[int, int]]:
+        """Decode one frame and run the detectors and hashes on it (one pool job)."""
+        img_array = load_frame(image_path, index)
+        height, width = img_array.shape[:2]
+        detection = self._run_detectors(img_array, detectors, with_heatmaps, header)
+        return detection, compute_hashes_from_array(img_array), (width, height)
+
+    def _score_frame(
+        self,
+        detection: Tuple[EngineResult, Dict[str, np.ndarray], List[SuspiciousRegion]],
+        hashes: Tuple[int, int],
+        width: int,
+        height: int,
+    ) -> "_FrameResult":
+        """Turn the engine output of one image or page into decisions and findings."""
+        engine_result, heatmaps, regions = detection
+        is_ai_generated, ai_confidence = self._score_ai_generated(engine_result)
+        is_tampered, tampering_confidence = self._score_tampering(engine_result)
+        return _FrameResult(
+            width=width,
+            height=height,
+            is_ai_generated=is_ai_generated,
+            ai_confidence=ai_confidence,
+            is_tampered=is_tampered,
+            tampering_confidence=tampering_confidence,
+            findings=self._engine_findings(engine_result) + self._region_findings(regions),
+            heatmaps=heatmaps,
+            skipped=list(engine_result.skipped),
+            timings={f"detector.{name}": t for name, t in engine_result.timings.items()},
+            hashes=hashes,
+        )
+
+    @staticmethod
+    def _combine_pages(results: List["_FrameResult"]) -> Tuple["_FrameResult", int]:
+        """
+        Aggregate per-page results into one document-level result.
+
+        The document is as suspicious as its worst page; findings keep their
+        page number, heat maps come from the most suspicious page and the
+        hashes from the first one.
+
+        Returns:
+            Tuple of (combined result, 1-based page the heat maps belong to)
+        """
+        worst = max(range(len(results)), key=lambda i: (results[i].tampering_confidence, results[i].ai_confidence))
+        findings: List[ValidationIssue] = []
+        for page, result in enumerate(results, start=1):
+            findings.extend(ImageAnalyzer._page_findings(page, result.findings))
+        combined = _FrameResult(
+            width=results[0].width,
+            height=results[0].height,
+            is_ai_generated=any(r.is_ai_generated for r in results),
+            ai_confidence=max(r.ai_confidence for r in results),
+            is_tampered=any(r.is_tampered for r in results),
+            tampering_confidence=max(r.tampering_confidence for r in results),
+            findings=findings,
+            heatmaps=results[worst].heatmaps,
+            skipped=sorted({name for r in results for name in r.skipped}),
+            timings={},
+            hashes=results[0].hashes,
+        )
+        return combined, worst + 1
+
+    @staticmethod
+    def _page_findings(page: int, findings: List[ValidationIssue]) -> List[ValidationIssue]:
+        """Prefix findings with their page and record it in location and details."""
+        return [
+            issue.model_copy(update={
+                "description": f"Page {page}: {issue.description}",
+                "location": f"page={page}" + (f",{issue.location}" if issue.location else ""),
+                "details": {"page": page, **(issue.details or {})},
+            })
+            for issue in findings
+        ]
+
+    @staticmethod
+    def _page_summary(page: int, result: "_FrameResult") -> PageAnalysis:
+        return PageAnalysis(
+            page=page,
+            width=result.width,
+            height=result.height,
+            is_ai_generated=result.is_ai_generated,
+            ai_detection_confidence=result.ai_confidence,
+            is_tampered=result.is_tampered,
+            tampering_confidence=result.tampering_confidence,
+            perceptual_hash=f"{result.hashes[0]:016x}",
+            finding_count=len(result.findings),
+        )
+
+    def _analyze_metadata(self, image_path: Path) -> List[ValidationIssue]:
         """Analyze image EXIF metadata for inconsistencies."""
-        issues: List[ValidationIssue] = []
+        # Extract EXIF data (header only, no pixel decode)
+        with Image.open(image_path) as image:
+            exif_data = image.getexif()
 
-        # Extract EXIF data
-        exif_data = image.getexif()
+        return self._check_exif(exif_data)
+
+    def _check_exif(self, exif_data: Image.Exif) -> List[ValidationIssue]:
+        """Check extracted EXIF data for editing and consistency issues."""
+        issues: List[ValidationIssue] = []
 
         if not exif_data:
             issues.append(ValidationIssue(
@@ -145,317 +618,200 @@ class ImageAnalyzer:
 
         return issues
 
-    async def _detect_ai_generated(self, image: Image.Image) -> Tuple[bool, float]:
-        """
-        Detect if image is AI-generated using heuristic analysis.
+    def _run_detectors(
+        self,
+        img_array: np.ndarray,
+        detectors: Sequence[str],
+        with_heatmaps: bool = False,
+        header: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[EngineResult, Dict[str, np.ndarray], List[SuspiciousRegion]]:
+        """Run registry detectors on a decoded RGB array (``header``: values read from the file header)."""
+        features = FeatureStore(Image.fromarray(img_array), ela_qualities=settings.ELA_QUALITIES, precomputed=header)
+        height, width = img_array.shape[:2]
+        return self._run_engine(features, width, height, detectors, with_heatmaps)
 
-        In production, this would use a specialized ML model.
+    def _run_engine(
+        self,
+        features: FeatureStore,
+        width: int,
+        height: int,
+        detectors: Sequence[str],
+        with_heatmaps: bool = False,
+    ) -> Tuple[EngineResult, Dict[str, np.ndarray], List[SuspiciousRegion]]:
         """
-        # Heuristic approach: AI-generated images often have:
-        # 1. Perfect symmetry
-        # 2. Unusual color distributions
-        # 3. Repetitive patterns
-        # 4. Lack of noise
-
-        confidence_score = 0.0
-        checks_performed = 0
-
-        # Convert to numpy array
-        img_array = np.array(image.convert('RGB'))
-
-        # Check 1: Noise analysis
-        # Real photos have natural noise, AI images often don't
-        noise_level = self._calculate_noise_level(img_array)
-        checks_performed += 1
-
-        if noise_level < 5.0:  # Very low noise
-            confidence_score += 0.3
-
-        # Check 2: Color distribution analysis
-        # AI images often have unusual color distributions
-        color_entropy = self._calculate_color_entropy(img_array)
-        checks_performed += 1
-
-        if color_entropy < 5.0:  # Low entropy
-            confidence_score += 0.2
-
-        # Check 3: Edge consistency
-        # AI images may have overly smooth or perfect edges
-        edge_score = self._analyze_edges(img_array)
-        checks_performed += 1
-
-        if edge_score > 0.8:  # Very consistent edges
-            confidence_score += 0.2
-
-        # Check 4: Artifacts typical of AI generation
-        has_ai_artifacts = self._check_ai_artifacts(img_array)
-        checks_performed += 1
-
-        if has_ai_artifacts:
-            confidence_score += 0.3
-
-        # Normalize confidence
-        final_confidence = min(confidence_score, 1.0)
-
-        # Threshold for detection
-        is_ai_generated = final_confidence > 0.5
-
-        return is_ai_generated, round(final_confidence, 3)
+        Run the shared detection engine, then build heat maps and locate suspicious regions.
+
+        Every requested detector runs (no early exit): the verdict comes from
+        RiskScorer over the individual outcomes (tampering and AI confidence,
+        findings), not from the engine's summed score, so a skipped detector
+        would read as a clean result. Heat maps and regions are only built from
+        primitives some detector already computed (ELA, noise map, clone
+        blocks, double JPEG), so both are cheap.
+        """
+        context = DetectionContext(features=features, thresholds=DEFAULT_THRESHOLDS, width=width, height=height)
+        result = get_detection_engine().run(context, detectors, early_exit=False)
+
+        heatmaps: Dict[str, np.ndarray] = {}
+        if with_heatmaps:
+            if features.has("ela"):
+                heatmaps["ela"] = ela_heatmap(features.ela.difference(REFERENCE_QUALITY), settings.HEATMAP_GRID_EDGE)
+            if features.has("noise_map"):
+                heatmaps["noise"] = self._noise_heatmap(features.noise_map)
+            if features.has("clone_blocks"):
+                heatmaps["clone"] = clone_blocks(features)[1]
+            if features.has("double_jpeg") and double_jpeg(features).block_map is not None:
+                heatmaps["jpeg"] = probability_heatmap(double_jpeg(features).block_map, settings.HEATMAP_GRID_EDGE)
+
+        regions = self._locate_regions(features, width, height) if settings.TAMPER_LOCALIZATION else []
+        return result, heatmaps, regions
+
+    @staticmethod
+    def _locate_regions(features: FeatureStore, width: int, height: int) -> List[SuspiciousRegion]:
+        """
+        Threshold the available forensic maps on a coarse grid and label connected regions.
 
-    async def _detect_tampering_ela(self, image_path: Path) -> Tuple[bool, float, List[ValidationIssue]]:
+        ELA error and block noise score by their robust z-score within the
+        image; duplicated blocks (ignoring featureless ones) and blocks that
+        break the double-JPEG pattern are suspicious as such.
         """
-        Detect tampering using Error Level Analysis (ELA).
+        grid_edge = settings.TAMPER_REGION_GRID_EDGE
+        suspicion: Dict[str, np.ndarray] = {}
+        if features.has("ela"):
+            difference = features.ela.difference(REFERENCE_QUALITY)
+            suspicion["ela"] = robust_suspicion(pool_map(difference.max(axis=2), grid_edge))
+        if features.has("noise_map") and features.noise_map.variances.size >= 4:
+            # Both pasted-in clean and unusually noisy blocks stand out
+            suspicion["noise"] = robust_suspicion(np.log1p(features.noise_map.variances), two_sided=True)
+        if features.has("clone_blocks"):
+            duplicated = clone_blocks(features)[1] > 0
+            if duplicated.size:
+                flat = flat_blocks(np.asarray(features.gray), DEFAULT_THRESHOLDS['clone_block_size'])
+                suspicion["clone"] = (duplicated & ~flat).astype(np.float32)
+        if features.has("double_jpeg") and double_jpeg(features).block_map is not None:
+            suspicion["jpeg"] = double_jpeg(features).block_map
+        return locate_regions(suspicion, width, height, grid_edge, settings.TAMPER_MAX_REGIONS)
+
+    @staticmethod
+    def _score_ai_generated(result: EngineResult) -> Tuple[bool, float]:
+        """
+        Combine the AI-generation heuristics into a decision and confidence.
 
-        ELA identifies areas of an image with different compression levels,
-        which can indicate manipulation.
+        With a trained classifier (``AI_CLASSIFIER_PATH``) the confidence is
+        its calibrated probability. Otherwise it is the share of the total
+        AI-heuristic weight that fired, so detectors left out of the request
+        count as not firing.
         """
+        classifier = result.outcomes.get("ai_classifier")
+        if classifier is not None and not classifier.error and "probability" in classifier.metrics:
+            return classifier.triggered, round(classifier.metrics["probability"], 3)
+
+        total_weight = sum(d.weight for d in registry.select() if d.category == "ai")
+        score = sum(outcome.score for outcome in result.by_category("ai").values())
+        confidence = round(min(score / total_weight, 1.0), 3) if total_weight else 0.0
+        return confidence > 0.5, confidence
+
+    @staticmethod
+    def _score_tampering(result: EngineResult) -> Tuple[bool, float]:
+        """ELA decision and confidence (0 when the ELA detector did not run)."""
+        outcome = result.outcomes.get("ela_anomaly")
+        if outcome is None or outcome.error:
+            return False, 0.0
+        return outcome.triggered, outcome.metrics.get("confidence", 0.0)
+
+    @staticmethod
+    def _engine_findings(result: EngineResult) -> List[ValidationIssue]:
+        """Turn triggered (or failed) non-AI detectors into findings, cheapest first."""
         findings: List[ValidationIssue] = []
-
-        try:
-            # Load original image
-            original = Image.open(image_path)
-
-            # Save at 90% quality
-            temp_buffer = io.BytesIO()
-            original.save(temp_buffer, format='JPEG', quality=90)
-            temp_buffer.seek(0)
-
-            # Reload the compressed image
-            compressed = Image.open(temp_buffer)
-
-            # Calculate difference (ELA)
-            ela_image = ImageChops.difference(original.convert('RGB'), compressed.convert('RGB'))
-
-            # Enhance to make differences more visible
-            extrema = ela_image.getextrema()
-            max_diff = max([ex[1] for ex in extrema])
-
-            if max_diff == 0:
-                # No differences found
-                return False, 0.0, findings
-
-            scale = 255.0 / max_diff
-            ela_image = ImageEnhance.Brightness(ela_image).enhance(scale)
-
-            # Convert to numpy for analysis
-            ela_array = np.array(ela_image)
-
-            # Calculate statistics
-            mean_error = np.mean(ela_array)
-            std_error = np.std(ela_array)
-            max_error = np.max(ela_array)
-
-            # Detect anomalous regions (high error levels)
-            threshold = mean_error + 2 * std_error
-            anomalous_pixels = np.sum(ela_array > threshold)
-            total_pixels = ela_array.size
-            anomaly_ratio = anomalous_pixels / total_pixels
-
-            # Determine tampering likelihood
-            is_tampered = anomaly_ratio > 0.15  # More than 15% anomalous pixels
-
-            # Calculate confidence
-            confidence = min(anomaly_ratio * 3, 1.0)  # Scale up ratio for confidence
-
-            if is_tampered:
+        for name in result.executed:
+            detector = registry.get(name)
+            outcome = result.outcomes[name]
+            if outcome.error:
                 findings.append(ValidationIssue(
                     category="forensic",
-                    severity=ValidationSeverity.CRITICAL,
-                    description="Image shows signs of tampering (ELA analysis)",
-                    details={
-                        "anomaly_ratio": round(anomaly_ratio, 4),
-                        "mean_error": round(float(mean_error), 2),
-                        "max_error": int(max_error)
-                    }
+                    severity=ValidationSeverity.LOW,
+                    description=f"Could not perform {name} analysis: {outcome.error}",
                 ))
+            elif outcome.triggered and detector.category != "ai":
+                details = {k: v for k, v in outcome.metrics.items() if k != "confidence"}
+                findings.append(ValidationIssue(
+                    category="forensic",
+                    severity=ValidationSeverity(detector.severity),
+                    description=outcome.message,
+                    details=details or None,
+                ))
+        return findings
 
-            return is_tampered, round(confidence, 3), findings
-
-        except Exception as e:
-            findings.append(ValidationIssue(
-                category="forensic",
-                severity=ValidationSeverity.LOW,
-                description=f"Could not perform ELA analysis: {str(e)}",
-            ))
-            return False, 0.0, findings
-
-    async def _forensic_analysis(self, image: Image.Image) -> List[ValidationIssue]:
-        """Perform additional forensic checks."""
+    @staticmethod
+    def _region_findings(regions: List[SuspiciousRegion]) -> List[ValidationIssue]:
+        """One finding per suspicious region, best first."""
         findings: List[ValidationIssue] = []
-
-        # Convert to RGB if necessary
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-
-        img_array = np.array(image)
-
-        # Check 1: Clone detection (repeated regions)
-        has_clones = self._detect_cloned_regions(img_array)
-        if has_clones:
-            findings.append(ValidationIssue(
-                category="forensic",
-                severity=ValidationSeverity.HIGH,
-                description="Detected potentially cloned/copied regions in image",
-            ))
-
-        # Check 2: Consistency in JPEG compression
-        # Different parts of the image should have similar compression artifacts
-        compression_consistent = self._check_compression_consistency(img_array)
-        if not compression_consistent:
-            findings.append(ValidationIssue(
-                category="forensic",
-                severity=ValidationSeverity.MEDIUM,
-                description="Inconsistent compression levels detected across image",
-            ))
-
-        # Check 3: Unusual aspect ratio or dimensions
-        width, height = image.size
-        aspect_ratio = width / height
-
-        # Check for unusual dimensions (common in fake documents)
-        if aspect_ratio > 5 or aspect_ratio < 0.2:
+        for rank, region in enumerate(regions, start=1):
+            if region.score >= 0.75:
+                severity = ValidationSeverity.HIGH
+            elif region.score >= 0.5:
+                severity = ValidationSeverity.MEDIUM
+            else:
+                severity = ValidationSeverity.LOW
             findings.append(ValidationIssue(
                 category="forensic",
-                severity=ValidationSeverity.LOW,
-                description=f"Unusual aspect ratio: {aspect_ratio:.2f}",
-                details={"width": width, "height": height}
+                severity=severity,
+                description=(
+                    f"Suspicious region #{rank} ({', '.join(region.sources)}): "
+                    f"{region.width}x{region.height} px at ({region.x}, {region.y})"
+                ),
+                location=f"x={region.x},y={region.y},width={region.width},height={region.height}",
+                details={"rank": rank, **region.to_dict()},
             ))
-
         return findings
 
-    async def _reverse_image_search(self, image_path: Path) -> int:
-        """
-        Perform reverse image search to find matches online.
+    @staticmethod
+    def _noise_heatmap(noise_map: NoiseMap) -> np.ndarray:
+        """Compact uint8 version of the noise-inconsistency map."""
+        return to_uint8(pool_map(noise_map.heatmap(), settings.HEATMAP_GRID_EDGE))
 
-        This is a placeholder - in production, integrate with:
-        - Google Reverse Image Search API
-        - TinEye API
-        - Bing Visual Search API
+    async def _reverse_image_search(
+        self,
+        phash: int,
+        dhash: int,
+        document_id: Optional[str] = None,
+        file_name: Optional[str] = None,
+    ) -> List[str]:
         """
-        # Placeholder implementation
-        # In production, call external APIs here
-
-        # For now, return 0 (no matches found)
-        # This would need API keys and HTTP requests to external services
-
-        return 0
-
-    def _calculate_noise_level(self, img_array: np.ndarray) -> float:
-        """Calculate noise level in image."""
-        # Use Laplacian variance as noise estimate
-        gray = np.mean(img_array, axis=2).astype(np.uint8)
-
-        # Simple Laplacian kernel
-        laplacian = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
-
-        # Apply convolution (simplified)
-        from scipy.ndimage import convolve
-        try:
-            variance = np.var(convolve(gray, laplacian))
-            return float(variance)
-        except ImportError:
-            # Fallback if scipy not available
-            return 10.0  # Assume normal noise level
-
-    def _calculate_color_entropy(self, img_array: np.ndarray) -> float:
-        """Calculate color distribution entropy."""
-        # Flatten and calculate histogram
-        pixels = img_array.reshape(-1, 3)
-
-        # Calculate entropy for each channel
-        entropy_sum = 0.0
-        for channel in range(3):
-            hist, _ = np.histogram(pixels[:, channel], bins=256, range=(0, 256))
-            hist = hist / hist.sum()  # Normalize
-            hist = hist[hist > 0]  # Remove zeros
-            entropy = -np.sum(hist * np.log2(hist))
-            entropy_sum += entropy
-
-        return entropy_sum / 3  # Average across channels
-
-    def _analyze_edges(self, img_array: np.ndarray) -> float:
-        """Analyze edge consistency."""
-        gray = np.mean(img_array, axis=2).astype(np.uint8)
-
-        # Simple edge detection using gradient
-        grad_x = np.diff(gray, axis=1)
-        grad_y = np.diff(gray, axis=0)
-
-        # Calculate edge strength
-        edge_strength = np.mean(np.abs(grad_x)) + np.mean(np.abs(grad_y))
-
-        # Normalize to 0-1 range (heuristic)
-        normalized = min(edge_strength / 50.0, 1.0)
-
-        return normalized
-
-    def _check_ai_artifacts(self, img_array: np.ndarray) -> bool:
-        """Check for artifacts typical of AI-generated images."""
-        # Look for:
-        # 1. Perfect symmetry (common in AI faces)
-        # 2. Repetitive patterns
-        # 3. Impossible geometry
-
-        height, width = img_array.shape[:2]
+        Find previously analysed near-duplicates in the local hash index.
 
-        # Check for perfect left-right symmetry
-        left_half = img_array[:, :width//2]
-        right_half = np.fliplr(img_array[:, width//2:])
+        The image is looked up before being added (under ``document_id``, when
+        given), so it never matches itself. Nothing leaves the machine; online
+        providers are queried separately in _query_external_providers.
 
-        # Ensure same dimensions
-        min_width = min(left_half.shape[1], right_half.shape[1])
-        left_half = left_half[:, :min_width]
-        right_half = right_half[:, :min_width]
-
-        # Calculate similarity
-        difference = np.mean(np.abs(left_half.astype(float) - right_half.astype(float)))
-
-        # If nearly identical, might be AI-generated
-        is_perfectly_symmetric = difference < 5.0
-
-        return is_perfectly_symmetric
-
-    def _detect_cloned_regions(self, img_array: np.ndarray) -> bool:
-        """Detect cloned/copied regions in image."""
-        # This is a simplified check
-        # In production, use more sophisticated algorithms like SIFT matching
-
-        # Calculate image hash for regions
-        height, width = img_array.shape[:2]
-        region_size = 32
-
-        hashes = []
-        for y in range(0, height - region_size, region_size):
-            for x in range(0, width - region_size, region_size):
-                region = img_array[y:y+region_size, x:x+region_size]
-                region_hash = hashlib.md5(region.tobytes()).hexdigest()
-                hashes.append(region_hash)
-
-        # Check for duplicate hashes
-        unique_hashes = len(set(hashes))
-        total_hashes = len(hashes)
-
-        # If more than 5% duplicates, might have cloned regions
-        duplicate_ratio = 1 - (unique_hashes / total_hashes)
-
-        return duplicate_ratio > 0.05
-
-    def _check_compression_consistency(self, img_array: np.ndarray) -> bool:
-        """Check if compression is consistent across image."""
-        # Divide image into quadrants and check variance
-        height, width = img_array.shape[:2]
-
-        quadrants = [
-            img_array[:height//2, :width//2],
-            img_array[:height//2, width//2:],
-            img_array[height//2:, :width//2],
-            img_array[height//2:, width//2:],
-        ]
-
-        variances = [np.var(q) for q in quadrants]
-
-        # Check if variances are similar
-        variance_std = np.std(variances)
+        Returns:
+            Document ids of matching images, closest first
+        """
+        index = get_image_index()
+        if document_id is None:
+            matches = await asyncio.to_thread(index.query, phash, dhash)
+        else:
+            matches = await asyncio.to_thread(index.search_and_add, document_id, phash, dhash, file_name)
+        return [match["document_id"] for match in matches]
+
+    async def _query_external_providers(
+        self,
+        image_path: Path,
+        file_name: Optional[str],
+        reverse_search: bool,
+        ai_detection: bool,
+    ) -> List[ProviderResult]:
+        """
+        Query the configured external APIs concurrently.
 
-        # If standard deviation of variances is high, compression is inconsistent
-        return variance_std < 1000  # Threshold is heuristic
+        Calls go through the shared provider client, which applies pooling,
+        per-provider limits, hedging, circuit breaking and result caching.
+        """
+        client = get_provider_client()
+        image_bytes = await asyncio.to_thread(Path(image_path).read_bytes)
+        kinds = [kind for kind, wanted in ((REVERSE_SEARCH, reverse_search), (AI_DETECTION, ai_detection)) if wanted]
+
+        batches = await asyncio.gather(*(
+            client.query(kind, image_bytes=image_bytes, file_name=file_name or Path(image_path).name)
+            for kind in kinds
+        ))
+        return [result for batch in batches for result in batch]
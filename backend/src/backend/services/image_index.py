@@ -0,0 +1,256 @@
+"""Local perceptual-hash index used as a private reverse-image-search provider."""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import imagehash
+import numpy as np
+from PIL import Image
+
+from backend.config import settings
+
+HASH_BITS = 64
+CHUNK_COUNT = 4
+CHUNK_BITS = HASH_BITS // CHUNK_COUNT
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+# Hashes with at most this many bits set (or cleared) carry no information:
+# solid colours and blank pages hash to (nearly) all zeros and would all
+# match each other
+MIN_INFORMATIVE_BITS = 3
+
+
+def compute_hashes(image: Image.Image) -> Tuple[int, int]:
+    """
+    Compute 64-bit perceptual (pHash) and difference (dHash) hashes.
+
+    Args:
+        image: Image to hash (any size; imagehash downsamples internally)
+
+    Returns:
+        Tuple of (phash, dhash) as unsigned integers
+    """
+    phash = int(str(imagehash.phash(image)), 16)
+    dhash = int(str(imagehash.dhash(image)), 16)
+    return phash, dhash
+
+
+def compute_hashes_from_array(img_array: np.ndarray) -> Tuple[int, int]:
+    """Compute pHash/dHash from an RGB uint8 array."""
+    return compute_hashes(Image.fromarray(img_array))
+
+
+def is_informative(phash: int, dhash: int) -> bool:
+    """Whether both hashes have enough set and cleared bits to identify an image."""
+    return all(
+        MIN_INFORMATIVE_BITS <= value.bit_count() <= HASH_BITS - MIN_INFORMATIVE_BITS
+        for value in (phash, dhash)
+    )
+
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << HASH_BITS) if value >= (1 << (HASH_BITS - 1)) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+def _chunks(value: int) -> List[int]:
+    return [(value >> (CHUNK_BITS * i)) & CHUNK_MASK for i in range(CHUNK_COUNT)]
+
+
+def _ball(value: int, radius: int) -> List[int]:
+    """All chunk values within ``radius`` bit flips of ``value``."""
+    values = {value}
+    frontier = {value}
+    for _ in range(radius):
+        frontier = {v ^ (1 << bit) for v in frontier for bit in range(CHUNK_BITS)} - values
+        values |= frontier
+    return sorted(values)
+
+
+class ImageHashIndex:
+    """
+    Persistent near-duplicate index over perceptual hashes.
+
+    Uses multi-index hashing: each 64-bit pHash is split into four 16-bit
+    chunks, each stored in its own indexed SQLite column. By the pigeonhole
+    principle, any hash within Hamming radius ``r`` matches at least one chunk
+    within ``r // 4`` bits, so a query only enumerates a small neighbourhood
+    per chunk and verifies the full pHash/dHash distances on the candidates.
+    This keeps radius queries sub-linear over millions of entries without any
+    image ever leaving the machine.
+
+    Uninformative hashes (see is_informative) are neither indexed nor
+    matched, so blank and uniform images never corroborate each other.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, max_distance: int = 6):
+        """
+        Initialize the image hash index.
+
+        Args:
+            db_path: SQLite database file (defaults to the audit directory)
+            max_distance: Default Hamming radius for near-duplicate queries
+        """
+        self.db_path = db_path or Path("/tmp/corroboration_audit/image_index.sqlite3")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_distance = max_distance
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS image_hashes (
+                    document_id TEXT NOT NULL,
+                    file_name TEXT,
+                    phash INTEGER NOT NULL,
+                    dhash INTEGER NOT NULL,
+                    c0 INTEGER NOT NULL,
+                    c1 INTEGER NOT NULL,
+                    c2 INTEGER NOT NULL,
+                    c3 INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+            for i in range(CHUNK_COUNT):
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_image_hashes_c{i} ON image_hashes (c{i})"
+                )
+
+    def add(self, document_id: str, phash: int, dhash: int, file_name: Optional[str] = None):
+        """
+        Add an image's hashes to the index.
+
+        Args:
+            document_id: Identifier of the analysed document
+            phash: 64-bit perceptual hash
+            dhash: 64-bit difference hash
+            file_name: Original file name (informational)
+        """
+        if not is_informative(phash, dhash):
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO image_hashes (document_id, file_name, phash, dhash, c0, c1, c2, c3, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    document_id,
+                    file_name,
+                    _to_signed(phash),
+                    _to_signed(dhash),
+                    *_chunks(phash),
+                    datetime.now().isoformat(),
+                ),
+            )
+
+    def query(
+        self,
+        phash: int,
+        dhash: int,
+        max_distance: Optional[int] = None,
+        exclude: Iterable[str] = (),
+    ) -> List[Dict[str, object]]:
+        """
+        Find indexed images within a Hamming radius.
+
+        Args:
+            phash: Query perceptual hash
+            dhash: Query difference hash
+            max_distance: Hamming radius applied to both hashes
+            exclude: Document ids to leave out (e.g. the query document)
+
+        Returns:
+            Matches sorted by pHash distance, each with document_id,
+            file_name, phash_distance and dhash_distance (none for an
+            uninformative query)
+        """
+        if not is_informative(phash, dhash):
+            return []
+        radius = self.max_distance if max_distance is None else max_distance
+        chunk_radius = radius // CHUNK_COUNT
+        excluded = set(exclude)
+
+        clauses = []
+        params: List[int] = []
+        for i, chunk in enumerate(_chunks(phash)):
+            neighbours = _ball(chunk, chunk_radius)
+            clauses.append(f"c{i} IN ({','.join('?' * len(neighbours))})")
+            params.extend(neighbours)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT document_id, file_name, phash, dhash FROM image_hashes WHERE {' OR '.join(clauses)}",
+                params,
+            ).fetchall()
+
+        matches: Dict[str, Dict[str, object]] = {}
+        for document_id, file_name, row_phash, row_dhash in rows:
+            row_phash, row_dhash = _to_unsigned(row_phash), _to_unsigned(row_dhash)
+            # Rows indexed before uninformative hashes were skipped
+            if document_id in excluded or not is_informative(row_phash, row_dhash):
+                continue
+            p_dist = (phash ^ row_phash).bit_count()
+            d_dist = (dhash ^ row_dhash).bit_count()
+            if p_dist <= radius and d_dist <= radius:
+                best = matches.get(document_id)
+                if best is None or p_dist < best["phash_distance"]:
+                    matches[document_id] = {
+                        "document_id": document_id,
+                        "file_name": file_name,
+                        "phash_distance": p_dist,
+                        "dhash_distance": d_dist,
+                    }
+
+        return sorted(matches.values(), key=lambda m: (m["phash_distance"], m["dhash_distance"]))
+
+    def search_and_add(
+        self,
+        document_id: str,
+        phash: int,
+        dhash: int,
+        file_name: Optional[str] = None,
+        max_distance: Optional[int] = None,
+    ) -> List[Dict[str, object]]:
+        """Query for prior near-duplicates, then index this image."""
+        matches = self.query(phash, dhash, max_distance=max_distance, exclude=[document_id])
+        self.add(document_id, phash, dhash, file_name=file_name)
+        return matches
+
+    def count(self) -> int:
+        """Number of indexed images."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM image_hashes").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_image_index: Optional[ImageHashIndex] = None
+_image_index_lock = threading.Lock()
+
+
+def get_image_index() -> ImageHashIndex:
+    """Return the shared image hash index, opening it on first use."""
+    global _image_index
+    with _image_index_lock:
+        if _image_index is None:
+            _image_index = ImageHashIndex(
+                db_path=Path(settings.IMAGE_INDEX_PATH),
+                max_distance=settings.IMAGE_INDEX_MAX_DISTANCE,
+            )
+        return _image_index
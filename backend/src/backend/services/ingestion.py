@@ -0,0 +1,182 @@
+"""Ingestion guard: magic-byte sniffing and header-only decode budgets for uploaded images."""
+
+import io
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from PIL import Image
+
+from backend.config import settings
+from backend.services.url_fetcher import SNIFF_BYTES, extension_allowed, sniff_extension
+
+IMAGE_TYPES = {".jpg", ".png", ".tiff", ".bmp", ".gif", ".webp"}
+
+# JPEG DCT scaling can decode at 1/2, 1/4 or 1/8 of the declared size
+DRAFT_REDUCTIONS = (2, 4, 8)
+
+# Bytes per band of the modes that are not 8-bit
+_BAND_BYTES = {"I": 4, "F": 4, "I;16": 2, "I;16B": 2, "I;16L": 2, "I;16N": 2}
+
+
+class IngestionError(ValueError):
+    """An upload was refused before decoding; ``status_code`` is the HTTP status to report."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class ImageHeader:
+    """
+    What an image declares about itself, and how it will be decoded.
+
+    Attributes:
+        extension: Sniffed type (".jpg", ".png", ...)
+        width: Declared width in pixels
+        height: Declared height in pixels
+        frames: Declared number of frames (pages)
+        mode: PIL mode of the first frame
+        reduction: Linear down-scale applied at decode (1 = full size)
+        decoded_bytes: Estimated memory of decoding every frame, plus its RGB copy
+    """
+
+    extension: str
+    width: int
+    height: int
+    frames: int
+    mode: str
+    reduction: int = 1
+    decoded_bytes: int = 0
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    @property
+    def decoded_pixels(self) -> int:
+        """Pixels per frame after the planned reduction."""
+        return -(-self.width // self.reduction) * -(-self.height // self.reduction)
+
+
+def _bytes_per_pixel(mode: str) -> int:
+    """Decoded size of one pixel in ``mode`` plus the RGB array the analyzers build from it."""
+    try:
+        bands = Image.getmodebands(mode)
+    except (KeyError, ValueError):
+        bands = 4
+    return bands * _BAND_BYTES.get(mode, 1) + 3
+
+
+def inspect_image(
+    data: bytes,
+    max_pixels: Optional[int] = None,
+    max_frames: Optional[int] = None,
+    max_decode_bytes: Optional[int] = None,
+) -> ImageHeader:
+    """
+    Check an image against the decode budget using its header only.
+
+    The type is taken from the magic bytes, never from the file name. PIL
+    only parses the header here, so a file that declares 60k x 60k pixels
+    is refused without allocating them. JPEGs above the budget are accepted
+    when DCT-scaled (draft) decoding at 1/2, 1/4 or 1/8 brings them within
+    it; other formats must fit at full size.
+
+    Args:
+        data: File contents
+        max_pixels: Decoded pixels allowed per frame (default IMAGE_MAX_PIXELS)
+        max_frames: Frames allowed (default IMAGE_MAX_FRAMES)
+        max_decode_bytes: Estimated decode memory allowed over all frames
+            (default IMAGE_MAX_DECODE_BYTES)
+
+    Returns:
+        ImageHeader with the planned reduction
+
+    Raises:
+        IngestionError: 415 if the content is not a readable image, 413 if
+            it exceeds the budget
+    """
+    max_pixels = max_pixels or settings.IMAGE_MAX_PIXELS
+    max_frames = max_frames or settings.IMAGE_MAX_FRAMES
+    max_decode_bytes = max_decode_bytes or settings.IMAGE_MAX_DECODE_BYTES
+
+    extension = sniff_extension(data[:SNIFF_BYTES])
+    if extension not in IMAGE_TYPES:
+        raise IngestionError("Content is not a supported image type", status_code=415)
+
+    try:
+        with warnings.catch_warnings():
+            # Size limits are enforced below against our own budget
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            with Image.open(io.BytesIO(data)) as image:
+                width, height = image.size
+                mode = image.mode
+                frames = int(getattr(image, "n_frames", 1))
+    except Image.DecompressionBombError as e:
+        raise IngestionError(f"Image dimensions exceed the decode limit: {e}", status_code=413)
+    except Exception as e:
+        raise IngestionError(f"Unreadable image header: {e}", status_code=415)
+
+    if width <= 0 or height <= 0:
+        raise IngestionError("Image declares no pixels", status_code=415)
+    if frames > max_frames:
+        raise IngestionError(f"Image has {frames} frames; at most {max_frames} are accepted", status_code=413)
+
+    header = ImageHeader(extension=extension, width=width, height=height, frames=frames, mode=mode)
+    per_pixel = _bytes_per_pixel(mode)
+    reductions = (1,) + (DRAFT_REDUCTIONS if extension == ".jpg" else ())
+    for reduction in reductions:
+        header.reduction = reduction
+        header.decoded_bytes = header.decoded_pixels * per_pixel * frames
+        if header.decoded_pixels <= max_pixels and header.decoded_bytes <= max_decode_bytes:
+            return header
+
+    raise IngestionError(
+        f"Image of {width}x{height} px x {frames} frame(s) exceeds the decode budget "
+        f"({max_pixels} px per frame, {max_decode_bytes // (1024 * 1024)} MB)",
+        status_code=413,
+    )
+
+
+def check_upload(
+    data: bytes,
+    file_name: str,
+    allowed_extensions: Optional[Iterable[str]] = None,
+    content_type: Optional[str] = None,
+) -> Tuple[str, Optional[ImageHeader]]:
+    """
+    Validate an upload by its content before anything decodes it.
+
+    Args:
+        data: File contents
+        file_name: Client-supplied file name (its extension is not trusted)
+        allowed_extensions: Accepted types, e.g. settings.ALLOWED_EXTENSIONS
+        content_type: Client-supplied Content-Type. Plain text has no magic
+            bytes, so a text/plain type (or a .txt name) is what lets valid
+            UTF-8 through; binary signatures still win
+
+    Returns:
+        Tuple of (file name with the sniffed extension, ImageHeader for images
+        or None for documents)
+
+    Raises:
+        IngestionError: 415 for unrecognised or disallowed content, 413 for
+            images over the decode budget
+    """
+    suffix = Path(file_name).suffix.lower()
+    declared_type = "text/plain" if suffix == ".txt" else content_type
+    extension = sniff_extension(data[:SNIFF_BYTES], declared_type)
+    if extension is None or not extension_allowed(extension, allowed_extensions):
+        raise IngestionError(
+            f"File content does not match an allowed type. Allowed: {list(allowed_extensions or [])}",
+            status_code=415,
+        )
+
+    if not extension_allowed(extension, [suffix]):
+        file_name = f"{Path(file_name).stem or 'upload'}{extension}"
+
+    header = inspect_image(data) if extension in IMAGE_TYPES else None
+    return file_name, header
@@ -1,14 +1,19 @@
 """OCR service using Docling."""
 
+import asyncio
 import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import tempfile
 
+from PIL import Image
+
 from docling.document_converter import DocumentConverter
 from docling.datamodel.base_models import InputFormat
 from docling.datamodel.pipeline_options import PdfPipelineOptions
 
+from backend.config import settings
+from backend.forensics.frames import frame_count, save_frame
 from backend.schemas.ocr import OCRResponse, OCRTextResult, BoundingBox
 
 
@@ -41,6 +46,11 @@ class OCRService:
         start_time = time.time()
         print("Processing Image...")
 
+        with Image.open(file_path) as probe:
+            frames = frame_count(probe)
+        if frames > 1:
+            return await self._process_pages(file_path, frames, start_time)
+
         try:
             # Convert the image using Docling
             result = self.converter.convert(str(file_path))
@@ -77,6 +87,51 @@ class OCRService:
         except Exception as e:
             raise Exception(f"OCR processing failed: {str(e)}")
 
+    async def _process_pages(self, file_path: Path, frames: int, start_time: float) -> OCRResponse:
+        """
+        OCR a multi-frame image (e.g. a scanned TIFF statement) page by page.
+
+        Each page is written to its own temporary PNG and converted in a
+        worker thread; at most FRAME_ANALYSIS_CONCURRENCY pages are decoded
+        at once. Page texts are joined in page order and every text block
+        records its page.
+        """
+        limit = asyncio.Semaphore(max(1, settings.FRAME_ANALYSIS_CONCURRENCY))
+
+        async def ocr_page(index: int) -> Tuple[str, List[OCRTextResult]]:
+            async with limit:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    page_path = Path(tmp_dir) / f"page-{index + 1}.png"
+                    await asyncio.to_thread(save_frame, file_path, index, page_path)
+                    result = await asyncio.to_thread(self.converter.convert, str(page_path))
+            texts = getattr(result.document, 'texts', None) or []
+            blocks = [
+                OCRTextResult(
+                    text=block.text if hasattr(block, 'text') else str(block),
+                    confidence=1.0,  # Docling doesn't provide confidence scores directly
+                    page=index + 1,
+                )
+                for block in texts
+            ]
+            return result.document.export_to_markdown(), blocks
+
+        try:
+            pages = await asyncio.gather(*(ocr_page(index) for index in range(frames)))
+        except Exception as e:
+            raise Exception(f"OCR processing failed: {str(e)}")
+
+        return OCRResponse(
+            text="\n\n".join(f"<!-- page {page} -->\n{text}" for page, (text, _) in enumerate(pages, start=1)),
+            results=[block for _, blocks in pages for block in blocks],
+            metadata={
+                "engine": "docling",
+                "language": "en",
+                "file_name": file_path.name,
+                "pages": frames,
+            },
+            processing_time=time.time() - start_time,
+        )
+
     async def process_image_bytes(
         self,
         file_bytes: bytes,
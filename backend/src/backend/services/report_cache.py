@@ -0,0 +1,115 @@
+"""In-process LRU of served reports, their rendered forms and strong ETags."""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from backend.schemas.validation import CorroborationReport
+
+
+def strong_etag(content: bytes) -> str:
+    """Strong entity tag of a response body."""
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches ``etag``.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    ``W/`` prefix added by an intermediary still matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+@dataclass
+class CachedReport:
+    """
+    A report with its serialised JSON body and, once requested, its markdown.
+
+    Attributes:
+        report: Parsed report
+        body: JSON response body
+        etag: Strong ETag of ``body``
+        markdown: Rendered markdown (None until first requested)
+        markdown_etag: Strong ETag of ``markdown``
+    """
+
+    report: CorroborationReport
+    body: bytes
+    etag: str
+    markdown: Optional[str] = None
+    markdown_etag: Optional[str] = None
+
+    @classmethod
+    def from_report(cls, report: CorroborationReport) -> "CachedReport":
+        body = report.model_dump_json().encode()
+        return cls(report=report, body=body, etag=strong_etag(body))
+
+    def set_markdown(self, markdown: str):
+        self.markdown = markdown
+        self.markdown_etag = strong_etag(markdown.encode())
+
+
+class ReportCache:
+    """
+    LRU of CachedReport entries keyed by document id.
+
+    Reports never change once generated, so entries need no expiry and their
+    ETags stay valid for good. ETags are also remembered in a second, much
+    larger LRU, which lets a conditional GET for an evicted report be
+    answered with 304 without loading it again.
+    """
+
+    def __init__(self, max_entries: int = 256, max_etags: int = 8192):
+        self.max_entries = max_entries
+        self.max_etags = max_etags
+        self._entries: "OrderedDict[str, CachedReport]" = OrderedDict()
+        self._etags: "OrderedDict[str, Tuple[str, Optional[str]]]" = OrderedDict()
+
+    def get(self, document_id: str) -> Optional[CachedReport]:
+        entry = self._entries.get(document_id)
+        if entry is not None:
+            self._entries.move_to_end(document_id)
+        return entry
+
+    def put(self, report: CorroborationReport) -> CachedReport:
+        """Cache a report, serialising it once; returns its entry."""
+        entry = CachedReport.from_report(report)
+        self._store(self._entries, report.document_id, entry, self.max_entries)
+        self._remember(report.document_id, entry)
+        return entry
+
+    def set_markdown(self, entry: CachedReport, markdown: str):
+        entry.set_markdown(markdown)
+        self._remember(entry.report.document_id, entry)
+
+    def etag(self, document_id: str, markdown: bool = False) -> Optional[str]:
+        """Known ETag of a report (or its markdown), without loading it."""
+        tags = self._etags.get(document_id)
+        if tags is None:
+            return None
+        self._etags.move_to_end(document_id)
+        return tags[1] if markdown else tags[0]
+
+    def _remember(self, document_id: str, entry: CachedReport):
+        # Only the tags are kept once the full entry is evicted
+        self._store(self._etags, document_id, (entry.etag, entry.markdown_etag), self.max_etags)
+
+    @staticmethod
+    def _store(entries: OrderedDict, key: str, value, limit: int):
+        if limit <= 0:
+            return
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > limit:
+            entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
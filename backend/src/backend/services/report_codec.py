@@ -0,0 +1,123 @@
+"""Compact storage encoding for corroboration reports."""
+
+import json
+import re
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+# Prefixes of compact blobs (with and without interned strings); anything
+# else is a plain JSON report
+MAGIC = b"CRZ\x01"
+MAGIC_UNINTERNED = b"CRZ\x00"
+
+# String fields that repeat across reports (issue texts, risk factors,
+# recommendations). They are replaced by ids into a shared string table.
+ISSUE_LISTS = (
+    ("format_validation", "issues"),
+    ("structure_validation", "issues"),
+    ("content_validation", "issues"),
+    ("image_analysis", "metadata_issues"),
+    ("image_analysis", "forensic_findings"),
+)
+ISSUE_FIELDS = ("category", "description", "location")
+FACTOR_FIELDS = ("component", "factor")
+
+# An interned value is the JSON string "\u0001<id>" (a string) or
+# "\u0002<id>" (any other value, stored as its JSON text)
+_STRING_MARK = "\x01"
+_VALUE_MARK = "\x02"
+_REFERENCE = re.compile(rb'"\\u000([12])(\d+)"')
+_REFERENCE_PREFIX = b'"\\u000'
+
+
+def _interned_fields(data: Dict[str, Any]) -> Iterator[Tuple[Union[Dict[str, Any], List[Any]], Union[str, int]]]:
+    """(container, key) of every interned field present in a report dict."""
+    for section, field in ISSUE_LISTS:
+        for issue in (data.get(section) or {}).get(field) or []:
+            for name in ISSUE_FIELDS:
+                if issue.get(name) is not None:
+                    yield issue, name
+
+    risk = data.get("risk_score") or {}
+    for factor in risk.get("contributing_factors") or []:
+        for name in FACTOR_FIELDS:
+            if factor.get(name) is not None:
+                yield factor, name
+    recommendations = risk.get("recommendations") or []
+    for index in range(len(recommendations)):
+        yield recommendations, index
+
+
+def encode_report(data: Dict[str, Any], intern: Callable[[str], int], level: int = 6) -> bytes:
+    """
+    Encode a report dict (``model_dump(mode="json")``) compactly.
+
+    Repeated strings are replaced by references to their ids from ``intern``;
+    the rest is serialised as JSON without whitespace and zlib-compressed.
+
+    Args:
+        data: Report dict; modified in place
+        intern: Returns the id of a string in the shared string table
+        level: zlib compression level
+
+    Returns:
+        Blob starting with MAGIC (MAGIC_UNINTERNED if the report already
+        contains text that reads as a reference)
+    """
+    plain = json.dumps(data, separators=(",", ":")).encode()
+    if _REFERENCE.search(plain):
+        # A field already looks like a reference; store this report without interning
+        return MAGIC_UNINTERNED + zlib.compress(plain, level)
+
+    for container, key in _interned_fields(data):
+        value = container[key]
+        if isinstance(value, str):
+            container[key] = f"{_STRING_MARK}{intern(value)}"
+        else:
+            container[key] = f"{_VALUE_MARK}{intern(json.dumps(value))}"
+    payload = json.dumps(data, separators=(",", ":")).encode()
+    return MAGIC + zlib.compress(payload, level)
+
+
+def decode_report(blob: Union[bytes, str], resolve: Callable[[int], bytes]) -> Union[bytes, str]:
+    """
+    Restore a stored report's JSON, accepting compact blobs and plain JSON.
+
+    References are substituted in the JSON text, so the result can go
+    straight to ``CorroborationReport.model_validate_json`` without an
+    intermediate Python parse.
+
+    Args:
+        blob: Stored report
+        resolve: Returns the JSON string literal of a string id
+
+    Returns:
+        Report JSON
+    """
+    if isinstance(blob, str):
+        return blob
+    if blob.startswith(MAGIC_UNINTERNED):
+        return zlib.decompress(blob[len(MAGIC_UNINTERNED):])
+    if not blob.startswith(MAGIC):
+        return blob
+
+    payload = zlib.decompress(blob[len(MAGIC):])
+    parts = payload.split(_REFERENCE_PREFIX)
+    if len(parts) == 1:
+        return payload
+
+    out = [parts[0]]
+    for part in parts[1:]:
+        mark = part[:1]
+        end = part.find(b'"', 1)
+        number = part[1:end]
+        if mark in (b"1", b"2") and number.isdigit():
+            literal = resolve(int(number))
+            if mark == b"2":
+                literal = json.loads(literal).encode()
+            out.append(literal)
+            out.append(part[end + 1:])
+        else:
+            out.append(_REFERENCE_PREFIX)
+            out.append(part)
+    return b"".join(out)
@@ -1,6 +1,6 @@
 """Report generation and audit trail service."""
 
-import json
+import asyncio
 import uuid
 from pathlib import Path
 from typing import Optional, List, Dict, Any
@@ -15,20 +15,43 @@ from backend.schemas.validation import (
     RiskScore,
     ValidationSeverity,
 )
+from backend.config import settings
+from backend.services.audit_writer import AuditWriter, get_audit_writer
+from backend.services.report_cache import CachedReport, ReportCache
+from backend.services.report_store import ReportStore, format_timestamp, get_report_store
 
 
 class ReportGenerator:
     """Service for generating comprehensive corroboration reports and audit trails."""
 
-    def __init__(self, audit_log_path: Optional[Path] = None):
+    def __init__(
+        self,
+        audit_log_path: Optional[Path] = None,
+        report_store: Optional[ReportStore] = None,
+        audit_writer: Optional[AuditWriter] = None,
+        report_cache: Optional[ReportCache] = None,
+    ):
         """
         Initialize the report generator.
 
         Args:
             audit_log_path: Path to store audit logs (defaults to /tmp/corroboration_audit)
+            report_store: Indexed report store (defaults to the shared store)
+            audit_writer: Background audit writer (defaults to the shared writer
+                unless a custom path or store is given)
+            report_cache: LRU of served reports (sized from settings by default)
         """
+        custom = audit_log_path is not None or report_store is not None
         self.audit_log_path = audit_log_path or Path("/tmp/corroboration_audit")
         self.audit_log_path.mkdir(parents=True, exist_ok=True)
+        self.report_store = report_store or get_report_store()
+        if audit_writer is None:
+            audit_writer = AuditWriter(self.audit_log_path, self.report_store) if custom else get_audit_writer()
+        self.audit_writer = audit_writer
+        self.cache = report_cache or ReportCache(
+            max_entries=settings.REPORT_CACHE_SIZE,
+            max_etags=settings.REPORT_ETAG_CACHE_SIZE,
+        )
 
     async def generate_report(
         self,
@@ -41,6 +64,8 @@ class ReportGenerator:
         risk_score: RiskScore = None,
         processing_time: float = 0.0,
         engines_used: List[str] = None,
+        document_id: Optional[str] = None,
+        file_hash: Optional[str] = None,
     ) -> CorroborationReport:
         """
         Generate comprehensive corroboration report.
@@ -55,11 +80,13 @@ class ReportGenerator:
             risk_score: Risk assessment
             processing_time: Total processing time
             engines_used: List of analysis engines used
+            document_id: Pre-assigned document id (generated when omitted)
+            file_hash: SHA-256 of the analysed file (hex)
 
         Returns:
             CorroborationReport with all findings
         """
-        document_id = str(uuid.uuid4())
+        document_id = document_id or str(uuid.uuid4())
         analysis_timestamp = datetime.now()
 
         # Count total issues
@@ -104,6 +131,7 @@ class ReportGenerator:
             document_id=document_id,
             file_name=file_name,
             file_type=file_type,
+            file_hash=file_hash,
             analysis_timestamp=analysis_timestamp,
             format_validation=format_validation,
             structure_validation=structure_validation,
@@ -124,7 +152,10 @@ class ReportGenerator:
 
     async def _log_audit_trail(self, report: CorroborationReport):
         """
-        Log report to audit trail.
+        Queue a report for the audit trail and the report store.
+
+        The background audit writer does the disk I/O, so this only costs
+        building the audit entry.
 
         Args:
             report: Corroboration report to log
@@ -135,7 +166,8 @@ class ReportGenerator:
                 "document_id": report.document_id,
                 "file_name": report.file_name,
                 "file_type": report.file_type,
-                "timestamp": report.analysis_timestamp.isoformat(),
+                "file_hash": report.file_hash,
+                "timestamp": format_timestamp(report.analysis_timestamp),
                 "risk_score": report.risk_score.overall_score,
                 "risk_level": report.risk_score.risk_level.value,
                 "total_issues": report.total_issues_found,
@@ -145,16 +177,7 @@ class ReportGenerator:
                 "engines_used": report.engines_used,
             }
 
-            # Save to audit log file (append mode)
-            audit_log_file = self.audit_log_path / f"audit_log_{datetime.now().strftime('%Y%m%d')}.jsonl"
-
-            with open(audit_log_file, "a") as f:
-                f.write(json.dumps(audit_entry) + "\n")
-
-            # Also save full report
-            report_file = self.audit_log_path / f"report_{report.document_id}.json"
-            with open(report_file, "w") as f:
-                f.write(report.model_dump_json(indent=2))
+            await self.audit_writer.submit(audit_entry, report)
 
         except Exception as e:
             # Don't fail report generation if audit logging fails
@@ -162,7 +185,7 @@ class ReportGenerator:
 
     async def get_report(self, document_id: str) -> Optional[CorroborationReport]:
         """
-        Retrieve a report from audit logs.
+        Retrieve a report from the cache or the report store.
 
         Args:
             document_id: Unique document identifier
@@ -170,70 +193,100 @@ class ReportGenerator:
         Returns:
             CorroborationReport if found, None otherwise
         """
-        try:
-            report_file = self.audit_log_path / f"report_{document_id}.json"
+        entry = await self.get_report_entry(document_id)
+        return entry.report if entry else None
+
+    async def get_report_entry(self, document_id: str) -> Optional[CachedReport]:
+        """
+        Retrieve a report with its serialised body and ETag.
+
+        Served from the in-process LRU when possible; otherwise the report is
+        loaded (from the audit writer's queue or the report store) and cached.
+
+        Args:
+            document_id: Unique document identifier
+
+        Returns:
+            CachedReport if found, None otherwise
+        """
+        entry = self.cache.get(document_id)
+        if entry is not None:
+            return entry
 
-            if not report_file.exists():
+        # Reports still queued for the audit writer are served from memory
+        report = self.audit_writer.pending(document_id)
+        if report is None:
+            try:
+                report_json = await asyncio.to_thread(self.report_store.get, document_id)
+
+                if report_json is None:
+                    return None
+
+                report = CorroborationReport.model_validate_json(report_json)
+
+            except Exception as e:
+                print(f"Error retrieving report: {str(e)}")
                 return None
 
-            with open(report_file, "r") as f:
-                report_data = json.load(f)
+        return self.cache.put(report)
 
-            return CorroborationReport(**report_data)
+    async def get_markdown_entry(self, document_id: str) -> Optional[CachedReport]:
+        """
+        Retrieve a report entry with its markdown rendered (once per cached entry).
 
-        except Exception as e:
-            print(f"Error retrieving report: {str(e)}")
-            return None
+        Args:
+            document_id: Unique document identifier
+
+        Returns:
+            CachedReport with ``markdown`` set if found, None otherwise
+        """
+        entry = await self.get_report_entry(document_id)
+        if entry is not None and entry.markdown is None:
+            self.cache.set_markdown(entry, await self.export_report_markdown(entry.report))
+        return entry
+
+    def report_etag(self, document_id: str, markdown: bool = False) -> Optional[str]:
+        """ETag of a report (or its markdown) if known in memory, without loading it."""
+        return self.cache.etag(document_id, markdown=markdown)
 
     async def list_reports(
         self,
         limit: int = 100,
         risk_level: Optional[ValidationSeverity] = None,
         requires_manual_review: Optional[bool] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        file_hash: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
-        List reports from audit logs.
+        List report summaries, newest first, from the report store.
 
         Args:
             limit: Maximum number of reports to return
             risk_level: Filter by risk level
             requires_manual_review: Filter by manual review requirement
+            since: Only reports analysed at or after this time
+            until: Only reports analysed before this time
+            file_hash: Only reports of files with this SHA-256
+            cursor: Resume after a previous page (see report_store.page_cursor)
 
         Returns:
             List of report summaries
-        """
-        try:
-            # Read audit log for today
-            audit_log_file = self.audit_log_path / f"audit_log_{datetime.now().strftime('%Y%m%d')}.jsonl"
-
-            if not audit_log_file.exists():
-                return []
-
-            reports = []
-            with open(audit_log_file, "r") as f:
-                for line in f:
-                    entry = json.loads(line)
 
-                    # Apply filters
-                    if risk_level and entry.get("risk_level") != risk_level.value:
-                        continue
-
-                    if requires_manual_review is not None and entry.get("requires_manual_review") != requires_manual_review:
-                        continue
-
-                    reports.append(entry)
-
-                    if len(reports) >= limit:
-                        break
-
-            # Sort by timestamp (newest first)
-            reports.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-
-            return reports
-
-        except Exception as e:
-            print(f"Error listing reports: {str(e)}")
-            return []
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        return await asyncio.to_thread(
+            self.report_store.list_reports,
+            limit=limit,
+            risk_level=risk_level.value if risk_level else None,
+            requires_manual_review=requires_manual_review,
+            since=since,
+            until=until,
+            file_hash=file_hash,
+            cursor=cursor,
+        )
 
     async def export_report_markdown(self, report: CorroborationReport) -> str:
         """
@@ -316,6 +369,16 @@ class ReportGenerator:
             md.append(f"- AI-Generated: {'Yes ⚠️' if report.image_analysis.is_ai_generated else 'No'} (Confidence: {report.image_analysis.ai_detection_confidence:.2%})")
             md.append(f"- Tampered: {'Yes ⚠️' if report.image_analysis.is_tampered else 'No'} (Confidence: {report.image_analysis.tampering_confidence:.2%})")
             md.append(f"- Reverse Image Matches: {report.image_analysis.reverse_image_matches}")
+            for match_id in report.image_analysis.reverse_image_match_ids[:10]:
+                md.append(f"  - Near-duplicate of `{match_id}`")
+            if report.image_analysis.heatmaps:
+                page_note = f" (page {report.image_analysis.heatmap_page})" if report.image_analysis.heatmap_page else ""
+                md.append(f"- Heat Maps: {', '.join(report.image_analysis.heatmaps)}{page_note}")
+            for page in report.image_analysis.pages:
+                md.append(
+                    f"  - Page {page.page}: AI {page.ai_detection_confidence:.2%}, "
+                    f"tampering {page.tampering_confidence:.2%}, {page.finding_count} finding(s)"
+                )
             md.append(f"")
 
         # Processing Information
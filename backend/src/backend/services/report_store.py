@@ -0,0 +1,421 @@
+"""Indexed SQLite store for corroboration reports and their audit summaries."""
+
+import base64
+import binascii
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from backend.config import settings
+from backend.services.report_codec import decode_report, encode_report
+
+# Summary columns returned by list queries (the audit-trail entry fields plus file_hash)
+SUMMARY_COLUMNS = (
+    "document_id",
+    "file_name",
+    "file_type",
+    "file_hash",
+    "timestamp",
+    "risk_score",
+    "risk_level",
+    "total_issues",
+    "critical_issues",
+    "requires_manual_review",
+    "processing_time",
+    "engines_used",
+)
+
+# Interned strings kept in memory per direction before the cache is reset
+_STRING_CACHE_SIZE = 100_000
+
+
+def format_timestamp(value: datetime) -> str:
+    """
+    Fixed-width ISO timestamp, so that string order is time order in SQLite.
+
+    Aware datetimes are converted to local time, matching the naive
+    ``datetime.now()`` the report generator stamps reports with.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds")
+
+
+def encode_cursor(timestamp: str, document_id: str) -> str:
+    """Opaque keyset cursor for the position after (timestamp, document_id)."""
+    return base64.urlsafe_b64encode(f"{timestamp}|{document_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Inverse of encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    timestamp, sep, document_id = raw.partition("|")
+    if not sep or not timestamp or not document_id:
+        raise ValueError("Invalid cursor")
+    return timestamp, document_id
+
+
+def page_cursor(reports: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """Cursor for the page after ``reports``, or None when it was the last page."""
+    if limit <= 0 or len(reports) < limit:
+        return None
+    last = reports[-1]
+    return encode_cursor(last["timestamp"], last["document_id"])
+
+
+class ReportStore:
+    """
+    Persistent report store with indexed, keyset-paginated listing.
+
+    One row per report holds the summary fields in indexed columns and the
+    full report. Reports are stored in the compact encoding of report_codec:
+    issue texts, risk factors and recommendations go to a shared string
+    table, so each distinct text is stored once however many reports repeat
+    it, and the rest is compressed JSON. Rows written as plain JSON (older
+    stores, or ``compact=False``) are still read transparently.
+
+    Listing walks the (timestamp, document_id) index newest first and
+    resumes strictly after a cursor, so every page costs the same
+    regardless of how deep it is or how many days the range spans.
+
+    The database runs in WAL mode: a single writer connection is serialised
+    by a lock, while each reading thread gets its own connection and reads
+    from a consistent snapshot without waiting for the writer.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, compact: bool = True, compression_level: int = 6):
+        """
+        Initialize the report store.
+
+        Args:
+            db_path: SQLite database file (defaults to the audit directory)
+            compact: Write reports in the compact encoding (plain JSON otherwise)
+            compression_level: zlib level of the compact encoding
+        """
+        self.db_path = db_path or Path("/tmp/corroboration_audit/reports.sqlite3")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.compact = compact
+        self.compression_level = compression_level
+        self._string_ids: Dict[str, int] = {}
+        self._literals: Dict[int, bytes] = {}
+
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.db_path), check_same_thread=False)
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS reports (
+                    document_id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    file_name TEXT,
+                    file_type TEXT,
+                    file_hash TEXT,
+                    risk_score REAL,
+                    risk_level TEXT,
+                    total_issues INTEGER,
+                    critical_issues INTEGER,
+                    requires_manual_review INTEGER NOT NULL,
+                    processing_time REAL,
+                    engines_used TEXT,
+                    report BLOB NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_strings (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reports_timestamp ON reports (timestamp, document_id)"
+            )
+            # Filter columns lead so a filtered listing is still an ordered index range
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reports_risk_level "
+                "ON reports (risk_level, timestamp, document_id)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reports_manual_review "
+                "ON reports (requires_manual_review, timestamp, document_id)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reports_file_hash ON reports (file_hash)"
+            )
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def put(self, summary: Dict[str, Any], report: Dict[str, Any]):
+        """
+        Insert or replace a report.
+
+        Args:
+            summary: Audit summary with the SUMMARY_COLUMNS fields; ``timestamp``
+                must come from format_timestamp
+            report: Report as ``model_dump(mode="json")``; consumed (the
+                compact encoding rewrites it in place)
+        """
+        self.put_many([(summary, report)])
+
+    def put_many(self, reports: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]):
+        """
+        Insert or replace several reports in one transaction (a single commit).
+
+        Args:
+            reports: (summary, report) pairs, as for put
+        """
+        with self._lock, self._conn:
+            new_ids: Dict[str, int] = {}
+            rows = [
+                (
+                    summary["document_id"],
+                    summary["timestamp"],
+                    summary.get("file_name"),
+                    summary.get("file_type"),
+                    summary.get("file_hash"),
+                    summary.get("risk_score"),
+                    summary.get("risk_level"),
+                    summary.get("total_issues"),
+                    summary.get("critical_issues"),
+                    int(bool(summary.get("requires_manual_review"))),
+                    summary.get("processing_time"),
+                    json.dumps(summary.get("engines_used") or []),
+                    self._encode(report, new_ids),
+                )
+                for summary, report in reports
+            ]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO reports (document_id, timestamp, file_name, file_type, file_hash, "
+                "risk_score, risk_level, total_issues, critical_issues, requires_manual_review, "
+                "processing_time, engines_used, report) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        # Only cache ids once the transaction that created them has committed
+        self._cache_strings(new_ids)
+
+    def _encode(self, report: Dict[str, Any], new_ids: Dict[str, int]):
+        if not self.compact:
+            return json.dumps(report, separators=(",", ":"))
+        return encode_report(report, lambda value: self._intern(value, new_ids), self.compression_level)
+
+    def _intern(self, value: str, new_ids: Dict[str, int]) -> int:
+        """Id of ``value`` in the string table, adding it (writer connection, lock held)."""
+        string_id = self._string_ids.get(value) or new_ids.get(value)
+        if string_id is None:
+            row = self._conn.execute("SELECT id FROM report_strings WHERE value = ?", (value,)).fetchone()
+            if row is None:
+                string_id = self._conn.execute(
+                    "INSERT INTO report_strings (value) VALUES (?)", (value,)
+                ).lastrowid
+            else:
+                string_id = row[0]
+            new_ids[value] = string_id
+        return string_id
+
+    def _cache_strings(self, ids: Dict[str, int]):
+        if len(self._string_ids) + len(ids) > _STRING_CACHE_SIZE:
+            self._string_ids.clear()
+        self._string_ids.update(ids)
+
+    def _literal(self, string_id: int) -> bytes:
+        """JSON literal of an interned string, cached (reader connection)."""
+        literal = self._literals.get(string_id)
+        if literal is None:
+            row = self._reader().execute(
+                "SELECT value FROM report_strings WHERE id = ?", (string_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown report string id {string_id}")
+            if len(self._literals) >= _STRING_CACHE_SIZE:
+                self._literals.clear()
+            literal = self._literals[string_id] = json.dumps(row[0]).encode()
+        return literal
+
+    def get(self, document_id: str) -> Optional[Union[bytes, str]]:
+        """
+        Fetch a report's JSON by document id.
+
+        Returns:
+            Report JSON (for CorroborationReport.model_validate_json) if
+            stored, None otherwise
+        """
+        row = self._reader().execute(
+            "SELECT report FROM reports WHERE document_id = ?", (document_id,)
+        ).fetchone()
+        return decode_report(row[0], self._literal) if row else None
+
+    def contains(self, document_id: str) -> bool:
+        """Whether a report is stored under ``document_id``."""
+        return self._reader().execute(
+            "SELECT 1 FROM reports WHERE document_id = ?", (document_id,)
+        ).fetchone() is not None
+
+    def list_reports(
+        self,
+        limit: int = 100,
+        risk_level: Optional[str] = None,
+        requires_manual_review: Optional[bool] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        file_hash: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        List report summaries, newest first.
+
+        Args:
+            limit: Maximum number of summaries to return
+            risk_level: Only reports with this risk level value
+            requires_manual_review: Only reports with this review flag
+            since: Only reports at or after this time
+            until: Only reports before this time
+            file_hash: Only reports of files with this SHA-256
+            cursor: Resume after the last summary of a previous page
+                (see page_cursor)
+
+        Returns:
+            Summaries with the SUMMARY_COLUMNS fields
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        clauses = []
+        params: List[Any] = []
+        if risk_level is not None:
+            clauses.append("risk_level = ?")
+            params.append(risk_level)
+        if requires_manual_review is not None:
+            clauses.append("requires_manual_review = ?")
+            params.append(int(requires_manual_review))
+        if file_hash is not None:
+            clauses.append("file_hash = ?")
+            params.append(file_hash)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(format_timestamp(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(format_timestamp(until))
+        if cursor:
+            clauses.append("(timestamp, document_id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM reports {where} "
+            "ORDER BY timestamp DESC, document_id DESC LIMIT ?",
+            (*params, max(0, limit)),
+        ).fetchall()
+
+        summaries = []
+        for row in rows:
+            summary = dict(zip(SUMMARY_COLUMNS, row))
+            summary["requires_manual_review"] = bool(summary["requires_manual_review"])
+            summary["engines_used"] = json.loads(summary["engines_used"] or "[]")
+            summaries.append(summary)
+        return summaries
+
+    def count(self) -> int:
+        """Number of stored reports."""
+        return self._reader().execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def import_report_files(self, directory: Path) -> int:
+        """
+        Load legacy ``report_<id>.json`` files into the store.
+
+        Reports already stored are kept. Unreadable files are skipped.
+
+        Args:
+            directory: Audit directory holding the report files
+
+        Returns:
+            Number of reports imported
+        """
+        imported = 0
+        for path in sorted(directory.glob("report_*.json")):
+            try:
+                data = json.loads(path.read_text())
+                risk = data.get("risk_score") or {}
+                summary = {
+                    "document_id": data["document_id"],
+                    "timestamp": format_timestamp(datetime.fromisoformat(data["analysis_timestamp"])),
+                    "file_name": data.get("file_name"),
+                    "file_type": data.get("file_type"),
+                    "risk_score": risk.get("overall_score"),
+                    "risk_level": risk.get("risk_level"),
+                    "total_issues": data.get("total_issues_found"),
+                    "critical_issues": data.get("critical_issues_count"),
+                    "requires_manual_review": data.get("requires_manual_review"),
+                    "processing_time": data.get("processing_time"),
+                    "engines_used": data.get("engines_used"),
+                }
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+
+            if not self.contains(summary["document_id"]):
+                self.put(summary, data)
+                imported += 1
+        return imported
+
+    def close(self):
+        """Close the writer and every reader connection."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        with self._lock:
+            self._conn.close()
+
+
+_report_store: Optional[ReportStore] = None
+_report_store_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    """
+    Return the shared report store, opening it on first use.
+
+    A new, empty store imports any report files left in the audit directory
+    by earlier versions.
+    """
+    global _report_store
+    with _report_store_lock:
+        if _report_store is None:
+            store = ReportStore(
+                db_path=Path(settings.REPORT_STORE_PATH),
+                compact=settings.REPORT_STORE_COMPACT,
+                compression_level=settings.REPORT_COMPRESSION_LEVEL,
+            )
+            if store.count() == 0:
+                store.import_report_files(Path(settings.AUDIT_LOG_PATH))
+            _report_store = store
+        return _report_store
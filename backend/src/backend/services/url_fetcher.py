@@ -0,0 +1,493 @@
+"""URL ingestion: pooled, size-limited streaming downloads with an on-disk conditional-GET cache."""
+
+import asyncio
+import hashlib
+import ipaddress
+import json
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from backend.config import settings
+
+# Leading bytes of the file types the API accepts
+_SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"II*\x00", ".tiff"),
+    (b"MM\x00*", ".tiff"),
+    (b"%PDF-", ".pdf"),
+    (b"PK\x03\x04", ".docx"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"BM", ".bmp"),
+)
+SNIFF_BYTES = 16
+
+# .jpeg/.tif uploads are the same formats as the sniffed .jpg/.tiff
+_EQUIVALENT_EXTENSIONS = {".jpg": {".jpg", ".jpeg"}, ".tiff": {".tiff", ".tif"}}
+
+# Redirects are followed by hand so every hop passes the address check
+MAX_REDIRECTS = 5
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class UrlFetchError(ValueError):
+    """A URL could not be ingested; ``status_code`` is the HTTP status to report."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class FetchedResource:
+    """A downloaded (or cache-served) resource."""
+
+    url: str
+    content: bytes
+    extension: str
+    content_type: Optional[str] = None
+    from_cache: bool = False
+
+    @property
+    def file_name(self) -> str:
+        """File name derived from the URL path with the sniffed extension."""
+        stem = Path(urlsplit(self.url).path).stem or "download"
+        return f"{stem}{self.extension}"
+
+
+def sniff_extension(head: bytes, declared_type: Optional[str] = None) -> Optional[str]:
+    """
+    Identify a file type from its leading bytes.
+
+    Args:
+        head: First bytes of the body (at least SNIFF_BYTES when available)
+        declared_type: Content-Type header, only trusted for plain text
+
+    Returns:
+        Extension such as ".jpg", or None when unrecognised
+    """
+    for signature, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if declared_type and declared_type.split(";")[0].strip().lower() == "text/plain":
+        try:
+            head.decode("utf-8")
+            return ".txt"
+        except UnicodeDecodeError as e:
+            # a multi-byte character may be cut at the sniff boundary
+            truncated = e.reason == "unexpected end of data" and len(head) >= SNIFF_BYTES
+            return ".txt" if truncated else None
+    return None
+
+
+def extension_allowed(extension: str, allowed: Optional[Iterable[str]]) -> bool:
+    if allowed is None:
+        return True
+    allowed = {a.lower() for a in allowed}
+    return bool(_EQUIVALENT_EXTENSIONS.get(extension, {extension}) & allowed)
+
+
+class UrlCache:
+    """
+    On-disk cache of downloaded bodies keyed by URL.
+
+    Each entry is a body file plus a JSON sidecar with the validators
+    (ETag, Last-Modified) used to revalidate it. Only responses carrying a
+    validator are stored. The least recently used entries are evicted once
+    the total size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Total body size kept on disk
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.body", self.directory / f"{key}.json"
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Validators and type of a cached URL, or None."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == url and body_path.exists() else None
+
+    @staticmethod
+    def conditional_headers(meta: Optional[Dict]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a cached entry."""
+        headers: Dict[str, str] = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def read(self, url: str, meta: Dict) -> Optional[FetchedResource]:
+        """Serve a revalidated entry (and mark it recently used)."""
+        body_path, meta_path = self._paths(url)
+        try:
+            content = body_path.read_bytes()
+            os.utime(meta_path)
+        except OSError:
+            return None
+        return FetchedResource(url, content, meta["extension"], meta.get("content_type"), from_cache=True)
+
+    def store(self, resource: FetchedResource, headers: httpx.Headers):
+        """Store a fresh download if the response can be revalidated later."""
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        if not (etag or last_modified) or "no-store" in headers.get("cache-control", "").lower():
+            return
+
+        body_path, meta_path = self._paths(resource.url)
+        meta = {
+            "url": resource.url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": resource.content_type,
+            "extension": resource.extension,
+            "size": len(resource.content),
+            "stored_at": time.time(),
+        }
+        with self._lock:
+            # Body first, sidecar last: a sidecar always points at a complete body
+            for path, data in ((body_path, resource.content), (meta_path, json.dumps(meta).encode("utf-8"))):
+                tmp_path = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            self._prune()
+
+    def _prune(self):
+        entries: List[Tuple[float, int, Path]] = []
+        total = 0
+        for meta_path in self.directory.glob("*.json"):
+            body_path = meta_path.with_suffix(".body")
+            try:
+                size = body_path.stat().st_size
+                entries.append((meta_path.stat().st_mtime, size, meta_path))
+            except OSError:
+                continue
+            total += size
+
+        for _, size, meta_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, meta_path.with_suffix(".body")):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            total -= size
+
+
+class _Download:
+    """Accumulates a streamed body, enforcing the size limit and sniffing the type early."""
+
+    def __init__(self, url: str, headers: httpx.Headers, max_bytes: int, allowed: Optional[Iterable[str]]):
+        self.url = url
+        self.max_bytes = max_bytes
+        self.allowed = allowed
+        self.content_type = headers.get("content-type")
+        self.extension: Optional[str] = None
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+        declared = headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise UrlFetchError(f"Remote file exceeds maximum allowed size of {max_bytes} bytes", 413)
+
+    def feed(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UrlFetchError(f"Remote file exceeds maximum allowed size of {self.max_bytes} bytes", 413)
+        self.chunks.append(chunk)
+        if self.extension is None and self.size >= SNIFF_BYTES:
+            self._sniff()
+
+    def _sniff(self):
+        head = b"".join(self.chunks)[:SNIFF_BYTES]
+        extension = sniff_extension(head, self.content_type)
+        if extension is None or not extension_allowed(extension, self.allowed):
+            raise UrlFetchError(f"Unsupported content at {self.url} (detected: {extension or 'unknown'})", 415)
+        self.extension = extension
+
+    def finish(self) -> FetchedResource:
+        if self.extension is None:
+            self._sniff()
+        return FetchedResource(self.url, b"".join(self.chunks), self.extension, self.content_type)
+
+
+class UrlFetcher:
+    """
+    Downloads remote files for analysis.
+
+    - One pooled ``httpx`` client (async for the API, sync for scripts).
+    - Bodies are streamed and the download aborts as soon as it exceeds
+      ``max_bytes`` (or the declared Content-Length already does).
+    - The file type is sniffed from the first bytes, so unsupported content
+      is rejected before the rest is transferred.
+    - Responses with an ETag or Last-Modified are cached on disk and
+      revalidated with a conditional GET; a 304 is served from the cache.
+    - Hosts resolving to private, loopback or link-local addresses are
+      refused unless ``allow_private`` is set. Redirects are followed one
+      hop at a time and every hop is checked. Each request connects to
+      the address that passed the check (TLS still verifies the host
+      name), so DNS rebinding cannot swap it afterwards.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[UrlCache] = None,
+        max_bytes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        allow_private: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the fetcher.
+
+        Args:
+            cache: Disk cache (defaults to one configured from settings)
+            max_bytes: Maximum body size (defaults to MAX_FILE_SIZE)
+            timeout: Per-request timeout in seconds
+            max_connections: Size of the connection pool
+            allow_private: Allow hosts on private networks
+            transport: Custom async httpx transport (e.g. for tests)
+        """
+        self.cache = cache or UrlCache(Path(settings.URL_CACHE_DIR), settings.URL_CACHE_MAX_BYTES)
+        self.max_bytes = max_bytes or settings.MAX_FILE_SIZE
+        self.timeout = timeout or settings.URL_FETCH_TIMEOUT
+        self.max_connections = max_connections or settings.URL_FETCH_MAX_CONNECTIONS
+        self.allow_private = settings.URL_FETCH_ALLOW_PRIVATE if allow_private is None else allow_private
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_sync: Optional[httpx.Client] = None
+
+    def _client_options(self) -> Dict:
+        return {
+            "timeout": self.timeout,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            "follow_redirects": False,
+            "headers": {"User-Agent": f"{settings.APP_NAME}/{settings.VERSION}"},
+        }
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared async client, created on first use."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(transport=self._transport, **self._client_options())
+        return self._http
+
+    @property
+    def http_sync(self) -> httpx.Client:
+        """Shared blocking client for scripts, created on first use."""
+        if self._http_sync is None:
+            self._http_sync = httpx.Client(**self._client_options())
+        return self._http_sync
+
+    @staticmethod
+    def _parse(url: str) -> Tuple[str, int]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise UrlFetchError(f"Only http(s) URLs are supported: {url}", 400)
+        return parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+
+    def _check_addresses(self, host: str, addresses: Iterable[str]):
+        if self.allow_private:
+            return
+        for address in addresses:
+            ip = ipaddress.ip_address(address.split("%", 1)[0])
+            if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved or ip.is_multicast:
+                raise UrlFetchError(f"Refusing to fetch from non-public address: {host}", 400)
+
+    def _checked_address(self, host: str, infos: List[Tuple]) -> str:
+        addresses = [info[4][0] for info in infos]
+        if not addresses:
+            raise UrlFetchError(f"Cannot resolve host {host}", 502)
+        self._check_addresses(host, addresses)
+        return addresses[0]
+
+    async def _resolve(self, url: str) -> Optional[str]:
+        """The checked address to connect to (None when private hosts are allowed)."""
+        host, port = self._parse(url)
+        if self.allow_private:
+            return None
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            raise UrlFetchError(f"Cannot resolve host {host}: {e}", 502)
+        return self._checked_address(host, infos)
+
+    def _resolve_sync(self, url: str) -> Optional[str]:
+        host, port = self._parse(url)
+        if self.allow_private:
+            return None
+        try:
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            raise UrlFetchError(f"Cannot resolve host {host}: {e}", 502)
+        return self._checked_address(host, infos)
+
+    @staticmethod
+    def _request_args(url: str, address: Optional[str], headers: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Arguments for a GET of ``url`` pinned to ``address``.
+
+        The request goes to the IP itself, with the original Host header and
+        the host name as TLS SNI (which is also what the certificate is
+        verified against).
+        """
+        headers = dict(headers or {})
+        if address is None:
+            return {"url": url, "headers": headers}
+        target = httpx.URL(url)
+        headers["Host"] = target.netloc.decode("ascii")
+        return {
+            "url": target.copy_with(host=address.split("%", 1)[0]),
+            "headers": headers,
+            "extensions": {"sni_hostname": target.host},
+        }
+
+    @staticmethod
+    def _redirect(url: str, response: httpx.Response) -> Optional[str]:
+        """Absolute target of a redirect response, or None."""
+        location = response.headers.get("location")
+        if response.status_code not in _REDIRECT_STATUSES or not location:
+            return None
+        return str(httpx.URL(url).join(location))
+
+    def _start(self, url: str, response: httpx.Response, allowed: Optional[Iterable[str]]) -> _Download:
+        if response.status_code != 200:
+            raise UrlFetchError(f"Remote server returned HTTP {response.status_code} for {url}", 502)
+        return _Download(url, response.headers, self.max_bytes, allowed)
+
+    def _complete(self, download: _Download, headers: httpx.Headers) -> FetchedResource:
+        resource = download.finish()
+        self.cache.store(resource, headers)
+        return resource
+
+    @staticmethod
+    def _check_cached(resource: FetchedResource, allowed: Optional[Iterable[str]]) -> FetchedResource:
+        if not extension_allowed(resource.extension, allowed):
+            raise UrlFetchError(f"Unsupported content at {resource.url} (detected: {resource.extension})", 415)
+        return resource
+
+    async def _download(self, url: str, response: httpx.Response, allowed: Optional[Iterable[str]]) -> FetchedResource:
+        download = self._start(url, response, allowed)
+        async for chunk in response.aiter_bytes():
+            download.feed(chunk)
+        return await asyncio.to_thread(self._complete, download, response.headers)
+
+    def _download_sync(self, url: str, response: httpx.Response, allowed: Optional[Iterable[str]]) -> FetchedResource:
+        download = self._start(url, response, allowed)
+        for chunk in response.iter_bytes():
+            download.feed(chunk)
+        return self._complete(download, response.headers)
+
+    async def fetch(self, url: str, allowed_extensions: Optional[Iterable[str]] = None) -> FetchedResource:
+        """
+        Download ``url`` (or serve it from the cache after revalidation).
+
+        Args:
+            url: http(s) URL
+            allowed_extensions: Accepted file types, e.g. settings.ALLOWED_EXTENSIONS
+
+        Returns:
+            FetchedResource with the body and sniffed extension
+
+        Raises:
+            UrlFetchError: Invalid URL, unsupported content, too large, or upstream failure
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            address = await self._resolve(url)
+            cached = await asyncio.to_thread(self.cache.lookup, url)
+            try:
+                request = self._request_args(url, address, self.cache.conditional_headers(cached))
+                async with self.http.stream("GET", **request) as response:
+                    location = self._redirect(url, response)
+                    if location is None and not (response.status_code == 304 and cached):
+                        return await self._download(url, response, allowed_extensions)
+                if location is not None:
+                    url = location
+                    continue
+
+                resource = await asyncio.to_thread(self.cache.read, url, cached)
+                if resource is None:
+                    # Entry vanished between lookup and read: fetch unconditionally
+                    async with self.http.stream("GET", **self._request_args(url, address)) as response:
+                        return await self._download(url, response, allowed_extensions)
+            except httpx.HTTPError as e:
+                raise UrlFetchError(f"Failed to download {url}: {e.__class__.__name__}: {e}", 502)
+            return self._check_cached(resource, allowed_extensions)
+        raise UrlFetchError(f"Too many redirects (more than {MAX_REDIRECTS}) for {url}", 502)
+
+    def fetch_sync(self, url: str, allowed_extensions: Optional[Iterable[str]] = None) -> FetchedResource:
+        """Blocking variant of fetch for scripts and worker processes."""
+        for _ in range(MAX_REDIRECTS + 1):
+            address = self._resolve_sync(url)
+            cached = self.cache.lookup(url)
+            try:
+                request = self._request_args(url, address, self.cache.conditional_headers(cached))
+                with self.http_sync.stream("GET", **request) as response:
+                    location = self._redirect(url, response)
+                    if location is None and not (response.status_code == 304 and cached):
+                        return self._download_sync(url, response, allowed_extensions)
+                if location is not None:
+                    url = location
+                    continue
+
+                resource = self.cache.read(url, cached)
+                if resource is None:
+                    with self.http_sync.stream("GET", **self._request_args(url, address)) as response:
+                        return self._download_sync(url, response, allowed_extensions)
+            except httpx.HTTPError as e:
+                raise UrlFetchError(f"Failed to download {url}: {e.__class__.__name__}: {e}", 502)
+            return self._check_cached(resource, allowed_extensions)
+        raise UrlFetchError(f"Too many redirects (more than {MAX_REDIRECTS}) for {url}", 502)
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._http_sync is not None:
+            self._http_sync.close()
+            self._http_sync = None
+
+
+_url_fetcher: Optional[UrlFetcher] = None
+
+
+def get_url_fetcher() -> UrlFetcher:
+    """Return the process-wide URL fetcher configured from settings."""
+    global _url_fetcher
+    if _url_fetcher is None:
+        _url_fetcher = UrlFetcher()
+    return _url_fetcher